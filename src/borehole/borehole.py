@@ -8,24 +8,6 @@ import numpy as np
 from typing import List, Optional
 import wellpathpy as wp
 
-def count_significant_figures(number):
-    # Convert the number to a string
-    num_str = str(number)
-
-    # Remove leading and trailing zeros
-    if '.' in num_str:
-        num_str = num_str.rstrip('0').rstrip('.')  # Remove trailing zeros and decimal point if necessary
-        num_str = num_str.lstrip('0')  # Remove leading zeros
-    else:
-        num_str = num_str.lstrip('0')  # Only remove leading zeros for integers
-
-    # Count significant figures
-    if num_str == '':
-        return 0  # This would happen for 0
-
-    # Count non-zero digits
-    return len(num_str)
-
 @dataclass
 class PathPoint:
     x: float
@@ -33,6 +15,93 @@ class PathPoint:
     z: float
     depth: Optional[float] = None  # Optional measured depth
 
+class DrillingPath:
+    """
+    Compact columnar storage of a drilling path as a (N,4) float64 array with the columns x, y, z and depth.
+    Iterating or indexing with an integer produces PathPoint instances lazily, slices and boolean masks
+    return a new DrillingPath. A missing depth is stored as NaN.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data=None):
+        if(data is None):
+            data = np.empty((0, 4))
+        self._data = np.asarray(data, dtype=np.float64).reshape(-1, 4)
+
+    @classmethod
+    def from_points(cls, points):
+        """Creates a DrillingPath from an iterable of PathPoint instances."""
+        return cls([(p.x, p.y, p.z, np.nan if p.depth is None else p.depth) for p in points])
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._data
+
+    @property
+    def xyz(self) -> np.ndarray:
+        return self._data[:, 0:3]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._data[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self._data[:, 2]
+
+    @property
+    def depth(self) -> np.ndarray:
+        return self._data[:, 3]
+
+    def _to_point(self, row) -> PathPoint:
+        x, y, z, depth = row
+        return PathPoint(x, y, z, None if np.isnan(depth) else depth)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self):
+        for row in self._data.tolist():
+            yield self._to_point(row)
+
+    def __getitem__(self, key):
+        if(isinstance(key, (int, np.integer))):
+            return self._to_point(self._data[key].tolist())
+        return DrillingPath(self._data[key])
+
+    def between(self, depth_from, depth_to) -> 'DrillingPath':
+        """
+        Returns the sub-path between two measured depths in O(log n + k) via binary search on the (ascending) depths.
+        Endpoints falling between two samples are linearly interpolated on the path segment, so the sub-path starts and
+        ends exactly at depth_from and depth_to (clipped to the depth range of the path).
+        """
+        if(len(self) == 0):
+            return DrillingPath()
+        depths = self.depth
+        if(np.isnan(depths).any()):
+            raise ValueError("The drilling path has points without a measured depth.")
+        depth_from, depth_to = max(depth_from, depths[0]), min(depth_to, depths[-1])
+        if(depth_from > depth_to):
+            return DrillingPath()
+
+        # samples strictly inside (depth_from, depth_to), the endpoints are added interpolated
+        start = np.searchsorted(depths, depth_from, side='right')
+        end = np.searchsorted(depths, depth_to, side='left')
+        endpoints = np.column_stack([np.interp([depth_from, depth_to], depths, self._data[:, col]) for col in range(3)] + [[depth_from, depth_to]])
+        if(depth_from == depth_to):
+            return DrillingPath(endpoints[:1])
+        return DrillingPath(np.concatenate([endpoints[:1], self._data[start:end], endpoints[1:]]))
+
+    def __array__(self, dtype=None, copy=None):
+        return self._data if dtype is None else self._data.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f"DrillingPath({len(self)} points)"
+
 @dataclass
 class SurveySegment:
     depth: float  # Measured depth in meters
@@ -61,41 +130,202 @@ class Borehole:
     max_depth: float
     drilling_radius: float
     drilling_survey: Optional[List[SurveySegment]] = None
-    drilling_xyzpath: Optional[List[PathPoint]] = None
+    drilling_xyzpath: Optional[DrillingPath] = None # a list of PathPoint instances is converted on init
     casings: Optional[List[Casing]] = None
     intervals: Optional[List[Interval]] = None
-    _drilling_depths: Optional[List[float]] = None
+    _drilling_depths: Optional[np.ndarray] = None
+    _depths_inputs: Optional[tuple] = None # spacing (or adaptive parameters), tolerance and boundaries the depths were calculated from
+    _path_survey_inputs: Optional[tuple] = None # survey the drilling path was calculated from
 
-    def _calculate_depths(self, spacing=1):
+    def __post_init__(self):
+        if(self.drilling_xyzpath is not None and not isinstance(self.drilling_xyzpath, DrillingPath)):
+            self.drilling_xyzpath = DrillingPath.from_points(self.drilling_xyzpath)
+
+    def get_sub_path(self, depth_from, depth_to) -> DrillingPath:
+        """
+        Returns the drilling path between two measured depths, e.g. of a casing or lithology interval.
+        The depths don't need to be part of the sampled depths, the endpoints are interpolated (see DrillingPath.between).
+        """
+        if(self.drilling_xyzpath is None):
+            raise ValueError(f"The drilling path of {self.hole_id} has not been calculated yet.")
+        return self.drilling_xyzpath.between(depth_from, depth_to)
+
+    def calculate_depths(self, spacing=1.0, tolerance=1e-3) -> np.ndarray:
         """
         This function calculates all necessary / relevant depths
             - at fixed spacings, to descretize the drilling path with high accuracy
             - at casing start or end points
             - at lithology boundaries / interval boundary
+        Fixed spacing depths closer than 'tolerance' to a casing or interval boundary are dropped,
+        so boundaries never create near-duplicate samples. The boundaries themselves are kept exactly.
+        The sorted depths are stored in _drilling_depths and returned.
         """
+        # 1) Fixed spacings (multiplied instead of accumulated, to avoid float drift on long holes)
+        count = int(np.ceil(self.max_depth / spacing - 1e-9))
+        grid = np.round(np.arange(count) * spacing, 9)
 
-        # 1) Add fixed spacings
-        digits = max(count_significant_figures(spacing), count_significant_figures(self.max_depth))
-        depths = []
-        depths += list(np.arange(0.0, self.max_depth, spacing))
-        depths.append(self.max_depth)
-        depths = [round(d, digits) for d in depths]
-
-        # 2) add casing start- or endpoints (if not yet in depths)
-        for invl in self.casings if self.casings is not None else []:
-            if(invl.depth_from not in depths):
-                depths.append(invl.depth_from)
-            if(invl.depth_to not in depths):
-                depths.append(invl.depth_to)
-
-        # 3) add lithology interval start- or endpoints (if not yet in depths)
-        for invl in self.intervals if self.intervals is not None else []:
-            if(invl.depth_from not in depths):
-                depths.append(invl.depth_from)
-            if(invl.depth_to not in depths):
-                depths.append(invl.depth_to)
-
-        self._drilling_depths = sorted(depths)
+        depths = self._merge_boundaries(grid, tolerance)
+        self._drilling_depths = depths
+        self._depths_inputs = self._get_depths_inputs(spacing, tolerance)
+        return depths
+
+    def calculate_adaptive_depths(self, chord_tolerance=0.01, max_spacing=None, tolerance=1e-3) -> np.ndarray:
+        """
+        Adaptive alternative to calculate_depths: the depths are placed by the curvature of the path instead of a fixed spacing.
+        Between two survey stations the minimum curvature path is a circular arc with radius R = length / dogleg, which is
+        divided into equal steps, so the chords deviate at most 'chord_tolerance' (sagitta R*(1-cos(step/2R))) from the arc.
+        Straight sections only get their first and last station, the casing and interval boundaries are always included.
+        Args:
+            chord_tolerance (float): the maximum deviation of the sampled polyline from the path in meters
+            max_spacing (float, optional): an additional upper limit for the distance of two depths
+            tolerance (float): depths closer than this to a boundary are dropped, see calculate_depths
+        Returns:
+            np.ndarray: the sorted depths, also stored in _drilling_depths
+        """
+        from borehole.desurvey import direction_vectors
+
+        # 1) dogleg of each survey segment (the dip is used as inclination, as in calculate_drilling_path),
+        # the stations inside a straight run are not needed
+        survey = np.asarray(self._get_survey_inputs(), dtype=np.float64).reshape(-1, 3)
+        md = survey[:, 0]
+        tangents = direction_vectors(survey[:, 1], survey[:, 2])
+        straight = np.linalg.norm(np.diff(tangents, axis=0), axis=1) <= 1e-12
+        needed = np.ones(len(md), dtype=bool)
+        needed[1:-1] = ~(straight[:-1] & straight[1:])
+        md, tangents = md[needed], tangents[needed]
+        straight = np.linalg.norm(np.diff(tangents, axis=0), axis=1) <= 1e-12
+        dogleg = np.where(straight, 0.0, np.arccos(np.clip(np.einsum('ij,ij->i', tangents[:-1], tangents[1:]), -1.0, 1.0)))
+        lengths = np.diff(md)
+
+        # 2) largest step with a sagitta below the chord tolerance, and the number of steps per segment
+        with np.errstate(divide='ignore', invalid='ignore'):
+            arc_radius = np.where(dogleg > 1e-12, lengths / dogleg, np.inf)
+            max_step = np.where(np.isfinite(arc_radius), 2 * arc_radius * np.arccos(np.clip(1 - chord_tolerance / arc_radius, -1.0, 1.0)), np.inf)
+        if(max_spacing is not None):
+            max_step = np.minimum(max_step, max_spacing)
+        # a sample within 'tolerance' of a boundary is replaced by the boundary, which lengthens a step by up to 2 * tolerance
+        max_step = np.maximum(max_step - 2 * tolerance, tolerance)
+        steps = np.maximum(np.ceil(lengths / max_step - 1e-9), 1).astype(np.int64)
+
+        # 3) equally spaced depths within each segment (vectorized over all segments)
+        segment = np.repeat(np.arange(len(lengths)), steps)
+        step_index = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+        samples = np.round(md[:-1][segment] + lengths[segment] * step_index / steps[segment], 9) if len(lengths) else np.empty(0)
+        samples = np.concatenate([samples, md])
+        if(max_spacing is not None and len(md) and self.max_depth > md[-1]):
+            # straight extrapolation below the last station
+            spacing = max(max_spacing - 2 * tolerance, tolerance)
+            samples = np.concatenate([samples, np.round(md[-1] + np.arange(1, np.ceil((self.max_depth - md[-1]) / spacing)) * spacing, 9)])
+        samples = np.unique(samples[(samples > 0) & (samples < self.max_depth)])
+
+        depths = self._merge_boundaries(samples, tolerance)
+        self._drilling_depths = depths
+        self._depths_inputs = self._get_adaptive_depths_inputs(chord_tolerance, max_spacing, tolerance)
+        return depths
+
+    def _merge_boundaries(self, samples, tolerance) -> np.ndarray:
+        # 1) casing and lithology interval start- or endpoints and the final depth
+        boundaries = [0.0, self.max_depth]
+        for invl in (self.casings or []) + (self.intervals or []):
+            boundaries += [invl.depth_from, invl.depth_to]
+        boundaries = np.unique(np.round(np.asarray(boundaries, dtype=np.float64), 9))
+
+        # 2) drop the samples next to a boundary (distance to the nearest boundary via binary search)
+        idx = np.clip(np.searchsorted(boundaries, samples), 1, len(boundaries) - 1)
+        distance = np.minimum(np.abs(samples - boundaries[idx - 1]), np.abs(samples - boundaries[idx]))
+        depths = np.concatenate([samples[distance > tolerance], boundaries])
+        depths.sort()
+        return depths
+
+    def _calculate_depths(self, spacing=1):
+        self.calculate_depths(spacing=spacing)
+
+    def _get_depths_inputs(self, spacing, tolerance=1e-3) -> tuple:
+        return (
+            spacing,
+            tolerance,
+            self.max_depth,
+            tuple((invl.depth_from, invl.depth_to) for invl in (self.casings or [])),
+            tuple((invl.depth_from, invl.depth_to) for invl in (self.intervals or [])),
+        )
+
+    def _get_adaptive_depths_inputs(self, chord_tolerance, max_spacing, tolerance) -> tuple:
+        # the adaptive depths also depend on the survey
+        return ('adaptive', chord_tolerance, max_spacing) + self._get_depths_inputs(None, tolerance)[1:] + (self._get_survey_inputs(),)
+
+    def _update_stale_depths(self, spacing):
+        # manually set depths (without inputs) are never recalculated, adaptive depths stay adaptive
+        if(self._drilling_depths is None):
+            self.calculate_depths(spacing=spacing)
+        elif(self._depths_inputs is None):
+            return
+        elif(self._depths_inputs[0] == 'adaptive'):
+            _, chord_tolerance, max_spacing, tolerance = self._depths_inputs[:4]
+            if(self._depths_inputs != self._get_adaptive_depths_inputs(chord_tolerance, max_spacing, tolerance)):
+                self.calculate_adaptive_depths(chord_tolerance, max_spacing, tolerance)
+        elif(self._depths_inputs != self._get_depths_inputs(spacing, self._depths_inputs[1])):
+            self.calculate_depths(spacing=spacing, tolerance=self._depths_inputs[1])
+
+    def _get_survey_inputs(self) -> tuple:
+        return tuple((segment.depth, segment.dip, segment.azimuth) for segment in (self.drilling_survey or []))
+
+    def _get_valid_path_depth(self) -> float:
+        """
+        Returns the measured depth down to which the current drilling path is still valid for the current survey:
+        the positions above a survey station only depend on the stations above it.
+        """
+        if(self._path_survey_inputs is None or self.drilling_xyzpath is None):
+            return -np.inf
+        survey = self._get_survey_inputs()
+        for idx, (old_station, new_station) in enumerate(zip(self._path_survey_inputs, survey)):
+            if(old_station != new_station):
+                return survey[idx - 1][0] if idx > 0 else -np.inf
+        if(len(survey) == len(self._path_survey_inputs)):
+            return np.inf
+        # stations were added or removed at the bottom
+        last = min(len(survey), len(self._path_survey_inputs)) - 1
+        return survey[last][0] if last >= 0 else -np.inf
+
+    def update_drilling_path(self, spacing=1.0) -> int:
+        """
+        Incrementally updates the drilling path after the survey, casings, intervals or spacing changed:
+            - the depths are recalculated if the spacing, max_depth, casings or intervals changed
+            - path points at unchanged depths above the first changed survey station are reused
+            - only the remaining points are calculated (vectorized minimum curvature, see borehole.desurvey)
+        The whole path is calculated with calculate_drilling_path if there is no previous path.
+        Returns:
+            int: the number of calculated path points
+        """
+        from borehole.desurvey import desurvey_minimum_curvature
+
+        self._update_stale_depths(spacing)
+
+        valid_depth = self._get_valid_path_depth()
+        if(valid_depth == -np.inf):
+            self.calculate_drilling_path(spacing=spacing)
+            return len(self.drilling_xyzpath)
+
+        # 1) Reuse the points at unchanged depths (binary search in the sorted depths of the old path)
+        depths = np.asarray(self._drilling_depths, dtype=np.float64)
+        old_path = self.drilling_xyzpath.array
+        old_idx = np.clip(np.searchsorted(old_path[:, 3], depths), 0, max(len(old_path) - 1, 0))
+        reuse = (len(old_path) > 0) & (np.abs(old_path[old_idx, 3] - depths) < 1e-9) & (depths <= valid_depth)
+
+        # 2) Calculate the missing points
+        path = np.empty((len(depths), 4))
+        path[:, 3] = depths
+        path[reuse, 0:3] = old_path[old_idx[reuse], 0:3]
+        missing = ~reuse
+        if(np.any(missing)):
+            survey = np.asarray(self._get_survey_inputs(), dtype=np.float64)
+            positions = desurvey_minimum_curvature(survey[:, 0], survey[:, 1], survey[:, 2], [0, len(survey)], depths[missing], [0, int(missing.sum())])
+            path[missing, 0] = self.easting + positions[:, 1]
+            path[missing, 1] = self.northing + positions[:, 0]
+            path[missing, 2] = self.elevation - positions[:, 2]
+
+        self.drilling_xyzpath = DrillingPath(path)
+        self._path_survey_inputs = self._get_survey_inputs()
+        return int(missing.sum())
 
     def calculate_drilling_path(self, spacing=1.0):
         """
@@ -103,7 +333,11 @@ class Borehole:
         The function obtains the XYZ delta for the wellpath.
         By Default the 'minimum_curvature' algorithm is used to determine 
         the xyz values from the depth, azi, dip measurements.
+        Depths outside of the surveyed range (e.g. a max_depth below the last station) are extrapolated along the
+        tangent of the first/last station, as in update_drilling_path and borehole.desurvey.
         """
+        from borehole.desurvey import desurvey_minimum_curvature
+
         # 1) Extract measured-depth, inclination (dip), and azimuth
         md = [segment.depth for segment in self.drilling_survey]
         inc = [segment.dip for segment in self.drilling_survey]
@@ -113,16 +347,28 @@ class Borehole:
         dev = wp.deviation(md=md, inc=inc, azi=azi)
         pos = dev.minimum_curvature(course_length=30)
 
-        # 3) Resample xyz positions to the relevant depths
-        if(self._drilling_depths is None ):
-            self._calculate_depths(spacing=spacing)
-        resampled = pos.resample(depths = self._drilling_depths)
+        # 3) Resample xyz positions to the relevant depths (recalculated, if the spacing, casings or intervals changed)
+        self._update_stale_depths(spacing)
+        depths = np.asarray(self._drilling_depths, dtype=np.float64)
+        surveyed = (depths >= md[0]) & (depths <= md[-1]) # wellpathpy only resamples within the survey
+        resampled = pos.resample(depths = depths[surveyed])
 
         # 4) Translate the resampled positions to the georeferenced position of the collar
         georef_pos = resampled.to_wellhead(surface_easting=self.easting, surface_northing=self.northing)
         georef_pos = georef_pos.to_tvdss(datum_elevation=self.elevation)
+        path = np.empty((len(depths), 4))
+        path[:, 3] = depths
+        path[surveyed, 0:3] = np.column_stack([georef_pos.easting, georef_pos.northing, georef_pos.depth])
+
+        # 5) Extrapolate the remaining depths along the tangents
+        if(not np.all(surveyed)):
+            positions = desurvey_minimum_curvature(md, inc, azi, [0, len(md)], depths[~surveyed], [0, int((~surveyed).sum())])
+            path[~surveyed, 0] = self.easting + positions[:, 1]
+            path[~surveyed, 1] = self.northing + positions[:, 0]
+            path[~surveyed, 2] = self.elevation - positions[:, 2]
 
-        # 5) Convert positional data to PathPoint instances
-        self.drilling_xyzpath = [PathPoint(x,y,z,md) for x,y,z,md in zip(georef_pos.easting, georef_pos.northing, georef_pos.depth, self._drilling_depths)]
+        # 6) Store the positional data as columns (PathPoint instances are created on iteration)
+        self.drilling_xyzpath = DrillingPath(path)
+        self._path_survey_inputs = self._get_survey_inputs()
 
 pass
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""
+Clash detection of planned boreholes against the elements of an IFC model.
+
+Every planned borehole is a straight drilling with a tolerance cone: a conical frustum along the axis start -> end,
+whose radius grows from the start radius by the tolerance factor per meter (see tolerance_body_as_mesh of example4,
+a tolerance factor of 0 gives a cylinder). The elements are filtered with a bounding box broad phase (BBoxIndex)
+and the remaining triangles are intersected exactly with the frustum. The result is the first-contact depth,
+i.e. the smallest distance along the axis, at which the tolerance cone touches an element.
+
+For a triangle the smallest axial distance of its intersection with the (convex) frustum is attained either at a
+vertex, where an edge crosses the lateral surface or a cap, or at a vertex of the conic section of the triangle
+plane, which lies in the plane spanned by the axis and the triangle normal. All candidates are evaluated for all
+triangles of an element at once.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import ifcopenshell
+import numpy as np
+
+from ifc_utils.ifc_utils import calc_triangle_meshes, BBOX_DTYPE
+from ifc_utils.ifc_spatial_index import BBoxIndex
+from borehole.csg import points_inside_mesh
+from borehole.tolerance_cone import end_points_from_orientation, tolerance_cone_meshes
+
+EDGES = ((0, 1), (1, 2), (2, 0))
+EPSILON = 1e-9
+
+@dataclass
+class PlannedBorehole:
+    hole_id: str
+    start: tuple[float, float, float]  # collar point in world coordinates
+    end: tuple[float, float, float]  # end point of the drilling in world coordinates
+    start_radius: float = 0.05  # radius of the drilling at the collar in meters
+    tolerance_factor: float = 0.02  # growth of the radius per meter of drilling length
+
+    @property
+    def length(self) -> float:
+        return float(np.linalg.norm(np.subtract(self.end, self.start)))
+
+    @property
+    def end_radius(self) -> float:
+        return self.start_radius + self.length * self.tolerance_factor
+
+def _is_missing(value) -> bool:
+    # empty csv values: None, '' or NaN (e.g. from pandas or read_csv_columns)
+    return value is None or value == '' or (isinstance(value, float) and np.isnan(value))
+
+def planned_boreholes_from_rows(rows: list[dict], start_radius: float = 0.05, tolerance_factor: float = 0.02) -> list[PlannedBorehole]:
+    """
+    Creates the planned boreholes from csv rows (e.g. read_csv('./data/planned_drillings.csv') of example4) with the
+    columns hole_id, start_x, start_y, start_z and either end_x, end_y, end_z or dip, azimuth, length
+    (see end_points_from_orientation), and the optional columns start_radius and tolerance_factor
+    (empty values, i.e. None, '' or NaN, fall back to the defaults).
+    """
+    boreholes = []
+    for row in rows:
+        start = (float(row['start_x']), float(row['start_y']), float(row['start_z']))
+        if(not _is_missing(row.get('end_x'))):
+            end = (float(row['end_x']), float(row['end_y']), float(row['end_z']))
+        else:
+            end = tuple(end_points_from_orientation(np.array([start]), [float(row['dip'])], [float(row['azimuth'])], [float(row['length'])])[0].tolist())
+        boreholes.append(PlannedBorehole(
+            hole_id=str(row['hole_id']),
+            start=start,
+            end=end,
+            start_radius=float(row['start_radius']) if not _is_missing(row.get('start_radius')) else start_radius,
+            tolerance_factor=float(row['tolerance_factor']) if not _is_missing(row.get('tolerance_factor')) else tolerance_factor,
+        ))
+    return boreholes
+
+def planned_borehole_cones(planned_boreholes: list[PlannedBorehole], num_segments: int = 32, caps: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """Builds the tolerance cone meshes of all planned boreholes at once (see tolerance_cone_meshes)."""
+    return tolerance_cone_meshes(
+        np.array([borehole.start for borehole in planned_boreholes], dtype=np.float64),
+        np.array([borehole.end for borehole in planned_boreholes], dtype=np.float64),
+        start_radii=np.array([borehole.start_radius for borehole in planned_boreholes], dtype=np.float64),
+        tolerance_factors=np.array([borehole.tolerance_factor for borehole in planned_boreholes], dtype=np.float64),
+        num_segments=num_segments,
+        caps=caps,
+    )
+
+def _points_in_triangles(points: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    # barycentric test of (F,3) points, that lie in the planes of the (F,3,3) triangles
+    v0, v1, v2 = triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0], points - triangles[:, 0]
+    d00, d01, d11 = (v0 * v0).sum(axis=1), (v0 * v1).sum(axis=1), (v1 * v1).sum(axis=1)
+    d20, d21 = (v2 * v0).sum(axis=1), (v2 * v1).sum(axis=1)
+    denominator = d00 * d11 - d01 * d01
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = (d11 * d20 - d01 * d21) / denominator
+        w = (d00 * d21 - d01 * d20) / denominator
+    return (denominator > EPSILON * EPSILON) & (v >= -EPSILON) & (w >= -EPSILON) & (v + w <= 1.0 + EPSILON)
+
+def _segment_distances_to_origin(p0: np.ndarray, p1: np.ndarray) -> np.ndarray:
+    direction = p1 - p0
+    length2 = (direction * direction).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lam = np.clip(np.where(length2 > 0, -(p0 * direction).sum(axis=-1) / length2, 0.0), 0.0, 1.0)
+    return np.linalg.norm(p0 + lam[..., None] * direction, axis=-1)
+
+def triangle_contact_depths(
+    triangles: np.ndarray,
+    start: np.ndarray,
+    axis: np.ndarray,
+    length: float,
+    start_radius: float,
+    tolerance_factor: float,
+) -> np.ndarray:
+    """
+    Calculates the first-contact depth of a tolerance cone with each triangle.
+    Args:
+        triangles (np.ndarray): (F,3,3) triangle vertices
+        start (np.ndarray): the start point of the axis
+        axis (np.ndarray): the unit direction of the axis
+        length (float): the length of the axis
+        start_radius (float): the radius at the start
+        tolerance_factor (float): the growth of the radius per meter (0 for a cylinder)
+    Returns:
+        np.ndarray: (F,) the smallest distance along the axis of the intersection of each triangle with the
+            frustum, inf for triangles without contact
+    """
+    with np.errstate(divide='ignore', invalid='ignore'): # degenerate edges and planes give inf/nan candidates, which are masked
+        return _triangle_contact_depths(triangles, start, axis, length, start_radius, tolerance_factor)
+
+def _triangle_contact_depths(triangles, start, axis, length, start_radius, tolerance_factor):
+    def radius(t):
+        return start_radius + tolerance_factor * t
+
+    def is_valid(t):
+        return (t >= -EPSILON) & (t <= length + EPSILON) & (radius(t) >= 0.0)
+
+    relative = triangles - start
+    depths = relative @ axis  # (F,3)
+    perpendicular = relative - depths[..., None] * axis
+    best = np.full(len(triangles), np.inf)
+
+    # 1) vertices inside the frustum
+    inside = is_valid(depths) & ((perpendicular * perpendicular).sum(axis=2) <= radius(depths) ** 2 + EPSILON)
+    best = np.minimum(best, np.where(inside, depths, np.inf).min(axis=1))
+
+    # 2) edges crossing the lateral surface: |p0 + l*pd|^2 = (r(t0) + l*k*dt)^2
+    edge_start = np.stack([relative[:, i] for i, _ in EDGES], axis=1)  # (F,3,3)
+    edge_vector = np.stack([relative[:, j] - relative[:, i] for i, j in EDGES], axis=1)
+    t0, dt = edge_start @ axis, edge_vector @ axis  # (F,3)
+    p0 = edge_start - t0[..., None] * axis
+    pd = edge_vector - dt[..., None] * axis
+    r0 = radius(t0)
+    a = (pd * pd).sum(axis=2) - (tolerance_factor * dt) ** 2
+    b = 2.0 * ((p0 * pd).sum(axis=2) - r0 * tolerance_factor * dt)
+    c = (p0 * p0).sum(axis=2) - r0 * r0
+    discriminant = b * b - 4.0 * a * c
+    sqrt_discriminant = np.sqrt(np.maximum(discriminant, 0.0))
+    quadratic = np.abs(a) > EPSILON
+    roots = [
+        np.where(quadratic, (-b - sqrt_discriminant) / (2.0 * a), -c / b),
+        np.where(quadratic, (-b + sqrt_discriminant) / (2.0 * a), np.nan),
+    ]
+    for lam in roots:
+        t = t0 + lam * dt
+        valid = (discriminant >= 0.0) & (lam >= -EPSILON) & (lam <= 1.0 + EPSILON) & is_valid(t)
+        best = np.minimum(best, np.where(valid, t, np.inf).min(axis=1))
+
+    # 3) triangles crossing the start or end cap within its radius (distance of the cut segment to the axis)
+    for cap in (0.0, length):
+        lam = (cap - t0) / dt
+        crossing = (np.abs(dt) > EPSILON) & (lam >= -EPSILON) & (lam <= 1.0 + EPSILON)
+        points = p0 + np.where(crossing, lam, 0.0)[..., None] * pd  # (F,3,3) cut points in the cap plane
+        distance = np.full(len(triangles), np.inf)
+        for i, j in ((0, 1), (1, 2), (0, 2)):
+            pair = crossing[:, i] & crossing[:, j]
+            distance = np.minimum(distance, np.where(pair, _segment_distances_to_origin(points[:, i], points[:, j]), np.inf))
+        touching = (distance <= radius(cap) + EPSILON) & (radius(cap) >= 0.0)
+        best = np.minimum(best, np.where(touching, cap, np.inf))
+
+    # 4) vertices of the conic section inside the triangles (in the plane of the axis and the triangle normal)
+    normals = np.cross(relative[:, 1] - relative[:, 0], relative[:, 2] - relative[:, 0])
+    normal_length = np.linalg.norm(normals, axis=1)
+    normals = normals / np.maximum(normal_length, EPSILON)[:, None]
+    n_axis = normals @ axis
+    in_plane = normals - n_axis[:, None] * axis
+    n_perpendicular = np.linalg.norm(in_plane, axis=1)
+    offset = (normals * relative[:, 0]).sum(axis=1)
+    perpendicular_plane = n_perpendicular <= EPSILON
+    # triangle plane perpendicular to the axis: contact at its depth, if the axis passes through the triangle
+    t = np.where(perpendicular_plane, depths[:, 0], np.nan)
+    valid = perpendicular_plane & is_valid(t) & _points_in_triangles(t[:, None] * axis, relative)
+    best = np.minimum(best, np.where(valid, t, np.inf))
+    u = in_plane / np.maximum(n_perpendicular, EPSILON)[:, None]
+    for side in (-1.0, 1.0):
+        t = (offset - side * n_perpendicular * start_radius) / (n_axis + side * n_perpendicular * tolerance_factor)
+        t = np.where(np.isfinite(t) & ~perpendicular_plane, t, np.nan)
+        points = t[:, None] * axis + (side * radius(t))[:, None] * u
+        valid = is_valid(t) & _points_in_triangles(np.nan_to_num(points), relative)
+        best = np.minimum(best, np.where(valid, t, np.inf))
+
+    return np.where(normal_length > EPSILON, np.maximum(best, 0.0), np.inf)
+
+def first_contact_depth(borehole: PlannedBorehole, vertices: np.ndarray, faces: np.ndarray) -> float | None:
+    """
+    Returns the first-contact depth of the tolerance cone of the borehole with a triangle mesh or None.
+    A collar inside the (closed) mesh is a contact at depth 0, even if the cone touches none of its triangles.
+    """
+    start, end = np.asarray(borehole.start, dtype=np.float64), np.asarray(borehole.end, dtype=np.float64)
+    length = float(np.linalg.norm(end - start))
+    if(length == 0.0 or len(faces) == 0):
+        return None
+    triangles = vertices[faces]
+    if(np.all((vertices.min(axis=0) <= start) & (start <= vertices.max(axis=0))) and points_inside_mesh(start[None, :], triangles)[0]):
+        return 0.0
+    depths = triangle_contact_depths(triangles, start, (end - start) / length, length, borehole.start_radius, borehole.tolerance_factor)
+    depth = float(depths.min())
+    return depth if np.isfinite(depth) else None
+
+def clash_planned_borehole(job: tuple[PlannedBorehole, list[tuple[str, np.ndarray, np.ndarray]]]) -> list[tuple[str, float]]:
+    """ Narrow phase of one borehole against its candidate meshes (runs in the worker processes).
+    Args:
+        job (tuple[PlannedBorehole, list[tuple[str, np.ndarray, np.ndarray]]]): the borehole and the (GlobalId, vertices, faces) of the candidates
+    Returns:
+        list[tuple[str, float]]: (GlobalId, first-contact depth) of the clashing elements, sorted by depth
+    """
+    borehole, candidates = job
+    clashes = []
+    for global_id, vertices, faces in candidates:
+        depth = first_contact_depth(borehole, vertices, faces)
+        if(depth is not None):
+            clashes.append((global_id, depth))
+    return sorted(clashes, key=lambda clash: clash[1])
+
+def _bboxes_from_meshes(meshes: dict[str, tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+    bboxes = np.empty(len(meshes), dtype=BBOX_DTYPE)
+    if(len(meshes) > 0):
+        bboxes['global_id'] = list(meshes.keys())
+        bboxes['min_point'] = [vertices.min(axis=0) for vertices, _ in meshes.values()]
+        bboxes['max_point'] = [vertices.max(axis=0) for vertices, _ in meshes.values()]
+        bboxes['center_point'] = (bboxes['min_point'] + bboxes['max_point']) / 2
+    return np.sort(bboxes, order='global_id')
+
+def detect_clashes(
+    ifc_file: ifcopenshell.file,
+    planned_boreholes: list[PlannedBorehole],
+    spatial_index: BBoxIndex | None = None,
+    max_workers: int | None = None,
+) -> list[dict]:
+    """
+    Tests the tolerance cones of the planned boreholes against the elements of the ifc file.
+    1) broad phase: the bounding boxes along the axis (grown by the end radius) of every borehole
+    2) the candidate elements are tessellated once in a single geometry iterator pass
+    3) narrow phase: exact cone vs. triangle tests, in a process pool across the boreholes
+    Args:
+        ifc_file (ifcopenshell.file): the model with the existing structures
+        planned_boreholes (list[PlannedBorehole]): e.g. from planned_boreholes_from_rows
+        spatial_index (BBoxIndex, optional): e.g. ModelIndex.spatial_index, otherwise all elements are tessellated
+            and indexed
+        max_workers (int | None, optional): The number of processes. Defaults to os.cpu_count().
+    Returns:
+        list[dict]: per borehole (in the given order) {'hole_id', 'first_contact_depth', 'first_contact_global_id',
+            'clashes': [(global_id, depth), ...]}, the depths are None without a clash
+    """
+    # 1) Broad phase
+    meshes = None
+    if(spatial_index is None):
+        meshes = calc_triangle_meshes(ifc_file)
+        spatial_index = BBoxIndex.from_bboxes(_bboxes_from_meshes(meshes))
+    candidates = [
+        spatial_index.query_segment(borehole.start, borehole.end, radius=max(borehole.start_radius, borehole.end_radius)).tolist()
+        for borehole in planned_boreholes
+    ]
+
+    # 2) Tessellate the candidates
+    if(meshes is None):
+        global_ids = sorted({global_id for hole_candidates in candidates for global_id in hole_candidates})
+        meshes = calc_triangle_meshes(ifc_file, elements=[ifc_file.by_guid(global_id) for global_id in global_ids])
+    jobs = [
+        (borehole, [(global_id, *meshes[global_id]) for global_id in hole_candidates if global_id in meshes])
+        for borehole, hole_candidates in zip(planned_boreholes, candidates)
+    ]
+
+    # 3) Narrow phase
+    max_workers = max_workers or os.cpu_count() or 1
+    if(max_workers == 1):
+        results = list(map(clash_planned_borehole, jobs)) # no benefit from a pool, avoid its overhead
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(clash_planned_borehole, jobs, chunksize=max(1, len(jobs) // (4 * max_workers))))
+
+    return [
+        {
+            'hole_id': borehole.hole_id,
+            'first_contact_depth': clashes[0][1] if clashes else None,
+            'first_contact_global_id': clashes[0][0] if clashes else None,
+            'clashes': clashes,
+        }
+        for borehole, clashes in zip(planned_boreholes, results)
+    ]
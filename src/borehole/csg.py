@@ -0,0 +1,557 @@
+"""
+Constructive solid geometry (union, difference, intersection) of closed triangle meshes.
+
+The meshes are exchanged as (vertices, faces) arrays like tube_mesh and tolerance_cone_meshes. Two backends share
+the same interface (see get_csg_backend):
+- "pycsg": the BSP tree implementation of ezdxf.addons.pycsg (pure Python, splits every polygon by every plane)
+- "numpy": only the triangles, whose bounding boxes overlap the other mesh, are split by the planes of the
+  triangles they intersect. Every fragment is then completely inside, outside or on the surface of the other mesh
+  and is classified with two probes (just in front of and behind the fragment) by ray casting. Patches of
+  triangles away from the other mesh share one classification. Splitting and classification are vectorized over
+  all fragments. Finally the fragments are welded along the intersection curves: close vertices are merged,
+  the vertices on the edges of neighbouring fragments (T-junctions) are inserted into these edges and the thin
+  cracks left where the surfaces intersect at a grazing angle are filled, so the result is watertight.
+"""
+
+from abc import ABC, abstractmethod
+
+import ezdxf
+from ezdxf.addons.pycsg import CSG
+import numpy as np
+
+Mesh = tuple[np.ndarray, np.ndarray]
+
+def mesh_from_meshbuilder(mesh: ezdxf.render.MeshBuilder) -> Mesh:
+    """Converts an ezdxf MeshBuilder (e.g. from ezdxf.render.forms) into (V,3) vertices and (F,3) triangles (fans of the polygons)."""
+    triangles = [(face[0], face[idx], face[idx + 1]) for face in mesh.faces for idx in range(1, len(face) - 1)]
+    return np.array([tuple(vertex) for vertex in mesh.vertices], dtype=np.float64).reshape(-1, 3), np.array(triangles, dtype=np.int64).reshape(-1, 3)
+
+def meshbuilder_from_mesh(vertices: np.ndarray, faces: np.ndarray) -> ezdxf.render.MeshTransformer:
+    """Converts (V,3) vertices and (F,3) triangles into an ezdxf MeshTransformer, e.g. to render it into a modelspace."""
+    mesh = ezdxf.render.MeshTransformer()
+    mesh.vertices = [ezdxf.math.Vec3(vertex) for vertex in np.asarray(vertices).tolist()]
+    mesh.faces = [tuple(face) for face in np.asarray(faces).tolist()]
+    return mesh
+
+class CSGBackend(ABC):
+    """Interface of the CSG backends, the operands and results are (vertices, faces) tuples of closed meshes."""
+    name = None
+
+    @abstractmethod
+    def union(self, a: Mesh, b: Mesh) -> Mesh:
+        ...
+
+    @abstractmethod
+    def difference(self, a: Mesh, b: Mesh) -> Mesh:
+        ...
+
+    @abstractmethod
+    def intersection(self, a: Mesh, b: Mesh) -> Mesh:
+        ...
+
+class PyCSGBackend(CSGBackend):
+    """The BSP tree CSG of ezdxf.addons.pycsg."""
+    name = "pycsg"
+
+    def _run(self, a: Mesh, b: Mesh, operation: str) -> Mesh:
+        csg_a, csg_b = CSG(meshbuilder_from_mesh(*a)), CSG(meshbuilder_from_mesh(*b))
+        result = {"union": csg_a + csg_b, "difference": csg_a - csg_b, "intersection": csg_a * csg_b}[operation]
+        return mesh_from_meshbuilder(result.mesh())
+
+    def union(self, a: Mesh, b: Mesh) -> Mesh:
+        return self._run(a, b, "union")
+
+    def difference(self, a: Mesh, b: Mesh) -> Mesh:
+        return self._run(a, b, "difference")
+
+    def intersection(self, a: Mesh, b: Mesh) -> Mesh:
+        return self._run(a, b, "intersection")
+
+# 1) Geometric helpers of the numpy backend
+def _triangle_planes(triangles: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-300)[:, None]
+    return normals, (normals * triangles[:, 0]).sum(axis=1)
+
+def _plane_intervals(triangles: np.ndarray, distances: np.ndarray, directions: np.ndarray, tolerance: float) -> tuple[np.ndarray, np.ndarray]:
+    # interval of the cut of each triangle with a plane (given by the signed distances of its vertices) along the
+    # intersection line direction, (inf, -inf) if the triangle does not touch the plane
+    projections = np.einsum('fij,fj->fi', triangles, directions)
+    on_plane = np.abs(distances) <= tolerance
+    lows = np.where(on_plane, projections, np.inf).min(axis=1)
+    highs = np.where(on_plane, projections, -np.inf).max(axis=1)
+    for start, end in ((0, 1), (1, 2), (2, 0)):
+        d_start, d_end = distances[:, start], distances[:, end]
+        crossing = ((d_start > tolerance) & (d_end < -tolerance)) | ((d_start < -tolerance) & (d_end > tolerance))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            point = projections[:, start] + d_start / (d_start - d_end) * (projections[:, end] - projections[:, start])
+        lows = np.where(crossing, np.minimum(lows, point), lows)
+        highs = np.where(crossing, np.maximum(highs, point), highs)
+    return lows, highs
+
+def _split_by_planes(
+    triangles: np.ndarray,
+    normals: np.ndarray,
+    offsets: np.ndarray,
+    tolerance: float,
+    directions: np.ndarray | None = None,
+    lows: np.ndarray | None = None,
+    highs: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Splits each triangle by its plane (normals[i], offsets[i]) into 1 to 3 triangles, that are each on one side of the
+    plane. The orientation of the triangles is kept. Returns the new triangles and the index of their source triangle.
+    With directions and the intervals lows/highs along them (the cut of the splitting triangle), only triangles
+    whose cut overlaps this interval are split, i.e. the ones actually crossed by the splitting triangle.
+    """
+    distances = np.einsum('fij,fj->fi', triangles, normals) - offsets[:, None]
+    sides = np.where(distances > tolerance, 1, np.where(distances < -tolerance, -1, 0))
+    straddling = (sides.max(axis=1) == 1) & (sides.min(axis=1) == -1)
+    if(directions is not None):
+        fragment_lows, fragment_highs = _plane_intervals(triangles, distances, directions, tolerance)
+        straddling &= (fragment_highs >= lows - tolerance) & (fragment_lows <= highs + tolerance)
+    kept = np.flatnonzero(~straddling)
+    split = np.flatnonzero(straddling)
+    pieces, sources = [triangles[kept]], [kept]
+    if(len(split) == 0):
+        return np.concatenate(pieces), np.concatenate(sources)
+
+    tri, dist, side = triangles[split], distances[split], sides[split]
+    # a vertex on the plane gives two pieces, otherwise the vertex alone on its side gives three pieces;
+    # the special vertex is rotated to the front (cyclic, keeps the orientation)
+    has_zero = (side == 0).any(axis=1)
+    lonely = np.argmax(side * side.sum(axis=1, keepdims=True) < 0, axis=1)
+    first = np.where(has_zero, np.argmax(side == 0, axis=1), lonely)
+    order = (first[:, None] + np.arange(3)) % 3
+    tri = np.take_along_axis(tri, order[:, :, None], axis=1)
+    dist = np.take_along_axis(dist, order, axis=1)
+    v0, v1, v2 = tri[:, 0], tri[:, 1], tri[:, 2]
+    d0, d1, d2 = dist[:, 0:1], dist[:, 1:2], dist[:, 2:3]
+
+    zero = has_zero
+    if(zero.any()):
+        q = v1[zero] + (d1[zero] / (d1[zero] - d2[zero])) * (v2[zero] - v1[zero])
+        pieces += [np.stack([v0[zero], v1[zero], q], axis=1), np.stack([v0[zero], q, v2[zero]], axis=1)]
+        sources += [split[zero], split[zero]]
+    three = ~has_zero
+    if(three.any()):
+        q1 = v0[three] + (d0[three] / (d0[three] - d1[three])) * (v1[three] - v0[three])
+        q2 = v0[three] + (d0[three] / (d0[three] - d2[three])) * (v2[three] - v0[three])
+        pieces += [np.stack([v0[three], q1, q2], axis=1), np.stack([q1, v1[three], v2[three]], axis=1), np.stack([q1, v2[three], q2], axis=1)]
+        sources += [split[three]] * 3
+    return np.concatenate(pieces), np.concatenate(sources)
+
+def _candidate_planes(triangles: np.ndarray, other: np.ndarray, tolerance: float, chunk_size: int = 512) -> tuple[np.ndarray, ...]:
+    """
+    Returns the splitting planes for the triangles: the planes of the other triangles, that intersect them
+    (bounding boxes overlap, both straddle the plane of the other and their cuts overlap on the intersection line),
+    and for coplanar pairs the planes through the edges of the other triangle.
+    Returns a mask of the triangles near the other mesh (bounding box overlap with one of its triangles) and
+    (triangle index, plane normal, plane offset, line direction, interval low, interval high) per plane.
+    """
+    normals, offsets = _triangle_planes(triangles)
+    other_normals, other_offsets = _triangle_planes(other)
+    mins, maxs = triangles.min(axis=1) - tolerance, triangles.max(axis=1) + tolerance
+    other_mins, other_maxs = other.min(axis=1), other.max(axis=1)
+    near = np.zeros(len(triangles), dtype=bool)
+    planes = []
+    for chunk in range(0, len(triangles), chunk_size):
+        index = np.arange(chunk, min(chunk + chunk_size, len(triangles)))
+        overlap = np.all((mins[index, None] <= other_maxs[None]) & (maxs[index, None] >= other_mins[None]), axis=2)
+        near[index] = overlap.any(axis=1)
+        i, j = np.nonzero(overlap)
+        if(len(i) == 0):
+            continue
+        i = index[i]
+        # signed distances of the vertices of each triangle to the plane of the other one
+        d_ij = np.einsum('pkj,pj->pk', triangles[i], other_normals[j]) - other_offsets[j][:, None]
+        d_ji = np.einsum('pkj,pj->pk', other[j], normals[i]) - offsets[i][:, None]
+        crosses_other = (d_ij.max(axis=1) > tolerance) & (d_ij.min(axis=1) < -tolerance)
+        other_crosses = (d_ji.max(axis=1) >= -tolerance) & (d_ji.min(axis=1) <= tolerance)
+        candidates = np.flatnonzero(crosses_other & other_crosses)
+        directions = np.cross(normals[i[candidates]], other_normals[j[candidates]])
+        lows, highs = _plane_intervals(other[j[candidates]], d_ji[candidates], directions, tolerance)
+        own_lows, own_highs = _plane_intervals(triangles[i[candidates]], d_ij[candidates], directions, tolerance)
+        intersecting = (own_highs >= lows - tolerance) & (own_lows <= highs + tolerance)
+        candidates, pair_j = candidates[intersecting], j[candidates[intersecting]]
+        planes.append((i[candidates], other_normals[pair_j], other_offsets[pair_j], directions[intersecting], lows[intersecting], highs[intersecting]))
+        # coplanar pairs: split by the planes through the edges of the other triangle (perpendicular to it)
+        coplanar = (np.abs(d_ij).max(axis=1) <= tolerance) & (np.abs(d_ji).max(axis=1) <= tolerance)
+        if(coplanar.any()):
+            other_tri = other[j[coplanar]]
+            unbounded = np.full(np.count_nonzero(coplanar), np.inf)
+            for start, end in ((0, 1), (1, 2), (2, 0)):
+                edge_normals = np.cross(other_normals[j[coplanar]], other_tri[:, end] - other_tri[:, start])
+                edge_normals /= np.maximum(np.linalg.norm(edge_normals, axis=1), 1e-300)[:, None]
+                edge_offsets = (edge_normals * other_tri[:, start]).sum(axis=1)
+                planes.append((i[coplanar], edge_normals, edge_offsets, np.zeros_like(edge_normals), -unbounded, unbounded))
+    if(not planes):
+        return near, np.empty(0, dtype=np.int64), np.empty((0, 3)), np.empty(0), np.empty((0, 3)), np.empty(0), np.empty(0)
+    return near, *(np.concatenate(column) for column in zip(*planes))
+
+def _split_triangles(triangles: np.ndarray, other: np.ndarray, tolerance: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Splits the triangles by the intersecting triangles of the other mesh.
+    Returns the fragments, the index of their source triangle and the mask of the triangles near the other mesh.
+    """
+    # splitting rounds: in round r every fragment is split by the r-th candidate plane of its source triangle
+    near, rows, *planes = _candidate_planes(triangles, other, tolerance)
+    if(len(rows) == 0):
+        return triangles, np.arange(len(triangles)), near
+    order = np.argsort(rows, kind='stable')
+    rows, planes = rows[order], [column[order] for column in planes]
+    counts = np.bincount(rows, minlength=len(triangles))
+    first_plane = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    fragments, parents = triangles, np.arange(len(triangles))
+    for round_idx in range(int(counts.max())):
+        active = counts[parents] > round_idx
+        if(not active.any()):
+            break
+        plane = first_plane[parents[active]] + round_idx
+        pieces, sources = _split_by_planes(fragments[active], *(column[plane] for column in planes[:2]), tolerance, *(column[plane] for column in planes[2:]))
+        fragments = np.concatenate([fragments[~active], pieces])
+        parents = np.concatenate([parents[~active], parents[active][sources]])
+    return fragments, parents, near
+
+def _surface_components(triangles: np.ndarray, mask: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Labels the connected patches (sharing an edge) of the masked triangles, -1 for the others.
+    A patch of triangles away from the other mesh cannot cross its surface, so one inside test per patch is enough.
+    """
+    labels = np.full(len(triangles), -1, dtype=np.int64)
+    index = np.flatnonzero(mask)
+    if(len(index) == 0):
+        return labels
+    keys = np.round(triangles[index].reshape(-1, 3) / tolerance).astype(np.int64)
+    _, vertex_ids = np.unique(keys, axis=0, return_inverse=True)
+    vertex_ids = vertex_ids.reshape(-1, 3)
+    edges = np.sort(np.concatenate([vertex_ids[:, [0, 1]], vertex_ids[:, [1, 2]], vertex_ids[:, [2, 0]]]), axis=1)
+    edge_faces = np.tile(np.arange(len(index)), 3)
+    order = np.lexsort((edges[:, 1], edges[:, 0]))
+    edges, edge_faces = edges[order], edge_faces[order]
+    shared = np.flatnonzero(np.all(edges[1:] == edges[:-1], axis=1))
+    first, second = edge_faces[shared], edge_faces[shared + 1]
+
+    # label propagation with pointer jumping until every patch has the smallest index of its triangles
+    component = np.arange(len(index))
+    while True:
+        previous = component.copy()
+        np.minimum.at(component, first, component[second])
+        np.minimum.at(component, second, component[first])
+        component = component[component]
+        if(np.array_equal(component, previous)):
+            break
+    labels[index] = component
+    return labels
+
+# fixed, arbitrary rotation of the rays, so they are not parallel to the axis aligned faces of typical meshes
+_RAY_ROTATION = np.linalg.qr(np.array([[0.8412, -0.3317, 0.4270], [0.2723, 0.9387, 0.2115], [-0.4671, -0.0931, 0.8793]]))[0]
+
+def points_inside_mesh(points: np.ndarray, triangles: np.ndarray, chunk_size: int = 1 << 20) -> np.ndarray:
+    """
+    Tests, if the points are inside a closed triangle mesh, by the parity of the crossings of a ray from each point.
+    The triangles are binned on a 2D grid perpendicular to the ray direction, so each point is only tested against
+    the triangles of its grid cell.
+    """
+    inside = np.zeros(len(points), dtype=bool)
+    if(len(points) == 0 or len(triangles) == 0):
+        return inside
+    points, triangles = points @ _RAY_ROTATION.T, triangles @ _RAY_ROTATION.T # the rays point in +z
+
+    # 1) (cell, triangle) pairs of a grid with about one triangle per cell
+    origin = triangles[:, :, :2].min(axis=(0, 1))
+    extent = np.maximum(triangles[:, :, :2].max(axis=(0, 1)) - origin, 1e-12)
+    cell_count = max(1, int(np.sqrt(len(triangles))))
+    cell_size = extent / cell_count
+    low = np.clip(((triangles[:, :, :2].min(axis=1) - origin) / cell_size).astype(np.int64), 0, cell_count - 1)
+    high = np.clip(((triangles[:, :, :2].max(axis=1) - origin) / cell_size).astype(np.int64), 0, cell_count - 1)
+    widths = high[:, 0] - low[:, 0] + 1
+    counts = widths * (high[:, 1] - low[:, 1] + 1)
+    pair_triangles = np.repeat(np.arange(len(triangles)), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_cells = (low[pair_triangles, 1] + local // widths[pair_triangles]) * cell_count + low[pair_triangles, 0] + local % widths[pair_triangles]
+    order = np.argsort(pair_cells, kind='stable')
+    pair_cells, pair_triangles = pair_cells[order], pair_triangles[order]
+
+    # 2) crossings of the rays with the triangles of their cells
+    cells = ((points[:, :2] - origin) / cell_size).astype(np.int64)
+    in_grid = np.all((points[:, :2] >= origin) & (cells < cell_count), axis=1)
+    cells = cells[:, 1] * cell_count + cells[:, 0]
+    starts = np.where(in_grid, np.searchsorted(pair_cells, cells, side='left'), 0)
+    ends = np.where(in_grid, np.searchsorted(pair_cells, cells, side='right'), 0)
+    crossings = np.zeros(len(points), dtype=np.int64)
+    batch = max(1, chunk_size // max(int((ends - starts).max()), 1))
+    for chunk in range(0, len(points), batch):
+        chunk_starts, chunk_counts = starts[chunk:chunk + batch], (ends - starts)[chunk:chunk + batch]
+        point_idx = chunk + np.repeat(np.arange(len(chunk_counts)), chunk_counts)
+        triangle_idx = pair_triangles[np.repeat(chunk_starts - np.cumsum(chunk_counts) + chunk_counts, chunk_counts) + np.arange(chunk_counts.sum())]
+        tri, point = triangles[triangle_idx], points[point_idx]
+        # barycentric coordinates of the point in the xy projection of the triangle
+        v0, v1, v2 = tri[:, 1, :2] - tri[:, 0, :2], tri[:, 2, :2] - tri[:, 0, :2], point[:, :2] - tri[:, 0, :2]
+        denominator = v0[:, 0] * v1[:, 1] - v0[:, 1] * v1[:, 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u = (v2[:, 0] * v1[:, 1] - v2[:, 1] * v1[:, 0]) / denominator
+            v = (v0[:, 0] * v2[:, 1] - v0[:, 1] * v2[:, 0]) / denominator
+        hit = (denominator != 0) & (u >= 0) & (v >= 0) & (u + v < 1)
+        z = tri[:, 0, 2] + u * (tri[:, 1, 2] - tri[:, 0, 2]) + v * (tri[:, 2, 2] - tri[:, 0, 2])
+        np.add.at(crossings, point_idx[hit & (z > point[:, 2])], 1)
+    return crossings % 2 == 1
+
+def _classify(fragments: np.ndarray, parents: np.ndarray, components: np.ndarray, other: np.ndarray, probe_distance: float) -> tuple[np.ndarray, np.ndarray]:
+    # inside tests just in front of and behind each fragment: (False, False) outside, (True, True) inside,
+    # (False, True) coplanar with the same orientation, (True, False) coplanar with the opposite orientation;
+    # fragments of a patch away from the other mesh (components >= 0) share the result of one of them
+    front, back = np.zeros(len(fragments), dtype=bool), np.zeros(len(fragments), dtype=bool)
+    if(len(fragments) == 0 or len(other) == 0):
+        return front, back
+    fragment_components = components[parents]
+    _, representatives, patch = np.unique(fragment_components, return_index=True, return_inverse=True)
+    patch = patch.reshape(-1)
+    is_representative = np.zeros(len(fragments), dtype=bool)
+    is_representative[representatives] = True
+    tested = np.flatnonzero((fragment_components < 0) | is_representative)
+
+    centroids = fragments[tested].mean(axis=1)
+    normals, _ = _triangle_planes(fragments[tested])
+    mins, maxs = other.min(axis=(0, 1)) - probe_distance, other.max(axis=(0, 1)) + probe_distance
+    near = np.all((centroids >= mins) & (centroids <= maxs), axis=1) # fragments outside the bbox are outside
+    if(near.any()):
+        probes = np.concatenate([centroids[near] + probe_distance * normals[near], centroids[near] - probe_distance * normals[near]])
+        inside = points_inside_mesh(probes, other)
+        front[tested[near]], back[tested[near]] = inside[:np.count_nonzero(near)], inside[np.count_nonzero(near):]
+
+    in_patch = fragment_components >= 0
+    front[in_patch] = front[representatives][patch[in_patch]]
+    back[in_patch] = back[representatives][patch[in_patch]]
+    return front, back
+
+def _valid_faces(faces: np.ndarray) -> np.ndarray:
+    return faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])]
+
+def _merge_vertices(triangles: np.ndarray, tolerance: float) -> Mesh:
+    if(len(triangles) == 0):
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+    keys = np.round(triangles.reshape(-1, 3) / tolerance).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    vertices = triangles.reshape(-1, 3)[first]
+    return vertices, _valid_faces(inverse.reshape(-1, 3))
+
+def _open_edges(faces: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # all (3F,2) edges, edge k of face f is edges[3 * f + k], and the indices of the edges without a neighbour
+    edges = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    _, edge_ids, counts = np.unique(np.sort(edges, axis=1), axis=0, return_inverse=True, return_counts=True)
+    return edges, np.flatnonzero(counts[edge_ids.reshape(-1)] == 1)
+
+def _boundary_edges(faces: np.ndarray) -> np.ndarray:
+    # directed edges without an opposite edge (an edge used twice in one direction and once in the other is open once)
+    edges = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    keys = np.sort(edges, axis=1)
+    unique_keys, edge_ids = np.unique(keys, axis=0, return_inverse=True)
+    balance = np.zeros(len(unique_keys), dtype=np.int64)
+    np.add.at(balance, edge_ids.reshape(-1), np.where(edges[:, 0] == keys[:, 0], 1, -1))
+    open_keys = np.flatnonzero(balance)
+    directed = np.where((balance[open_keys] > 0)[:, None], unique_keys[open_keys], unique_keys[open_keys][:, ::-1])
+    return np.repeat(directed, np.abs(balance[open_keys]), axis=0)
+
+def _merge_close_vertices(vertices: np.ndarray, faces: np.ndarray, tolerance: float, chunk_size: int) -> np.ndarray:
+    # vertices of open edges closer than the tolerance are merged into the smallest index of their cluster
+    edges, open_edges = _open_edges(faces)
+    candidates = np.unique(edges[open_edges])
+    batch = max(1, chunk_size // max(len(candidates), 1))
+    pairs = [np.empty((0, 2), dtype=np.int64)]
+    for chunk in range(0, len(candidates), batch):
+        close_rows, close_cols = np.nonzero(np.linalg.norm(vertices[candidates[chunk:chunk + batch], None, :] - vertices[candidates][None, :, :], axis=2) < tolerance)
+        pairs.append(np.column_stack([candidates[chunk + close_rows], candidates[close_cols]]))
+    pairs = np.concatenate(pairs)
+    targets = np.arange(len(vertices))
+    while(True): # propagate the minimum along chains of close vertices
+        merged = targets.copy()
+        np.minimum.at(merged, pairs[:, 0], targets[pairs[:, 1]])
+        merged = merged[merged]
+        if(np.array_equal(merged, targets)):
+            break
+        targets = merged
+    return _valid_faces(targets[faces])
+
+def _drop_slivers(vertices: np.ndarray, faces: np.ndarray, tolerance: float) -> np.ndarray:
+    # triangles thinner than the tolerance (an apex on the opposite edge) are cracks, not surface
+    triangles = vertices[faces]
+    longest = np.linalg.norm(triangles[:, [1, 2, 0]] - triangles, axis=2).max(axis=1)
+    double_areas = np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]), axis=1)
+    return faces[double_areas > tolerance * longest]
+
+def _drop_folds(faces: np.ndarray) -> np.ndarray:
+    # a triangle and the same triangle in the opposite orientation enclose no volume and cancel each other
+    keys = np.sort(faces, axis=1)
+    first = np.argmin(faces, axis=1)
+    forward = faces[np.arange(len(faces)), (first + 1) % 3] == keys[:, 1]
+    _, triangle_ids = np.unique(keys, axis=0, return_inverse=True)
+    triangle_ids = triangle_ids.reshape(-1)
+    balance = np.zeros(len(faces), dtype=np.int64)
+    np.add.at(balance, triangle_ids, np.where(forward, 1, -1))
+    # keep |balance| triangles of the prevailing orientation
+    groups = 2 * triangle_ids + forward
+    order = np.argsort(groups, kind='stable')
+    rank = np.empty(len(faces), dtype=np.int64)
+    rank[order] = np.arange(len(faces)) - np.searchsorted(groups[order], groups[order])
+    return faces[(forward == (balance[triangle_ids] > 0)) & (rank < np.abs(balance[triangle_ids]))]
+
+def _split_t_junctions(vertices: np.ndarray, faces: np.ndarray, tolerance: float, chunk_size: int) -> tuple[np.ndarray, np.ndarray, bool]:
+    # vertices on an open edge of a neighbouring fragment (T-junctions) are inserted into that edge
+    edges, open_edges = _open_edges(faces)
+    candidates = np.unique(edges[open_edges]) # T-junctions only occur at the vertices of open edges
+    hit_edges, hit_vertices, hit_t = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)], [np.empty(0)]
+    batch = max(1, chunk_size // max(len(candidates), 1))
+    for chunk in range(0, len(open_edges), batch):
+        edge_idx = open_edges[chunk:chunk + batch]
+        a, b = vertices[edges[edge_idx, 0]], vertices[edges[edge_idx, 1]]
+        d = b - a
+        squared = np.maximum(np.einsum('ij,ij->i', d, d), tolerance**2)
+        offsets = vertices[candidates][None, :, :] - a[:, None, :]
+        t = np.einsum('eci,ei->ec', offsets, d) / squared[:, None]
+        distances = np.linalg.norm(offsets - t[:, :, None] * d[:, None, :], axis=2)
+        margin = tolerance / np.sqrt(squared)[:, None]
+        own = np.any(faces[edge_idx // 3][:, None, :] == candidates[None, :, None], axis=2)
+        edge_hits, candidate_hits = np.nonzero((t > margin) & (t < 1.0 - margin) & (distances < tolerance) & ~own)
+        hit_edges.append(edge_idx[edge_hits])
+        hit_vertices.append(candidates[candidate_hits])
+        hit_t.append(t[edge_hits, candidate_hits])
+    hit_edges, hit_vertices, hit_t = np.concatenate(hit_edges), np.concatenate(hit_vertices), np.concatenate(hit_t)
+    if(len(hit_edges) == 0):
+        return vertices, faces, False
+    split = np.unique(hit_edges // 3)
+    # polygons of the split triangles: corner k followed by the points on its edge k -> k+1, sorted by t
+    corner_faces = np.repeat(split, 3)
+    corner_sides = np.tile(np.arange(3), len(split))
+    polygon_faces = np.concatenate([corner_faces, hit_edges // 3])
+    polygon_sides = np.concatenate([corner_sides, hit_edges % 3])
+    polygon_t = np.concatenate([np.full(len(corner_faces), -1.0), hit_t])
+    polygon_vertices = np.concatenate([faces[corner_faces, corner_sides], hit_vertices])
+    order = np.lexsort((polygon_t, polygon_sides, polygon_faces))
+    polygon_faces, polygon_vertices = polygon_faces[order], polygon_vertices[order]
+    # fan around the opposite corner, if the points lie on one edge, otherwise around the centroid
+    sides = np.zeros((len(split), 3), dtype=bool)
+    sides[np.searchsorted(split, hit_edges // 3), hit_edges % 3] = True
+    single = sides.sum(axis=1) == 1
+    apexes = np.where(single, faces[split, (np.argmax(sides, axis=1) + 2) % 3], len(vertices) + np.cumsum(~single) - 1)
+    index = np.arange(len(polygon_faces))
+    last = np.searchsorted(polygon_faces, polygon_faces, side='right')
+    following = np.where(index + 1 < last, index + 1, np.searchsorted(polygon_faces, polygon_faces, side='left'))
+    fans = _valid_faces(np.column_stack([apexes[np.searchsorted(split, polygon_faces)], polygon_vertices, polygon_vertices[following]]))
+    keep = np.ones(len(faces), dtype=bool)
+    keep[split] = False
+    return np.concatenate([vertices, vertices[faces[split[~single]]].mean(axis=1)]), np.concatenate([faces[keep], fans]), True
+
+def _boundary_loops(boundary: np.ndarray) -> list[list[int]]:
+    # every vertex has as many incoming as outgoing boundary edges, so walking along them always closes a loop;
+    # a walk that comes back to one of its vertices is cut there, so the loops are simple
+    successors = {}
+    for start, end in boundary.tolist():
+        successors.setdefault(start, []).append(end)
+    loops = []
+    while(successors):
+        path = [next(iter(successors))]
+        positions = {path[0]: 0}
+        while(path[-1] in successors):
+            current = path[-1]
+            following = successors[current].pop()
+            if(not successors[current]):
+                del successors[current]
+            if(following in positions):
+                position = positions[following]
+                loops.append(path[position:])
+                for vertex in path[position + 1:]:
+                    del positions[vertex]
+                del path[position + 1:]
+            else:
+                positions[following] = len(path)
+                path.append(following)
+    return [loop for loop in loops if len(loop) >= 3]
+
+def _fill_cracks(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    # the remaining open edges form thin cracks along the intersection curves, which are closed by clipping the
+    # ear with the shortest diagonal until a triangle is left (the triangles run against the boundary edges)
+    fills = []
+    for loop in _boundary_loops(_boundary_edges(faces)):
+        points = vertices[loop]
+        while(len(loop) > 3):
+            ear = int(np.argmin(np.linalg.norm(np.roll(points, -1, axis=0) - np.roll(points, 1, axis=0), axis=1)))
+            fills.append((loop[(ear + 1) % len(loop)], loop[ear], loop[ear - 1]))
+            del loop[ear]
+            points = np.delete(points, ear, axis=0)
+        fills.append((loop[2], loop[1], loop[0]))
+    return np.concatenate([faces, np.array(fills, dtype=np.int64).reshape(-1, 3)])
+
+def _weld_open_edges(vertices: np.ndarray, faces: np.ndarray, tolerance: float, chunk_size: int = 1 << 20) -> Mesh:
+    # the intersection curves are computed from both operands, so the fragments along them don't share all edges
+    # and at grazing angles their split points deviate by more than the tolerance:
+    # 1) close vertices of open edges, that the grid of _merge_vertices kept apart, are merged and slivers dropped
+    # 2) T-junctions are split (repeatedly, as the fans create new open edges), folded pairs of triangles cancelled
+    # 3) the cracks left over are filled, so every directed edge is matched by an opposite edge
+    if(len(faces) == 0):
+        return vertices, faces
+    faces = _merge_close_vertices(vertices, faces, 2 * tolerance, chunk_size)
+    faces = _drop_slivers(vertices, faces, tolerance)
+    for _ in range(8):
+        vertices, faces, changed = _split_t_junctions(vertices, faces, tolerance, chunk_size)
+        if(not changed):
+            break
+    faces = _drop_folds(_fill_cracks(vertices, _drop_folds(faces)))
+    used, faces = np.unique(faces, return_inverse=True) # drop the merged vertices
+    return vertices[used], faces.reshape(-1, 3)
+
+class NumpyCSGBackend(CSGBackend):
+    """
+    Vectorized CSG: local splitting by the intersecting triangles and classification by ray casting
+    (see the module docstring).
+    Args:
+        tolerance (float): distance below which points are treated as lying on a plane, relative to the size of the operands
+    """
+    name = "numpy"
+
+    def __init__(self, tolerance: float = 1e-9):
+        self.tolerance = tolerance
+
+    def _run(self, a: Mesh, b: Mesh, operation: str) -> Mesh:
+        tri_a, tri_b = np.asarray(a[0], dtype=np.float64)[a[1]], np.asarray(b[0], dtype=np.float64)[b[1]]
+        all_points = np.concatenate([tri_a.reshape(-1, 3), tri_b.reshape(-1, 3)])
+        scale = max(float(np.ptp(all_points, axis=0).max()), 1.0) if len(all_points) else 1.0
+        tolerance = self.tolerance * scale
+
+        fragments_a, parents_a, near_a = _split_triangles(tri_a, tri_b, tolerance)
+        fragments_b, parents_b, near_b = _split_triangles(tri_b, tri_a, tolerance)
+        components_a, components_b = _surface_components(tri_a, ~near_a, 1e2 * tolerance), _surface_components(tri_b, ~near_b, 1e2 * tolerance)
+        front_a, back_a = _classify(fragments_a, parents_a, components_a, tri_b, 1e3 * tolerance)
+        front_b, back_b = _classify(fragments_b, parents_b, components_b, tri_a, 1e3 * tolerance)
+        outside_a, inside_a, same_a, opposite_a = ~front_a & ~back_a, front_a & back_a, ~front_a & back_a, front_a & ~back_a
+        outside_b, inside_b = ~front_b & ~back_b, front_b & back_b
+
+        # coplanar faces with the same orientation are kept once (from a), with the opposite orientation they
+        # are internal faces (union), touching faces (intersection) or stay a boundary of a (difference)
+        if(operation == "union"):
+            keep_a, keep_b, flip_b = outside_a | same_a, outside_b, False
+        elif(operation == "intersection"):
+            keep_a, keep_b, flip_b = inside_a | same_a, inside_b, False
+        else:
+            keep_a, keep_b, flip_b = outside_a | opposite_a, inside_b, True
+        kept_b = fragments_b[keep_b][:, ::-1] if flip_b else fragments_b[keep_b]
+        vertices, faces = _merge_vertices(np.concatenate([fragments_a[keep_a], kept_b]), 1e2 * tolerance)
+        return _weld_open_edges(vertices, faces, 1e3 * tolerance)
+
+    def union(self, a: Mesh, b: Mesh) -> Mesh:
+        return self._run(a, b, "union")
+
+    def difference(self, a: Mesh, b: Mesh) -> Mesh:
+        return self._run(a, b, "difference")
+
+    def intersection(self, a: Mesh, b: Mesh) -> Mesh:
+        return self._run(a, b, "intersection")
+
+CSG_BACKENDS = {backend.name: backend for backend in (PyCSGBackend, NumpyCSGBackend)}
+
+def get_csg_backend(name: str = "numpy") -> CSGBackend:
+    """Returns a CSG backend by its name: 'numpy' (default) or 'pycsg'."""
+    if(name not in CSG_BACKENDS):
+        raise ValueError(f"Unknown CSG backend '{name}', available: {', '.join(CSG_BACKENDS)}")
+    return CSG_BACKENDS[name]()
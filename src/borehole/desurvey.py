@@ -0,0 +1,139 @@
+"""
+Vectorized minimum curvature desurvey for many boreholes at once.
+
+All survey stations and all resampling depths of N boreholes are passed as flat arrays,
+the boreholes are separated by offsets (ragged arrays), i.e. the stations of borehole i are
+md[station_offsets[i]:station_offsets[i+1]].
+
+References:
+- https://www.drillingformulas.com/minimum-curvature-method/
+"""
+
+import numpy as np
+
+from borehole.borehole import Borehole, DrillingPath
+
+def direction_vectors(inc: np.ndarray, azi: np.ndarray) -> np.ndarray:
+    """
+    Returns the unit tangents of survey stations as (northing, easting, vertical depth), same convention as wellpathpy.
+    Args:
+        inc (np.ndarray): inclination in degrees from the vertical
+        azi (np.ndarray): azimuth in degrees
+    Returns:
+        np.ndarray: (N,3) unit vectors
+    """
+    inc, azi = np.radians(inc), np.radians(azi)
+    return np.column_stack([np.sin(inc) * np.cos(azi), np.sin(inc) * np.sin(azi), np.cos(inc)])
+
+def _arc_positions(start: np.ndarray, tangent_start: np.ndarray, tangent_end: np.ndarray, dogleg: np.ndarray, angle: np.ndarray, length: np.ndarray) -> np.ndarray:
+    """
+    Returns the points on the circular arcs starting at 'start' with the tangent 'tangent_start', which turn by
+    'dogleg' (radians) towards 'tangent_end' over the whole segment. 'length' is the arc length from the start
+    and 'angle' the angle turned over this length.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # unit normal in the plane of the arc, pointing to the centre of the circle
+        normal = tangent_end - np.cos(dogleg)[:, None] * tangent_start
+        normal_length = np.linalg.norm(normal, axis=1)
+        normal = np.where((normal_length > 1e-12)[:, None], normal / normal_length[:, None], 0.0)
+        # R*sin(a) and R*(1-cos(a)) with R = length/a, both evaluate to (length, 0) on a straight segment
+        is_curved = angle > 1e-12
+        along = np.where(is_curved, length * np.sin(angle) / angle, length)
+        across = np.where(is_curved, length * (1 - np.cos(angle)) / angle, 0.0)
+    return start + along[:, None] * tangent_start + across[:, None] * normal
+
+def desurvey_minimum_curvature(
+    md: np.ndarray,
+    inc: np.ndarray,
+    azi: np.ndarray,
+    station_offsets: np.ndarray,
+    depths: np.ndarray,
+    depth_offsets: np.ndarray,
+) -> np.ndarray:
+    """
+    Calculates the minimum curvature positions of many boreholes and resamples them to the given measured depths.
+    The first station of each borehole is located at (0, 0, 0). Depths outside of the surveyed range are
+    extrapolated along the tangent of the first/last station (wellpathpy drops these depths).
+    Args:
+        md (np.ndarray): measured depths of all survey stations (flat, ascending within each borehole)
+        inc (np.ndarray): inclination in degrees from the vertical of all survey stations (flat)
+        azi (np.ndarray): azimuth in degrees of all survey stations (flat)
+        station_offsets (np.ndarray): (N+1,) start index of the stations of each borehole, the last value is len(md)
+        depths (np.ndarray): the measured depths to resample onto (flat)
+        depth_offsets (np.ndarray): (N+1,) start index of the resampling depths of each borehole
+    Returns:
+        np.ndarray: (len(depths), 3) positions as (northing, easting, true vertical depth)
+    """
+    md, inc, azi, depths = (np.asarray(a, dtype=np.float64) for a in (md, inc, azi, depths))
+    station_offsets, depth_offsets = np.asarray(station_offsets), np.asarray(depth_offsets)
+    hole_count = len(station_offsets) - 1
+    station_starts, station_ends = station_offsets[:-1], station_offsets[1:]
+
+    # 1) Minimum curvature station positions, segment k connects the stations k and k+1 (of the same borehole)
+    tangents = direction_vectors(inc, azi)
+    upper, lower = tangents[:-1], tangents[1:]
+    dogleg = np.arccos(np.clip(np.einsum('ij,ij->i', upper, lower), -1.0, 1.0))
+    md_diff = np.diff(md)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio_factor = np.where(dogleg > 1e-12, 2 * np.tan(dogleg / 2) / dogleg, 1.0)
+    steps = np.zeros((len(md), 3))
+    steps[1:] = (md_diff * ratio_factor / 2)[:, None] * (upper + lower)
+    steps[station_starts[station_starts < len(md)]] = 0.0 # no step across borehole boundaries
+    cumulative = np.cumsum(steps, axis=0)
+    positions = cumulative - np.repeat(cumulative[np.minimum(station_starts, len(md) - 1)], station_ends - station_starts, axis=0)
+
+    # 2) Locate the survey station above each depth with one binary search over all boreholes,
+    # the measured depths of each borehole are shifted so the flat array is ascending
+    depth_hole = np.repeat(np.arange(hole_count), np.diff(depth_offsets))
+    span = (md.max() - md.min() + depths.max() - depths.min() + 1.0) if len(md) and len(depths) else 1.0
+    station_shift = np.repeat(np.arange(hole_count) * 2 * span, station_ends - station_starts)
+    md_shifted = md - md.min() + station_shift if len(md) else md
+    depths_shifted = depths - (md.min() if len(md) else 0.0) + depth_hole * 2 * span
+    station = np.searchsorted(md_shifted, depths_shifted, side='right') - 1
+    station = np.clip(station, station_starts[depth_hole], station_ends[depth_hole] - 1)
+
+    # 3) Interpolate on the arcs, or extrapolate along the tangent above the first / below the last station
+    has_next = station + 1 < station_ends[depth_hole]
+    is_above = depths < md[station]
+    next_station = np.where(has_next, station + 1, station)
+    segment_length = md[next_station] - md[station]
+    length = np.where(is_above, 0.0, depths - md[station])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(has_next & (segment_length > 0), length / segment_length, 0.0)
+    segment_dogleg = np.where(has_next & ~is_above, dogleg[np.minimum(station, len(dogleg) - 1)] if len(dogleg) else 0.0, 0.0)
+    resampled = _arc_positions(positions[station], tangents[station], tangents[next_station], segment_dogleg, segment_dogleg * fraction, length)
+    resampled = np.where(is_above[:, None], positions[station] + (depths - md[station])[:, None] * tangents[station], resampled)
+    return resampled
+
+def calculate_drilling_paths(boreholes: list[Borehole], spacing: float = 1.0) -> None:
+    """
+    Batch version of Borehole.calculate_drilling_path: desurveys all boreholes at once with
+    desurvey_minimum_curvature and writes the results into each Borehole.drilling_xyzpath.
+    As in Borehole.calculate_drilling_path the dip of the survey is used as inclination.
+    Args:
+        boreholes (list[Borehole]): the boreholes, each with a drilling_survey
+        spacing (float): the resampling spacing for boreholes without depths
+    """
+    for borehole in boreholes:
+        borehole._update_stale_depths(spacing)
+
+    station_counts = [len(borehole.drilling_survey) for borehole in boreholes]
+    depth_counts = [len(borehole._drilling_depths) for borehole in boreholes]
+    station_offsets = np.concatenate([[0], np.cumsum(station_counts)]).astype(int)
+    depth_offsets = np.concatenate([[0], np.cumsum(depth_counts)]).astype(int)
+    md = np.fromiter((segment.depth for borehole in boreholes for segment in borehole.drilling_survey), dtype=np.float64, count=station_offsets[-1])
+    inc = np.fromiter((segment.dip for borehole in boreholes for segment in borehole.drilling_survey), dtype=np.float64, count=station_offsets[-1])
+    azi = np.fromiter((segment.azimuth for borehole in boreholes for segment in borehole.drilling_survey), dtype=np.float64, count=station_offsets[-1])
+    depths = np.concatenate([np.asarray(borehole._drilling_depths, dtype=np.float64) for borehole in boreholes]) if boreholes else np.empty(0)
+
+    positions = desurvey_minimum_curvature(md, inc, azi, station_offsets, depths, depth_offsets)
+
+    # Translate the positions to the georeferenced position of the collars
+    hole_index = np.repeat(np.arange(len(boreholes)), depth_counts)
+    eastings = np.array([borehole.easting for borehole in boreholes])[hole_index] + positions[:, 1]
+    northings = np.array([borehole.northing for borehole in boreholes])[hole_index] + positions[:, 0]
+    elevations = np.array([borehole.elevation for borehole in boreholes])[hole_index] - positions[:, 2]
+    paths = np.column_stack([eastings, northings, elevations, depths])
+    for idx, borehole in enumerate(boreholes):
+        borehole.drilling_xyzpath = DrillingPath(paths[depth_offsets[idx]:depth_offsets[idx + 1]])
+        borehole._path_survey_inputs = borehole._get_survey_inputs()
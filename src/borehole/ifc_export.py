@@ -0,0 +1,151 @@
+"""
+Export of Borehole instances to IFC as parametric swept disk solids (and of the tolerance cones of planned boreholes).
+
+Each lithology interval and each casing becomes one element with an IfcSweptDiskSolid along its part of the
+drilling path (IfcIndexedPolyCurve, relative to the collar), so the file size scales with the number of path
+points instead of the number of triangles.
+"""
+
+import logging
+
+import ifcopenshell
+import ifcopenshell.util.unit
+import numpy as np
+
+from borehole.borehole import Borehole
+from borehole.clash import PlannedBorehole, planned_borehole_cones
+from ifc_utils.ifc_utils import create_elements_in_bulk
+from ifc_utils.ifc_representations import create_swept_disk_representation, create_polyline_curve, create_axis_representation, create_triangulated_face_set_representation
+
+def _collect_borehole_segments(borehole: Borehole) -> list[dict]:
+    # intervals (or the whole hole, if there are none) and casings, in the order of the depths
+    segments = [
+        {"kind": "Interval", "depth_from": interval.depth_from, "depth_to": interval.depth_to, "radius": borehole.drilling_radius, "inner_radius": None, "lithology": interval.lithology}
+        for interval in sorted(borehole.intervals or [], key=lambda interval: interval.depth_from)
+    ]
+    if(not segments):
+        segments.append({"kind": "Borehole", "depth_from": 0.0, "depth_to": borehole.max_depth, "radius": borehole.drilling_radius, "inner_radius": None, "lithology": None})
+    for casing in sorted(borehole.casings or [], key=lambda casing: casing.depth_from):
+        inner_radius = borehole.drilling_radius if borehole.drilling_radius < casing.casing_radius else None
+        segments.append({"kind": "Casing", "depth_from": casing.depth_from, "depth_to": casing.depth_to, "radius": casing.casing_radius, "inner_radius": inner_radius, "lithology": None})
+    return segments
+
+def add_boreholes_to_ifc(
+    model: ifcopenshell.file,
+    body_context: ifcopenshell.entity_instance,
+    boreholes: list[Borehole],
+    container: ifcopenshell.entity_instance | None = None,
+    axis_context: ifcopenshell.entity_instance | None = None,
+    curve_type: str = "IfcIndexedPolyCurve",
+    pset_name: str = "Borehole",
+) -> list[ifcopenshell.entity_instance]:
+    """
+    Creates one IfcBuildingElementProxy per interval and casing of the boreholes, placed at the collar.
+    - Body: IfcSweptDiskSolid along the sub-path of the interval (casings are hollow, if the drilling radius is smaller)
+    - Axis (optional): the same directrix curve as lightweight overview representation
+    - Pset: HoleId, Lithology, DepthFrom, DepthTo and Radius (in meters), shared between identical values
+    Args:
+        model (ifcopenshell.file): e.g. from init_minimal_ifc_model
+        body_context (ifcopenshell.entity_instance): the Model/Body subcontext
+        boreholes (list[Borehole]): boreholes with calculated drilling paths
+        container (ifcopenshell.entity_instance, optional): e.g. the IfcSite
+        axis_context (ifcopenshell.entity_instance, optional): a Model/Axis subcontext for the overview representation
+        curve_type (str): "IfcIndexedPolyCurve" (compact) or "IfcPolyline"
+        pset_name (str): the name of the property set
+    Returns:
+        list[ifcopenshell.entity_instance]: the created elements
+    """
+    unit_scale = ifcopenshell.util.unit.calculate_unit_scale(model)
+
+    # 1) Collect the segments with their paths relative to the collar (in project units)
+    collars, names, kinds, paths, rows = [], [], [], [], []
+    for borehole in boreholes:
+        collar = np.array([borehole.easting, borehole.northing, borehole.elevation])
+        for segment in _collect_borehole_segments(borehole):
+            xyz = borehole.get_sub_path(segment["depth_from"], segment["depth_to"]).xyz
+            if(len(xyz) < 2):
+                logging.warning(f"{borehole.hole_id}: {segment['kind']} {segment['depth_from']}-{segment['depth_to']} has less than two path points and is skipped")
+                continue
+            collars.append(collar)
+            names.append(f"{borehole.hole_id} {segment['lithology'] or segment['kind']} {segment['depth_from']}-{segment['depth_to']}")
+            kinds.append(segment["kind"])
+            paths.append((xyz - collar) / unit_scale)
+            rows.append((borehole.hole_id, segment))
+    if(not rows):
+        return []
+
+    # 2) Elements, placements, psets and containment in bulk
+    elements = create_elements_in_bulk(
+        model,
+        np.array(collars),
+        names=names,
+        pset_name=pset_name,
+        properties={
+            "HoleId": [hole_id for hole_id, _ in rows],
+            "Lithology": [segment["lithology"] for _, segment in rows],
+            "DepthFrom": [float(segment["depth_from"]) for _, segment in rows],
+            "DepthTo": [float(segment["depth_to"]) for _, segment in rows],
+            "Radius": [float(segment["radius"]) for _, segment in rows],
+        },
+        container=container,
+    )
+
+    # 3) Parametric geometry along the sub-paths
+    for element, kind, path, (_, segment) in zip(elements, kinds, paths, rows):
+        element.ObjectType = kind
+        directrix = create_polyline_curve(model, path, curve_type=curve_type)
+        inner_radius = segment["inner_radius"] / unit_scale if segment["inner_radius"] is not None else None
+        representations = [create_swept_disk_representation(model, body_context, directrix, segment["radius"] / unit_scale, inner_radius)]
+        if(axis_context is not None):
+            representations.append(create_axis_representation(model, axis_context, directrix))
+        element.Representation = model.createIfcProductDefinitionShape(None, None, representations)
+    return elements
+
+def add_tolerance_cones_to_ifc(
+    model: ifcopenshell.file,
+    body_context: ifcopenshell.entity_instance,
+    planned_boreholes: list[PlannedBorehole],
+    container: ifcopenshell.entity_instance | None = None,
+    num_segments: int = 32,
+    pset_name: str = "PlannedBorehole",
+) -> list[ifcopenshell.entity_instance]:
+    """
+    Creates one IfcBuildingElementProxy per planned borehole, placed at the collar, with its oriented tolerance cone
+    as IfcTriangulatedFaceSet (all cones are built at once, see planned_borehole_cones).
+    - Pset: HoleId, Length, StartRadius, EndRadius and ToleranceFactor (in meters)
+    Args:
+        model (ifcopenshell.file): e.g. from init_minimal_ifc_model
+        body_context (ifcopenshell.entity_instance): the Model/Body subcontext
+        planned_boreholes (list[PlannedBorehole]): e.g. from planned_boreholes_from_rows
+        container (ifcopenshell.entity_instance, optional): e.g. the IfcSite
+        num_segments (int): number of vertices per ring of the cones
+        pset_name (str): the name of the property set
+    Returns:
+        list[ifcopenshell.entity_instance]: the created elements
+    """
+    if(not planned_boreholes):
+        return []
+    unit_scale = ifcopenshell.util.unit.calculate_unit_scale(model)
+    vertices, faces = planned_borehole_cones(planned_boreholes, num_segments=num_segments)
+    collars = np.array([borehole.start for borehole in planned_boreholes], dtype=np.float64)
+    vertices = (vertices - collars[:, None, :]) / unit_scale # relative to the placement at the collar
+
+    elements = create_elements_in_bulk(
+        model,
+        collars,
+        names=[borehole.hole_id for borehole in planned_boreholes],
+        pset_name=pset_name,
+        properties={
+            "HoleId": [borehole.hole_id for borehole in planned_boreholes],
+            "Length": [borehole.length for borehole in planned_boreholes],
+            "StartRadius": [float(borehole.start_radius) for borehole in planned_boreholes],
+            "EndRadius": [borehole.end_radius for borehole in planned_boreholes],
+            "ToleranceFactor": [float(borehole.tolerance_factor) for borehole in planned_boreholes],
+        },
+        container=container,
+    )
+    for element, cone_vertices in zip(elements, vertices):
+        element.ObjectType = "ToleranceCone"
+        representation = create_triangulated_face_set_representation(model, body_context, cone_vertices, faces)
+        element.Representation = model.createIfcProductDefinitionShape(None, None, [representation])
+    return elements
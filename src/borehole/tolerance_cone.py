@@ -0,0 +1,96 @@
+"""
+Vectorized tolerance cones of planned boreholes.
+
+The tolerance cone of a straight drilling is a conical frustum along its axis, whose radius grows from the start
+radius by the tolerance factor per meter. All cones share the same topology (two rings of num_segments vertices
+and two cap centres), so the vertices of N cones are generated at once as a (N,V,3) array with one shared
+(F,3) triangle array.
+"""
+
+import numpy as np
+
+def end_points_from_orientation(collars: np.ndarray, dip: np.ndarray, azimuth: np.ndarray, length: np.ndarray) -> np.ndarray:
+    """
+    Calculates the end points of straight drillings from their collar, orientation and length.
+    Args:
+        collars (np.ndarray): (N,3) collar points as (easting, northing, elevation)
+        dip (np.ndarray): (N,) dip in degrees, 0° = horizontal, 90° = vertical down (as in SurveySegment)
+        azimuth (np.ndarray): (N,) azimuth in degrees, 0° = North, 90° = East
+        length (np.ndarray): (N,) drilling length in meters
+    Returns:
+        np.ndarray: (N,3) end points
+    """
+    dip, azimuth = np.radians(np.asarray(dip, dtype=np.float64)), np.radians(np.asarray(azimuth, dtype=np.float64))
+    directions = np.column_stack([np.cos(dip) * np.sin(azimuth), np.cos(dip) * np.cos(azimuth), -np.sin(dip)])
+    return np.asarray(collars, dtype=np.float64).reshape(-1, 3) + np.asarray(length, dtype=np.float64).reshape(-1, 1) * directions
+
+def _perpendicular_frames(axes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # two unit vectors perpendicular to each (unit) axis, built from the least aligned world axis
+    helpers = np.zeros_like(axes)
+    helpers[np.arange(len(axes)), np.argmin(np.abs(axes), axis=1)] = 1.0
+    normals = np.cross(axes, helpers)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    return normals, np.cross(axes, normals)
+
+def cone_faces(num_segments: int = 32, caps: bool = True) -> np.ndarray:
+    """
+    Returns the (F,3) triangles shared by all cones of tolerance_cone_meshes (outward normals):
+    vertices 0..S-1 are the start ring, S..2S-1 the end ring, 2S and 2S+1 the start and end cap centres.
+    """
+    segment = np.arange(num_segments)
+    following = (segment + 1) % num_segments
+    faces = [
+        np.column_stack([segment, following, num_segments + following]),
+        np.column_stack([segment, num_segments + following, num_segments + segment]),
+    ]
+    if(caps):
+        faces.append(np.column_stack([np.full(num_segments, 2 * num_segments), following, segment]))
+        faces.append(np.column_stack([np.full(num_segments, 2 * num_segments + 1), num_segments + segment, num_segments + following]))
+    return np.concatenate(faces).astype(np.int64)
+
+def tolerance_cone_meshes(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    start_radii: float | np.ndarray = 0.05,
+    tolerance_factors: float | np.ndarray = 0.02,
+    num_segments: int = 32,
+    caps: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the oriented tolerance cones (conical frustums) of many straight drillings at once.
+    Args:
+        starts (np.ndarray): (N,3) start points (collars)
+        ends (np.ndarray): (N,3) end points, e.g. from end_points_from_orientation
+        start_radii (float | np.ndarray): radius at the start, scalar or (N,)
+        tolerance_factors (float | np.ndarray): growth of the radius per meter of length, scalar or (N,)
+        num_segments (int): number of vertices per ring
+        caps (bool): close both ends with triangle fans
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the (N,V,3) vertices of each cone and the shared (F,3) triangles (see cone_faces)
+    """
+    starts, ends = np.asarray(starts, dtype=np.float64).reshape(-1, 3), np.asarray(ends, dtype=np.float64).reshape(-1, 3)
+    axes = ends - starts
+    lengths = np.linalg.norm(axes, axis=1)
+    start_radii = np.broadcast_to(np.asarray(start_radii, dtype=np.float64), lengths.shape)
+    tolerance_factors = np.broadcast_to(np.asarray(tolerance_factors, dtype=np.float64), lengths.shape)
+    finite = np.all(np.isfinite(starts), axis=1) & np.all(np.isfinite(ends), axis=1) & np.isfinite(start_radii) & np.isfinite(tolerance_factors)
+    if(not np.all(finite)):
+        raise ValueError(f"Tolerance cones need finite points, radii and tolerance factors, the cones {np.flatnonzero(~finite)[:10].tolist()} have NaN or inf values.")
+    if(np.any(lengths == 0.0)):
+        raise ValueError("Tolerance cones need start and end points, that are not identical.")
+    axes /= lengths[:, None]
+    end_radii = start_radii + lengths * tolerance_factors
+
+    # unit circle in the frame of every axis: (N,S,3)
+    normals, binormals = _perpendicular_frames(axes)
+    angles = np.linspace(0.0, 2.0 * np.pi, num_segments, endpoint=False)
+    circles = np.cos(angles)[None, :, None] * normals[:, None, :] + np.sin(angles)[None, :, None] * binormals[:, None, :]
+
+    vertices = np.empty((len(starts), 2 * num_segments + 2, 3))
+    vertices[:, :num_segments] = starts[:, None, :] + start_radii[:, None, None] * circles
+    vertices[:, num_segments:2 * num_segments] = ends[:, None, :] + end_radii[:, None, None] * circles
+    vertices[:, 2 * num_segments] = starts
+    vertices[:, 2 * num_segments + 1] = ends
+    if(not caps):
+        vertices = vertices[:, :2 * num_segments]
+    return vertices, cone_faces(num_segments, caps=caps)
@@ -0,0 +1,239 @@
+"""
+Vectorized tube meshes along drilling paths.
+
+All tubes share the same ring topology (num_segments vertices per ring), so the ring vertices and the
+triangle indices of a whole path are generated with NumPy at once. The rings are oriented by parallel
+transport frames (double reflection method), which don't twist on curved ("banana-shaped") holes.
+
+References:
+- Wang et al. (2008): Computation of rotation minimizing frames, ACM Transactions on Graphics 27(1)
+"""
+
+import numpy as np
+
+from borehole.borehole import Borehole
+
+def _remove_duplicate_points(xyz: np.ndarray, radius: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # zero length segments have no direction, the radius of the following segment is kept
+    keep = np.ones(len(xyz), dtype=bool)
+    keep[1:] = np.linalg.norm(np.diff(xyz, axis=0), axis=1) > 1e-9
+    segment_keep = keep[1:]
+    return xyz[keep], radius[segment_keep]
+
+def parallel_transport_frames(xyz: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates rotation minimizing frames at the points of a path with the double reflection method.
+    The tangent of an inner point bisects the directions of its two segments (mitred rings).
+    Args:
+        xyz (np.ndarray): (N,3) path points without duplicates, N >= 2
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (N,3) unit tangents, normals and binormals
+    """
+    directions = np.diff(xyz, axis=0)
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    tangents = np.empty_like(xyz)
+    tangents[0], tangents[-1] = directions[0], directions[-1]
+    bisectors = directions[:-1] + directions[1:]
+    bisector_length = np.linalg.norm(bisectors, axis=1)
+    tangents[1:-1] = np.where((bisector_length > 1e-9)[:, None], bisectors / np.maximum(bisector_length, 1e-12)[:, None], directions[1:])
+
+    # initial normal: perpendicular to the first tangent, built from the least aligned world axis
+    axis = np.zeros(3)
+    axis[np.argmin(np.abs(tangents[0]))] = 1.0
+    normal = np.cross(tangents[0], axis)
+    normal /= np.linalg.norm(normal)
+
+    # each frame depends on the previous one, the reflections are done on plain floats
+    normals = [normal.tolist()]
+    point_list, tangent_list = xyz.tolist(), tangents.tolist()
+    rx, ry, rz = normals[0]
+    for idx in range(len(point_list) - 1):
+        (x0, y0, z0), (x1, y1, z1) = point_list[idx], point_list[idx + 1]
+        (tx, ty, tz), (ux, uy, uz) = tangent_list[idx], tangent_list[idx + 1]
+        # 1) reflect normal and tangent at the bisecting plane of the two points
+        vx, vy, vz = x1 - x0, y1 - y0, z1 - z0
+        c1 = vx * vx + vy * vy + vz * vz
+        f = 2.0 / c1 * (vx * rx + vy * ry + vz * rz)
+        lx, ly, lz = rx - f * vx, ry - f * vy, rz - f * vz
+        f = 2.0 / c1 * (vx * tx + vy * ty + vz * tz)
+        wx, wy, wz = ux - (tx - f * vx), uy - (ty - f * vy), uz - (tz - f * vz)
+        # 2) reflect at the plane between the reflected and the next tangent
+        c2 = wx * wx + wy * wy + wz * wz
+        if(c2 > 1e-18):
+            f = 2.0 / c2 * (wx * lx + wy * ly + wz * lz)
+            lx, ly, lz = lx - f * wx, ly - f * wy, lz - f * wz
+        rx, ry, rz = lx, ly, lz
+        normals.append([rx, ry, rz])
+
+    normals = np.array(normals)
+    # remove the numerical drift from the tangents (the frames stay orthonormal)
+    normals -= np.einsum('ij,ij->i', normals, tangents)[:, None] * tangents
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    binormals = np.cross(tangents, normals)
+    return tangents, normals, binormals
+
+def tube_mesh(xyz: np.ndarray, radius, num_segments: int = 36, caps: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds a triangulated tube along a path as vertex and face index arrays.
+    The radius is either a scalar or given per segment (N-1 values). Where the radius of two segments differs,
+    a flat annulus connects the two rings, so casings of different radii become one closed mesh. Segments with
+    a NaN radius are left out and split the tube into separate (capped) parts.
+    Args:
+        xyz (np.ndarray): (N,3) path points
+        radius (float | np.ndarray): the radius of the tube or (N-1,) radius of each segment
+        num_segments (int): the number of vertices of each ring
+        caps (bool): close the ends of the tube parts with triangle fans
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (V,3) vertices and (F,3) triangles with outward normals
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (max(len(xyz) - 1, 0),)).copy()
+    xyz, radius = _remove_duplicate_points(xyz, radius)
+    valid = ~np.isnan(radius)
+    if(len(xyz) < 2 or not np.any(valid)):
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+    _, normals, binormals = parallel_transport_frames(xyz)
+
+    # 1) rings: the start ring of a segment is shared with the end ring of the previous segment if the radius is equal
+    segment = np.flatnonzero(valid)
+    previous_valid = np.zeros(len(radius), dtype=bool)
+    previous_valid[1:] = valid[:-1]
+    previous_radius = np.concatenate([[np.nan], radius[:-1]])
+    shares_start = previous_valid[segment] & (previous_radius[segment] == radius[segment])
+    has_step = previous_valid[segment] & ~shares_start
+
+    # ring list: per segment an optional start ring followed by its end ring
+    ring_counts = np.where(shares_start, 1, 2)
+    end_ring = np.cumsum(ring_counts) - 1
+    start_ring = np.where(shares_start, np.roll(end_ring, 1), end_ring - 1)
+    ring_point = np.empty(end_ring[-1] + 1, dtype=np.int64)
+    ring_radius = np.empty(end_ring[-1] + 1)
+    ring_point[end_ring], ring_radius[end_ring] = segment + 1, radius[segment]
+    ring_point[start_ring], ring_radius[start_ring] = segment, radius[segment]
+
+    angles = np.linspace(0.0, 2 * np.pi, num_segments, endpoint=False)
+    offsets = np.cos(angles)[None, :, None] * normals[ring_point][:, None, :] + np.sin(angles)[None, :, None] * binormals[ring_point][:, None, :]
+    vertices = (xyz[ring_point][:, None, :] + ring_radius[:, None, None] * offsets).reshape(-1, 3)
+
+    # 2) side quads of each segment and the annulus steps between rings of different radii, two triangles each
+    ring_pairs = np.concatenate([
+        np.column_stack([start_ring, end_ring]),
+        np.column_stack([end_ring[np.flatnonzero(has_step) - 1], start_ring[has_step]]),
+    ])
+    j = np.arange(num_segments)
+    a = ring_pairs[:, 0, None] * num_segments + j
+    b = ring_pairs[:, 1, None] * num_segments + j
+    a_next = ring_pairs[:, 0, None] * num_segments + (j + 1) % num_segments
+    b_next = ring_pairs[:, 1, None] * num_segments + (j + 1) % num_segments
+    faces = [np.stack([a, a_next, b_next], axis=-1).reshape(-1, 3), np.stack([a, b_next, b], axis=-1).reshape(-1, 3)]
+
+    # 3) triangle fans around a centre vertex at the start and end of each tube part
+    if(caps):
+        next_valid = np.zeros(len(radius), dtype=bool)
+        next_valid[:-1] = valid[1:]
+        cap_rings = np.concatenate([start_ring[~previous_valid[segment]], end_ring[~next_valid[segment]]])
+        is_start = np.arange(len(cap_rings)) < np.count_nonzero(~previous_valid[segment])
+        centres = len(vertices) + np.arange(len(cap_rings))
+        vertices = np.concatenate([vertices, xyz[ring_point[cap_rings]]])
+        ring = cap_rings[:, None] * num_segments
+        current, following = ring + j, ring + (j + 1) % num_segments
+        centre = np.broadcast_to(centres[:, None], current.shape)
+        fans = np.where(is_start[:, None, None], np.stack([centre, following, current], axis=-1), np.stack([centre, current, following], axis=-1))
+        faces.append(fans.reshape(-1, 3))
+
+    return vertices, np.concatenate(faces).astype(np.int64)
+
+def casing_path(borehole: Borehole) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenates the sub-paths of all casings of a borehole (sorted by depth) into one path with a radius per segment.
+    The segments in gaps between two casings have a NaN radius, see tube_mesh.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (N,3) path points and (N-1,) segment radii
+    """
+    points, radii = [], []
+    for casing in sorted(borehole.casings or [], key=lambda casing: casing.depth_from):
+        xyz = borehole.get_sub_path(casing.depth_from, casing.depth_to).xyz
+        if(len(xyz) < 2):
+            continue
+        if(points):
+            radii.append([np.nan]) # the segment from the end of the previous casing
+        points.append(xyz)
+        radii.append(np.full(len(xyz) - 1, casing.casing_radius))
+    if(not points):
+        return np.empty((0, 3)), np.empty(0)
+    return np.concatenate(points), np.concatenate(radii)
+
+def segments_for_tolerance(radius: float, tolerance: float, min_segments: int = 4, max_segments: int = 36) -> int:
+    """
+    Returns the number of ring vertices, so the edges of the ring deviate at most 'tolerance' from
+    the circle (sagitta r*(1-cos(pi/n))), limited to [min_segments, max_segments].
+    """
+    if(tolerance >= radius):
+        return min_segments
+    return int(np.clip(np.ceil(np.pi / np.arccos(1 - tolerance / radius)), min_segments, max_segments))
+
+def screen_space_tolerance(distance: float, pixels: float = 1.0, viewport_pixels: int = 1080, fov_degrees: float = 60.0) -> float:
+    """Converts an error in screen pixels at a viewing distance to a tolerance in meters (perspective camera)."""
+    return 2 * distance * np.tan(np.radians(fov_degrees) / 2) * pixels / viewport_pixels
+
+def simplify_path(xyz: np.ndarray, tolerance: float, keep: np.ndarray | None = None) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker decimation of a path: returns the indices of the points to keep, so that
+    no removed point is further than 'tolerance' from the simplified polyline.
+    Args:
+        xyz (np.ndarray): (N,3) path points
+        tolerance (float): the maximum distance of a removed point in meters
+        keep (np.ndarray, optional): (N,) mask of points which are always kept (e.g. radius changes)
+    Returns:
+        np.ndarray: sorted indices of the kept points, always including the first and the last point
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    kept = np.zeros(len(xyz), dtype=bool) if keep is None else np.asarray(keep, dtype=bool).copy()
+    if(len(xyz) <= 2):
+        return np.arange(len(xyz))
+    kept[[0, -1]] = True
+
+    # the fixed points split the path into independent ranges
+    fixed = np.flatnonzero(kept)
+    ranges = list(zip(fixed[:-1].tolist(), fixed[1:].tolist()))
+    while(ranges):
+        start, end = ranges.pop()
+        if(end - start < 2):
+            continue
+        # distance of the inner points to the chord (to the start point for a closed range)
+        chord = xyz[end] - xyz[start]
+        chord_length = np.linalg.norm(chord)
+        relative = xyz[start + 1:end] - xyz[start]
+        if(chord_length > 1e-12):
+            distances = np.linalg.norm(np.cross(relative, chord / chord_length), axis=1)
+        else:
+            distances = np.linalg.norm(relative, axis=1)
+        farthest = int(np.argmax(distances))
+        if(distances[farthest] > tolerance):
+            split = start + 1 + farthest
+            kept[split] = True
+            ranges += [(start, split), (split, end)]
+    return np.flatnonzero(kept)
+
+def lod_tube_mesh(xyz: np.ndarray, radius, tolerance: float, min_segments: int = 4, max_segments: int = 36) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Level-of-detail version of tube_mesh: the path is decimated and the ring resolution reduced, so the mesh
+    deviates at most about 'tolerance' (meters, e.g. from screen_space_tolerance) from the exact tube.
+    Points where the segment radius changes are always kept.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (V,3) vertices and (F,3) triangles, see tube_mesh
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (max(len(xyz) - 1, 0),))
+    if(len(xyz) < 2):
+        return tube_mesh(xyz, radius)
+
+    # 1) decimate the path, keeping the start and end of each radius section
+    keep = np.zeros(len(xyz), dtype=bool)
+    changes = ~((radius[1:] == radius[:-1]) | (np.isnan(radius[1:]) & np.isnan(radius[:-1])))
+    keep[1:-1] = changes
+    indices = simplify_path(xyz, tolerance, keep)
+
+    # 2) a decimated segment covers original segments of the same radius
+    num_segments = segments_for_tolerance(float(np.nanmax(radius)) if np.any(~np.isnan(radius)) else 0.0, tolerance, min_segments, max_segments)
+    return tube_mesh(xyz[indices], radius[indices[:-1]], num_segments=num_segments)
@@ -3,47 +3,13 @@
 import numpy as np
 import ifcopenshell
 import ifcopenshell.util.element as element
-import ifcopenshell.geom
 import ifcopenshell.util.shape
 import time
+from typing import Callable, Iterable
 
-from ifc_utils.ifc_utils import get_application, write_list_of_dict_to_csv
-
-def get_bbox_test(elem: ifcopenshell.entity_instance, use_world_coords:bool=True, verbose:bool=False) -> dict:
-    # shape.bounds does not work 
-    try:
-        settings = ifcopenshell.geom.settings()
-        if(use_world_coords):
-            settings.set(settings.USE_WORLD_COORDS, True)
-        shape = ifcopenshell.geom.create_shape(settings, elem)
-        if shape is None:
-            return None
-        
-        points = np.array(shape.geometry.verts).reshape(-1, 3)
-        min_point = points.min(axis=0)
-        max_point = points.max(axis=0)
-        center_point = ((min_point[0] + max_point[0]) / 2,
-                        (min_point[1] + max_point[1]) / 2,
-                        (min_point[2] + max_point[2]) / 2)
-        
-        bbox = {
-            'min_point': min_point,
-            'max_point': max_point,
-            'center_point': center_point,
-            'x_length': max_point[0] - min_point[0],
-            'y_length': max_point[1] - min_point[1],
-            'z_length': max_point[2] - min_point[2]
-        }
-
-
-        # print(f"Min point: {min_point},\nMax point: {max_point},\nCenter point: {center_point} ")
-        # print(f"Lengths: x={bbox['x_length']:.4f}, y={bbox['y_length']:.4f}, z={bbox['z_length']:.4f}")
-        
-        return bbox
-    except Exception as e:
-        if (verbose):
-            print(f"Error: {e}")
-        return None
+from ifc_utils.ifc_utils import write_iter_of_dict_to_csv, add_interval_to_hole_index
+from ifc_utils.ifc_element_table import ElementTable
+from ifc_utils.ifc_model_index import open_model_index
 
 def get_related_elements_from_storey(elem:ifcopenshell.entity_instance, verbose:bool=False) -> list[str] | None:
     if(elem.is_a() != 'IFCBUILDINGSTOREY'):
@@ -64,48 +30,28 @@ def add_pset_attributes(psets) -> set:
             pset_attributes.add(f'{pset_name}.{property_name}')
     return pset_attributes
 
-def get_objects_data_by_class(file, class_type):
-    objects_data = []
-    objects = file.by_type(class_type)
-
-    for obj in objects:
-        psets = element.get_psets(obj, psets_only=True)
-        pset_attributes = add_pset_attributes(psets)
-        qtos = element.get_psets(obj, qtos_only=True)
-        qtos_attributes = add_pset_attributes(qtos)
-        pset_attributes = pset_attributes.union(qtos_attributes)  # Join two sets
-
-        bbox = get_bbox_test(obj)
-        obj_info = obj.get_info()
-        related_elems = get_related_elements_from_storey(obj) 
-
-        objects_data.append({
-            'id': obj.id(),
-            'global_id': obj_info.get('GlobalId', None),
-            'Class': obj.is_a(),
-            'PredefinedType': element.get_predefined_type(obj),
-            'name': obj_info.get('Name', None),
-            'level': element.get_container(obj).Name if element.get_container(obj) else None,
-            'ObjectType': element.get_type(obj).Name if element.get_type(obj) else None,
-            'QuantitySets': qtos,
-            'PropertySets': psets,
-            'BBox': bbox,
-            'obj':obj,
-            'related_elements': related_elems
-            #'Geometry': geometry
-        })
-        
-
-    return objects_data, list(pset_attributes)
-
-def compose_leapfrog_csv_data_from_elem_info(app_info: dict, intervals_data:list, collar_data:list, collar_filepath:str, intervals_filepath:str, verbose:bool=True) -> tuple[str,str] | None:
-    if(app_info['ApplicationFullName'] != 'Leapfrog Works'):
-        if(verbose):
-            print(f"Error: Application is not Leapfrog Works. Application is: {app_info['ApplicationFullName']}")
-        return None
-    
-    # 1) Get the intervals data into a csv readable format
-    readable_intervals = []
+def iter_objects_data_by_class(file, class_type, bboxes:np.ndarray | None = None, columns:Iterable[str] | None = None):
+    """
+    Generator version of get_objects_data_by_class, yields the data of one object at a time.
+    The data is read from a lazy ElementTable, so only the requested columns are extracted
+    (default: all columns except the live entity 'obj'). The bounding boxes are looked up in 'bboxes'
+    (see calc_bboxes), if not given they are calculated in one geometry iterator pass, when 'BBox' is requested.
+    """
+    table = ElementTable(file, class_type, bboxes=bboxes)
+    yield from table.rows(columns)
+
+def get_objects_data_by_class(file, class_type, bboxes:np.ndarray | None = None, columns:Iterable[str] | None = None):
+    """
+    Collects the psets, qtos, container, type and bounding box of all objects of the given class.
+    Returns the list of object data and the names of all pset and qto attributes ('PSET_NAME.PROPERTY_NAME').
+    """
+    table = ElementTable(file, class_type, bboxes=bboxes)
+    return list(table.rows(columns)), table.pset_attributes()
+
+def iter_readable_intervals(intervals_data:Iterable[dict]):
+    """
+    Flattens the interval data of get_objects_data_by_class into csv readable rows, one at a time.
+    """
     for interval in intervals_data:
         attributes = interval['PropertySets']['Attributes'] if (interval.get('PropertySets') and interval.get('PropertySets').get('Attributes')) else {}
         flat_interval = {**{
@@ -121,29 +67,64 @@ def compose_leapfrog_csv_data_from_elem_info(app_info: dict, intervals_data:list
                 'drilling_diameter': ((interval['BBox']['x_length'] + interval['BBox']['y_length']) / 2) if interval['BBox'] else None,
             }, **attributes
         }
-        readable_intervals.append(flat_interval)
-
-    # 2) Get the collar data into a csv readable format
-    readable_collars = []
-    for collar in collar_data:
-        related_intervals = [interval for interval in readable_intervals if collar['name'] == interval['hole_id']]
-        z = max([interval['z'] for interval in related_intervals]) if (len(related_intervals)>0) else None
-        first_interval = [interval for interval in related_intervals if interval['z'] == z][0] if (len(related_intervals)>0) else None
-        x = first_interval['x'] if first_interval else None
-        y = first_interval['y'] if first_interval else None
-
-        readable_collar = {
-            "global_id": collar['global_id'],
-            "hole_id": collar['name'],
-            "x": x,
-            "y": y,
-            "z": z
-        }
-        readable_collars.append(readable_collar)
+        yield flat_interval
+
+def compose_leapfrog_csv_data_from_elem_info(
+    app_info: dict,
+    intervals_data: Iterable[dict] | Callable[[], Iterable[dict]],
+    collar_data: Iterable[dict],
+    collar_filepath: str,
+    intervals_filepath: str,
+    interval_fieldnames: list[str] | None = None,
+    verbose: bool = True,
+) -> tuple[str,str] | None:
+    """
+    Writes the collars and intervals of a Leapfrog Works borehole model into two csv files.
+    The intervals are streamed to disk and only the top-most interval of each hole is kept in memory.
+    Args:
+        intervals_data: list or generator of interval data (see iter_objects_data_by_class) or a function
+            returning a fresh generator, which allows a two-pass union header without holding all rows in memory
+        collar_data: list or generator of collar data
+        interval_fieldnames: pre-declared header of the intervals csv (see write_iter_of_dict_to_csv)
+    """
+    if(app_info['ApplicationFullName'] != 'Leapfrog Works'):
+        if(verbose):
+            print(f"Error: Application is not Leapfrog Works. Application is: {app_info['ApplicationFullName']}")
+        return None
     
-    # 3) Write the data to a csv file
-    collar_filepath = write_list_of_dict_to_csv(readable_collars, collar_filepath)
-    intervals_filepath = write_list_of_dict_to_csv(readable_intervals, intervals_filepath)
+    # 1) Stream the intervals in a csv readable format to disk, while indexing the top-most interval per hole
+    # (the index is idempotent, so a second pass for the union header does not change it)
+    intervals_by_hole = {}
+    def _indexed_intervals(data):
+        return (add_interval_to_hole_index(intervals_by_hole, interval, hole_key='hole_id', top_key='z', keep_interval=False) for interval in iter_readable_intervals(data))
+
+    if(callable(intervals_data)):
+        readable_intervals = lambda: _indexed_intervals(intervals_data())
+    elif(isinstance(intervals_data, (list, tuple))):
+        readable_intervals = lambda: _indexed_intervals(intervals_data)
+    else:
+        readable_intervals = _indexed_intervals(intervals_data)
+    intervals_filepath = write_iter_of_dict_to_csv(readable_intervals, intervals_filepath, fieldnames=interval_fieldnames)
+
+    # 2) Get the collar data into a csv readable format, the collar position is the top of the first interval
+    def _readable_collars():
+        for collar in collar_data:
+            hole = intervals_by_hole.get(collar['name'])
+            first_interval = hole['top_interval'] if hole else None
+            x = first_interval['x'] if first_interval else None
+            y = first_interval['y'] if first_interval else None
+            z = first_interval['z'] if first_interval else None
+
+            yield {
+                "global_id": collar['global_id'],
+                "hole_id": collar['name'],
+                "x": x,
+                "y": y,
+                "z": z
+            }
+    
+    # 3) Write the collar data to a csv file
+    collar_filepath = write_iter_of_dict_to_csv(_readable_collars(), collar_filepath, fieldnames=["global_id", "hole_id", "x", "y", "z"])
     return((collar_filepath, intervals_filepath))
 
 if __name__ == "__main__":
@@ -151,24 +132,35 @@ if __name__ == "__main__":
     start_time = time.perf_counter()
 
     # 1) First Example - read the application info from an archicad generated ifc file
-    ifc_boreholes = ifcopenshell.open("./data/leapfrog_examples/Boreholes_with_lithology.ifc")
+    # the sidecar index (./data/leapfrog_examples/Boreholes_with_lithology_index.sqlite) answers repeat runs
+    # without opening the model, it is rebuilt automatically when the ifc file changes
+    ifc_boreholes = open_model_index("./data/leapfrog_examples/Boreholes_with_lithology.ifc")
     # haus = ifcopenshell.open("./data/AC20-FZK-Haus.ifc")
     # app_info = get_application(haus)
 
     # 2) Second Example - read the application info from a leapfrog works generated ifc file
-    app_info = get_application(ifc_boreholes)
+    app_info = ifc_boreholes.application
     print(f"Application: {app_info['ApplicationFullName']} {app_info['Version']}")
 
     # 3) Get Differnt elements from a borehole file from Leapfrog Works
-    # data1, pset_attributes1 = get_objects_data_by_class(ifc_boreholes, 'ifcproject')
-    # data2, pset_attributes2 = get_objects_data_by_class(ifc_boreholes, 'IFCCARTESIANPOINT')
-    
-    intervals_data, interval_pset_attributes = get_objects_data_by_class(ifc_boreholes, 'ifcbuildingelementproxy')
-    collar_data, collar_pset_attributes = get_objects_data_by_class(ifc_boreholes, 'IFCBUILDINGSTOREY')
+    # data1, pset_attributes1 = get_objects_data_by_class(ifc_boreholes.model, 'ifcproject')
+    # data2, pset_attributes2 = get_objects_data_by_class(ifc_boreholes.model, 'IFCCARTESIANPOINT')
+
+    # the intervals are streamed twice (union header + rows)
+    # only the columns needed for the csv files are extracted (one geometry pass for the bounding boxes on the first run)
+    intervals_data = lambda: ifc_boreholes.rows('ifcbuildingelementproxy', ['id', 'global_id', 'name', 'level', 'BBox', 'PropertySets'])
+    collar_data = ifc_boreholes.rows('IFCBUILDINGSTOREY', columns=['global_id', 'name'])
 
     # 4) Parse the extracted data into a csv file for further processing in leapfrog/other geotechnical software
     collar_csv, intervals_csv = compose_leapfrog_csv_data_from_elem_info(app_info, intervals_data, collar_data, './data/collar_data.csv', './data/intervals_data.csv')
 
+    # 5) Spatial queries on the bounding boxes (packed R-tree, persisted in the sidecar index),
+    # e.g. the candidate intervals within 10 m of a section line across the model
+    spatial_index = ifc_boreholes.spatial_index
+    section_start, section_end = spatial_index.min_points.min(axis=0), spatial_index.max_points.max(axis=0)
+    section_candidates = spatial_index.query_segment(section_start, section_end, radius=10.0)
+    print(f"{len(section_candidates)} of {len(spatial_index)} elements are within 10 m of the section line")
+
     # pprint(interval_pset_attributes)
     # pprint(intervals_data)
     # IFCCIRCLEPROFILEDEF
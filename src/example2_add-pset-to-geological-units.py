@@ -3,12 +3,19 @@ import ifcopenshell
 import ifcopenshell.geom 
 
 import os.path
+import csv
+import random
+import tempfile
+import time
 from logging import getLogger
 
-from ifc_utils.ifc_utils import add_pset_with_props, get_application, calc_volumes, write_list_of_dict_to_csv, add_suffix_to_file_path, parse_pset_csv, create_flat_dict_from_pset_dict
+from ifc_utils.ifc_model_index import open_model_index
+from ifc_utils.ifc_utils import add_psets_in_bulk, get_application, calc_volumes, write_list_of_dict_to_csv, add_suffix_to_file_path, parse_pset_csv, read_csv_columns, create_flat_dict_from_pset_dict
 
 ### CONSTANTS
 COMPUTE_VOLUME = False
+BENCHMARK = False # time the typed csv parsing on a synthetic csv file
+BUILD_SPATIAL_INDEX = False # tessellates all units once and stores their bounding box index next to the written ifc file
 MISSING_ROWS_FILEPATH =  "./data/leapfrog_examples/geological_units_psets.csv"
 EXAMPLE_PSET_STRUCTURE = {
             "Pset_GeologicalUnit": {
@@ -25,6 +32,34 @@ EXAMPLE_PSET_STRUCTURE = {
 
 
 ### FUNCTIONS
+def print_volume_progress(processed:int, total:int, elapsed_seconds:float):
+    throughput = processed / elapsed_seconds if elapsed_seconds > 0 else 0.0
+    print(f"Volumes: {processed}/{total} units tessellated ({throughput:.2f} units/s)")
+
+def benchmark_pset_csv_parsing(row_count:int=100000, property_count:int=8):
+    """
+    Writes a synthetic pset csv file with row_count units and prints the runtime of a plain csv.DictReader pass,
+    of read_csv_columns and of parse_pset_csv.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "psets.csv")
+        with open(file_path, "w", newline="") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["GlobalId", "Name", "Pset_GeologicalUnit.Homogenous Area"] + [f"Pset_CharacteristicValues.value {idx}" for idx in range(property_count)])
+            for row_idx in range(row_count):
+                writer.writerow([f"{row_idx:022d}", f"Unit {row_idx}", "B2 - Clay"] + [f"{random.uniform(-50.0, 50.0):.3e}" if row_idx % 10 else "" for _ in range(property_count)])
+
+        start_time = time.perf_counter()
+        with open(file_path, newline="") as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        print(f"csv.DictReader (untyped): {row_count} rows in {(time.perf_counter() - start_time):.3f} seconds")
+        start_time = time.perf_counter()
+        read_csv_columns(file_path)
+        print(f"read_csv_columns: {row_count} rows in {(time.perf_counter() - start_time):.3f} seconds")
+        start_time = time.perf_counter()
+        parse_pset_csv(file_path)
+        print(f"parse_pset_csv: {row_count} rows in {(time.perf_counter() - start_time):.3f} seconds")
+
 def main(ifc_file_path:str):
     """
     Adds the Psets to all geological units in the IFC file, if a csv file is provided.
@@ -55,37 +90,30 @@ def main(ifc_file_path:str):
     volumes = {}
     if(COMPUTE_VOLUME):
         print("Warning: Retrieving volumes is a computational intensive operation and can take some time (~30 seconds per unit)")
-        volumes = calc_volumes(model)
+        # unchanged units are read from a cache next to the ifc file and are not tessellated again
+        volume_cache_filepath = f"{os.path.splitext(ifc_file_path)[0]}_volumes.sqlite"
+        volumes = calc_volumes(model, cache_filepath=volume_cache_filepath, progress_callback=print_volume_progress)
 
     # 3. Select the geological units
     # IFC4: assuming that the geological units are IfcBuildingElementProxy
     geological_units = model.by_type('IfcBuildingElementProxy') 
 
-    # 4. Add the Pset_GeologicalUnit to each geological unit
-    for geological_unit in geological_units:
+    # 4. Add the psets to all geological units at once (units with identical values share one pset)
+    if(add_psets_nested_dict is not None):
+        stats = add_psets_in_bulk(model, add_psets_nested_dict, elements=geological_units)
+        print(f"Psets added/updated: {stats['updated']} updated in place, {stats['shared']} assigned to {stats['psets']} shared psets\n")
 
+    # the output rows are built from the input data instead of querying the psets again
+    for geological_unit in geological_units:
         volume = volumes.get(geological_unit.GlobalId)['volume'] if (COMPUTE_VOLUME == True) else None
-
-        try:    
-            psets = add_psets_nested_dict[geological_unit.GlobalId].keys()
-            for pset_name in psets:
-                props = add_psets_nested_dict[geological_unit.GlobalId][pset_name]
-
-                pset_element = add_pset_with_props(model, geological_unit, pset_name, props)
-                added_psets = ifcopenshell.util.element.get_psets(geological_unit)
-                # will update existing psets and props
-                existing_row = create_flat_dict_from_pset_dict(pset_dict=added_psets, element=geological_unit)
-                if(COMPUTE_VOLUME):
-                    existing_row['Volume'] = volume
-                rows.append(existing_row)
-                print(f"Pset added/updated to Name: '{geological_unit.Name}'\nID: '{geological_unit.GlobalId}'\nVolume [m3]: {f'{volume:.2e}' if volume is not None else 'N/A'}\n")
-
-        except (KeyError, TypeError) as error:
+        if(add_psets_nested_dict is not None and geological_unit.GlobalId in add_psets_nested_dict):
+            row = create_flat_dict_from_pset_dict(pset_dict=add_psets_nested_dict[geological_unit.GlobalId], element=geological_unit, with_values=True)
+        else:
             print(f"Error: No Pset found for '{geological_unit.GlobalId}' with name '{geological_unit.Name}'\n")
-            missing_row = create_flat_dict_from_pset_dict(pset_dict=pset_blank_structure, element=geological_unit)
-            if(COMPUTE_VOLUME):
-                missing_row['Volume'] = volume
-            rows.append(missing_row)
+            row = create_flat_dict_from_pset_dict(pset_dict=pset_blank_structure, element=geological_unit)
+        if(COMPUTE_VOLUME):
+            row['Volume'] = volume
+        rows.append(row)
 
     # 5. Write the missing rows to a csv file
     if(len(rows)>0):
@@ -102,6 +130,14 @@ def main(ifc_file_path:str):
     model.write(new_filepath)
     print("The updated IFC FIle has been written to: ", new_filepath)
 
+    # 8. Index the bounding boxes of the units, so box, point and segment queries (e.g. along an alignment)
+    # of the following scripts only touch the candidate units
+    if(BUILD_SPATIAL_INDEX):
+        model_index = open_model_index(new_filepath)
+        print(f"Spatial index of {len(model_index.spatial_index)} units has been written to: {model_index.cache_filepath}")
+
 ### MAIN
 if __name__ == "__main__":
+    if(BENCHMARK):
+        benchmark_pset_csv_parsing()
     main(ifc_file_path="./data/leapfrog_examples/Geological_units_10+250_10+700_with_psets.ifczip")
\ No newline at end of file
@@ -7,18 +7,74 @@ import ifcopenshell.util
 import numpy as np
 
 import random
+import time
 from logging import getLogger
 
-from ifc_utils.ifc_utils import init_minimal_ifc_model
+from ifc_utils.ifc_utils import init_minimal_ifc_model, create_elements_in_bulk
 from ifc_utils.ifc_representations import create_sphere_representation, create_and_add_style
 
 ### CONSTANTS
 EXPORT_FILENAME = "./data/example4_output_model_var2lean.ifc"
+BENCHMARK = False # compare the bulk element creation with the per element api calls
 ### FUNCTIONS
+def create_spheres_with_api(model, placement_vectors, element_type, element_type_1500) -> list:
+    """
+    Creates one sphere element per placement vector with individual ifcopenshell.api calls
+    (five api calls per element), kept as the reference for benchmark_sphere_creation.
+    """
+    elements = []
+    for idx, placement_vector in enumerate(placement_vectors):
+        matrix = np.eye(4)
+        matrix[:, 3][0:3] = placement_vector
+        element = run("root.create_entity", model, ifc_class="IfcBuildingElementProxy")
+        elements.append(element)
+        run(
+            "geometry.edit_object_placement",
+            model,
+            product=element,
+            matrix=matrix,
+            is_si=True,
+        )
+        # run("geometry.assign_representation", model, product=element, representation=sphere_representation) # Variante 1 (Use this if you have continous data without clusters/bins/categories)
+        if idx % 2 == 0:
+            run( "type.assign_type", model, related_object=element, relating_type=element_type)  # Variante 2 - Typ 1 (Example for even numbers)
+        else:
+            run( "type.assign_type", model, related_object=element, relating_type=element_type_1500)  # Variante 2 - Typ 2 (Example for odd numbers)
 
-### MAIN
-if __name__ == "__main__":
+        ### 4. simpler way to create a property set and add the properties to it
+        pset = run("pset.add_pset", model, product=element, name="Probenahme PSET")
+        run("pset.edit_pset",
+            model,
+            pset=pset,
+            properties={
+                "Testmethode": "Eimerprobe",
+                "Entnahmetiefe": placement_vector[2],
+                "Proben_Name": f"Probe {placement_vector[0]}-{placement_vector[1]}-{placement_vector[2]}",
+            },
+        )
+    return elements
 
+def create_spheres_in_bulk(model, placement_vectors, element_type, element_type_1500) -> list:
+    """
+    Creates the same elements as create_spheres_with_api with a single create_elements_in_bulk call.
+    """
+    placement_vectors = np.asarray(placement_vectors)
+    return create_elements_in_bulk(
+        model,
+        placements=placement_vectors,
+        ifc_class="IfcBuildingElementProxy",
+        relating_types=[element_type, element_type_1500], # Variante 2 - Typ 1 for even, Typ 2 for odd numbers
+        type_indices=np.arange(len(placement_vectors)) % 2,
+        pset_name="Probenahme PSET",
+        properties={
+            "Testmethode": "Eimerprobe",
+            "Entnahmetiefe": placement_vectors[:, 2],
+            "Proben_Name": [f"Probe {x}-{y}-{z}" for x, y, z in placement_vectors],
+        },
+        is_si=True,
+    )
+
+def init_sphere_model():
     # 1. Init project from default template
     model, project, site, body_3d_context, plan_2d_context = init_minimal_ifc_model(
         filename=EXPORT_FILENAME,
@@ -44,47 +100,39 @@ if __name__ == "__main__":
     run("geometry.assign_representation", model,product=element_type,representation=sphere_representation)  # Variante 2 - Typ 1
     element_type_1500 = run("root.create_entity", model, ifc_class="Ifcbuildingelementproxytype")  # Variante 2
     run("geometry.assign_representation",model,product=element_type_1500,representation=sphere_representation_1500)  # Variante 2 - Typ 2
+    return model, element_type, element_type_1500
 
-    ### 3. Create an ifc element and then apply the local placement and the geometry Representation to this element
-    elements = []
-    placement_vectors = placement_vectors = [
+def benchmark_sphere_creation(counts=(100, 1000, 10000)):
+    """
+    Prints the runtime of create_spheres_with_api and create_spheres_in_bulk for an increasing number of elements.
+    """
+    for count in counts:
+        placement_vectors = [(random.randint(0, 100), random.randint(0, 100), random.randint(0, 100)) for _ in range(count)]
+        for create_spheres in (create_spheres_with_api, create_spheres_in_bulk):
+            model, element_type, element_type_1500 = init_sphere_model()
+            start_time = time.perf_counter()
+            create_spheres(model, placement_vectors, element_type, element_type_1500)
+            print(f"{create_spheres.__name__}: {count} elements in {(time.perf_counter() - start_time):.4f} seconds")
+
+### MAIN
+if __name__ == "__main__":
+
+    if(BENCHMARK):
+        benchmark_sphere_creation()
+
+    ### 1.-2. Init the model, the sphere representations and the element types
+    model, element_type, element_type_1500 = init_sphere_model()
+
+    ### 3.-4. Create the ifc elements with their local placement, type (geometry representation) and pset
+    placement_vectors = [
         (random.randint(0, 100), random.randint(0, 100), random.randint(0, 100))
         for _ in range(1000)
     ]
-    for idx, placement_vector in enumerate(placement_vectors):
-        matrix = np.eye(4)
-        matrix[:, 3][0:3] = placement_vector
-        representation = sphere_representation
-        element = run("root.create_entity", model, ifc_class="IfcBuildingElementProxy")
-        elements.append(element)
-        run(
-            "geometry.edit_object_placement",
-            model,
-            product=element,
-            matrix=matrix,
-            is_si=True,
-        )
-        # run("geometry.assign_representation", model, product=element, representation=sphere_representation) # Variante 1 (Use this if you have continous data without clusters/bins/categories)
-        if idx % 2 == 0:
-            run( "type.assign_type", model, related_object=element, relating_type=element_type)  # Variante 2 - Typ 1 (Example for even numbers)
-        else:
-            run( "type.assign_type", model, related_object=element, relating_type=element_type_1500)  # Variante 2 - Typ 2 (Example for odd numbers)
-
-        ### 4. simpler way to create a property set and add the properties to it
-        pset = run("pset.add_pset", model, product=element, name="Probenahme PSET")
-        run("pset.edit_pset",
-            model,
-            pset=pset,
-            properties={
-                "Testmethode": "Eimerprobe",
-                "Entnahmetiefe": placement_vector[2],
-                "Proben_Name": f"Probe {placement_vector[0]}-{placement_vector[1]}-{placement_vector[2]}",
-            },
-        )
+    elements = create_spheres_in_bulk(model, placement_vectors, element_type, element_type_1500)
 
     ### 5. Validate the model
     logger = getLogger("ifcopenshell")
     ifcopenshell.validate.validate(model, logger)
 
     ### 6. Write the model to disk
-    model.write(EXPORT_FILENAME)
\ No newline at end of file
+    model.write(EXPORT_FILENAME)
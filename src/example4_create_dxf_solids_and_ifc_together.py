@@ -1,36 +1,35 @@
 ### IMPORTS
-from ifc_utils.ifc_utils import get_application, write_list_of_dict_to_csv
+from ifc_utils.ifc_utils import get_application, write_list_of_dict_to_csv, read_csv_columns
 import csv, math
 from typing import List, Tuple, Iterable
 
 import ezdxf
 from ezdxf.render.forms import cube, cylinder_2p, cone_2p, cone, sweep, circle, from_profiles_linear
-from ezdxf.addons.pycsg import CSG
+import numpy as np
+import time
+
+from borehole.csg import get_csg_backend, mesh_from_meshbuilder, meshbuilder_from_mesh
+from borehole.clash import planned_boreholes_from_rows, planned_borehole_cones
+from borehole.ifc_export import add_tolerance_cones_to_ifc
+from borehole.tolerance_cone import tolerance_cone_meshes
+from borehole.tube_mesh import tube_mesh
+from ifc_utils.ifc_utils import init_minimal_ifc_model
 
 ### CONSTANTS
+BENCHMARK = False # compare tolerance_body_as_mesh with the vectorized tolerance_cone_meshes and the CSG backends
+CSG_BACKEND = "numpy" # "numpy" (vectorized) or "pycsg" (BSP trees of ezdxf), see borehole.csg
+TOLERANCE_CONES_IFC_FILENAME = "./data/planned_drillings_tolerance_cones.ifc"
 
 ### FUNCTIONS
-def read_csv(file_path: str, decimal_separator: str = ".") -> list:
+def read_csv(file_path: str, decimal_separator: str = ".", delimiter: str = ",") -> list:
     """
     Reads a CSV file and converts the data into numerics where possible.
+    The type of each column is inferred once (see read_csv_columns), the rows are returned as dicts:
+    numeric columns as floats and empty cells as '' (as before the typed loader).
     """
-    def is_numeric(input_string: str) -> bool:
-        try:
-            float(input_string.replace(decimal_separator, '.'))
-            return True
-        except ValueError:
-            return False
-
-    def convert_to_numeric(x: str) -> float:
-        return float(x) if is_numeric(x) else x
-
-    with open(file_path, newline='') as csvfile:
-        reader = csv.DictReader(csvfile, quotechar='"')
-        data = []
-        for row in reader:
-            row_with_numerics = {key: convert_to_numeric(value) for key, value in row.items()}
-            data.append(row_with_numerics)
-    return data
+    columns = read_csv_columns(file_path, decimal_separator=decimal_separator, delimiter=delimiter, infer_integers=False)
+    rows = zip(*(column.tolist() for column in columns.values()))
+    return [{key: '' if value is None or value != value else value for key, value in zip(columns.keys(), row)} for row in rows]
 
 
 def tolerance_body_as_mesh(start: Tuple[float, float, float], end: Tuple[float, float, float], start_radius:float = 0.05, tolerance_factor:float = 0.02):
@@ -59,11 +58,69 @@ def tolerance_body_as_mesh(start: Tuple[float, float, float], end: Tuple[float,
     return(tolerance_body_mesh)
 
 
+def render_tolerance_cones(modelspace, vertices: np.ndarray, faces: np.ndarray, dxfattribs: list[dict]) -> None:
+    """ Renders the (N,V,3) cone vertices of tolerance_cone_meshes with their shared faces into the modelspace. """
+    face_list = faces.tolist()
+    for cone_vertices, attribs in zip(vertices, dxfattribs):
+        mesh = ezdxf.render.MeshBuilder()
+        mesh.vertices = [ezdxf.math.Vec3(vertex) for vertex in cone_vertices.tolist()]
+        mesh.faces = face_list
+        mesh.render_mesh(modelspace, dxfattribs=attribs)
+
+def benchmark_tolerance_bodies(counts: tuple[int, ...] = (10, 100, 1000), tolerance_factor: float = 0.02) -> None:
+    """ Prints the runtime of tolerance_body_as_mesh (one cone at a time) and of tolerance_cone_meshes (all cones at once)
+    for random drillings, both with 32 vertices per ring. """
+    rng = np.random.default_rng(0)
+    for count in counts:
+        starts = rng.uniform(-100.0, 100.0, (count, 3))
+        ends = starts + rng.uniform(-30.0, 30.0, (count, 3))
+
+        start_time = time.perf_counter()
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            tolerance_body_as_mesh(start=start, end=end, start_radius=0.05, tolerance_factor=tolerance_factor)
+        single_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        tolerance_cone_meshes(starts, ends, start_radii=0.05, tolerance_factors=tolerance_factor, num_segments=32, caps=False)
+        bulk_seconds = time.perf_counter() - start_time
+        print(f"{count} cones: tolerance_body_as_mesh {single_seconds:.4f} s, tolerance_cone_meshes {bulk_seconds:.4f} s ({single_seconds / max(bulk_seconds, 1e-9):.0f}x)")
+
+def benchmark_csg_backends(segment_counts: tuple[int, ...] = (8, 16, 32, 64, 128), pycsg_limit_seconds: float = 30.0) -> None:
+    """ Prints the runtime of a bent borehole tube minus a crossing tolerance cone for both CSG backends. pycsg is
+    skipped for finer meshes after it took longer than pycsg_limit_seconds or exceeded the recursion limit. """
+    skip_pycsg = False
+    for num_segments in segment_counts:
+        t = np.linspace(0.0, 1.0, num_segments // 2)[:, None]
+        tube = tube_mesh(np.hstack([10.0 * t, 3.0 * np.sin(3.0 * t), -10.0 * t]), 0.5, num_segments=num_segments)
+        cone_vertices, cone_faces = tolerance_cone_meshes([[5.0, -5.0, -5.0]], [[5.0, 5.0, -5.0]], start_radii=0.3, tolerance_factors=0.05, num_segments=num_segments)
+        timings = []
+        for name in ("numpy", "pycsg"):
+            if(name == "pycsg" and skip_pycsg):
+                timings.append(f"{name} skipped")
+                continue
+            start_time = time.perf_counter()
+            try:
+                vertices, faces = get_csg_backend(name).difference(tube, (cone_vertices[0], cone_faces))
+            except RecursionError:
+                skip_pycsg = True
+                timings.append(f"{name} exceeded the recursion limit")
+                continue
+            seconds = time.perf_counter() - start_time
+            skip_pycsg = skip_pycsg or (name == "pycsg" and seconds > pycsg_limit_seconds)
+            timings.append(f"{name} {seconds:.4f} s ({len(faces)} faces)")
+        print(f"{num_segments} segments, {len(tube[1]) + len(cone_faces)} triangles: {', '.join(timings)}")
+
 ### MAIN
 if __name__ == "__main__":
 
+    if(BENCHMARK):
+        benchmark_tolerance_bodies()
+        benchmark_csg_backends()
+
     ### BEISPIEL 2
     planned_drillings = read_csv('./data/planned_drillings.csv')
+    # start/end or collar + dip/azimuth/length columns, see planned_boreholes_from_rows
+    planned_boreholes = planned_boreholes_from_rows(planned_drillings, start_radius=0.05, tolerance_factor=0.02)
 
 
 
@@ -87,20 +144,23 @@ if __name__ == "__main__":
     cube1 = cube()
     cylinder1 = cylinder_2p(count=32, base_center=(0, -1, 0), top_center=(0, 1, 0), radius=.25)
 
+    csg_backend = get_csg_backend(CSG_BACKEND)
+    cube_mesh, cylinder_mesh = mesh_from_meshbuilder(cube1), mesh_from_meshbuilder(cylinder1)
+
     # build solid union
-    union = CSG(cube1) + CSG(cylinder1)
+    union = csg_backend.union(cube_mesh, cylinder_mesh)
     # convert to mesh and render mesh to modelspace
-    union.mesh().render_mesh(msp, dxfattribs={'color': 1})
+    meshbuilder_from_mesh(*union).render_mesh(msp, dxfattribs={'color': 1})
 
     # build solid difference
-    difference = CSG(cube1) - CSG(cylinder1)
+    difference = csg_backend.difference(cube_mesh, cylinder_mesh)
     # convert to mesh, translate mesh and render mesh to modelspace
-    difference.mesh().translate(1.5).render_mesh(msp, dxfattribs={'color': 3})
+    meshbuilder_from_mesh(*difference).translate(1.5).render_mesh(msp, dxfattribs={'color': 3})
 
     # build solid intersection
-    intersection = CSG(cube1) * CSG(cylinder1)
+    intersection = csg_backend.intersection(cube_mesh, cylinder_mesh)
     # convert to mesh, translate mesh and render mesh to modelspace
-    intersection.mesh().translate(2.75).render_mesh(msp, dxfattribs={'color': 5})
+    meshbuilder_from_mesh(*intersection).translate(2.75).render_mesh(msp, dxfattribs={'color': 5})
 
 
     
@@ -141,6 +201,14 @@ if __name__ == "__main__":
     sweeped_mesh_transformer = sweep(profile=base_circle_profile, sweeping_path=path, close=True, quads=True, caps=True)
     sweeped_mesh_transformer.translate(dx=5,dy=5,dz=10).render_mesh(msp, dxfattribs={'color': 8})
 
+    ###### EXAMPLE 3 - Oriented tolerance cones of all planned drillings at once, in the DXF and in an IFC file
+    cone_vertices, cone_faces = planned_borehole_cones(planned_boreholes, num_segments=32)
+    render_tolerance_cones(msp, cone_vertices, cone_faces, [{'color': 2, "layer": f"tolerance_bodies - {borehole.hole_id}"} for borehole in planned_boreholes])
+
+    model, project, site, body_3d_context, plan_2d_context = init_minimal_ifc_model(project_name="Planned drillings", add_site=True, site_name="Site")
+    add_tolerance_cones_to_ifc(model, body_3d_context, planned_boreholes, container=site, num_segments=32)
+    model.write(TOLERANCE_CONES_IFC_FILENAME)
+
     ###### EXAMPLE 2 - Tolerance Body
     tolerance_body = tolerance_body_as_mesh(start=(0,0,0), end=(15,15,15), start_radius=0.05, tolerance_factor=0.02)
     tolerance_body.render_mesh(msp, dxfattribs={'color': 2, "layer": "tolerance_bodies"})
@@ -3,8 +3,16 @@ from ezdxf.render.forms import sweep, circle
 from ezdxf.lldxf.const import DXFValueError
 
 import logging
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
-from borehole.borehole import Borehole, PathPoint, SurveySegment, Interval, Casing
+from borehole.borehole import Borehole, DrillingPath, PathPoint, SurveySegment, Interval, Casing
+from borehole.tube_mesh import tube_mesh, lod_tube_mesh, casing_path
+
+BENCHMARK = False # compare the serial ezdxf sweeps with the tube meshes built in the process pool
+LOD_TOLERANCES = None # e.g. (0.001, 0.05, 0.5) to write each mesh in three levels of detail on separate layers
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -24,7 +32,7 @@ def validate_borehole_data(borehole: Borehole) -> None:
 
 def create_borehole_cylinder(
     modelspace: ezdxf.document.Drawing.modelspace,
-    borehole_path: list[PathPoint],
+    borehole_path: DrillingPath | list[PathPoint],
     borehole_radius: float = 0.40,
     num_segments: int = 36,
     dxfattribs: dict = {"layer": "Borehole"},
@@ -32,7 +40,7 @@ def create_borehole_cylinder(
     """ Creates a 3D cylinder representation of a borehole based on its drilling path.
     Args:
         modelspace (ezdxf.document.Drawing.modelspace): The DXF modelspace where the cylinder will be added.
-        borehole_path (list[XYZPoint]): A list of XYZPoint instances representing the drilling path.
+        borehole_path (DrillingPath | list[PathPoint]): The drilling path.
         borehole_radius (float, optional): The radius of the borehole in meters. Defaults to 0.40.
         num_segments (int, optional): The number of segments used to approximate the circular profile. Defaults to 36.
         dxfattribs (dict, optional): Attributes for the DXF entities, such as layer information. Defaults to {"layer": "Borehole"}.
@@ -46,7 +54,10 @@ def create_borehole_cylinder(
     profile = list(circle(count=num_segments, radius=borehole_radius, elevation=0, close=True))
     
     # 2) Sweep the profile along the path to generate a 3D mesh
-    borehole_path = [(point.x, point.y, point.z) for point in borehole_path]  # Convert to immutable vectors
+    if(isinstance(borehole_path, DrillingPath)):
+        borehole_path = borehole_path.xyz.tolist()
+    else:
+        borehole_path = [(point.x, point.y, point.z) for point in borehole_path]  # Convert to immutable vectors
     mesh = sweep(profile, borehole_path, close=True, quads=True, caps=True)
     
     # 3) Add the resulting mesh to the DXF modelspace
@@ -55,6 +66,116 @@ def create_borehole_cylinder(
     
     return(mesh)
 
+def sweep_borehole_mesh(job: tuple[np.ndarray, float | np.ndarray, int, float | None]) -> tuple[np.ndarray, np.ndarray]:
+    """ Builds the tube mesh along a path as plain arrays (runs in the worker processes), see borehole.tube_mesh.
+    Args:
+        job (tuple[np.ndarray, float | np.ndarray, int, float | None]): the (N,3) path, the radius (or radius per segment),
+            the number of segments of the profile and an optional LOD tolerance in meters (decimates path and profile).
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The (M,3) vertices and the (F,3) triangles as vertex indices.
+    """
+    xyz, radius, num_segments, lod_tolerance = job
+    if(lod_tolerance is not None):
+        return lod_tube_mesh(xyz, radius, lod_tolerance, max_segments=num_segments)
+    return tube_mesh(xyz, radius, num_segments=num_segments)
+
+def collect_borehole_mesh_jobs(drillings: list[Borehole]) -> list[tuple[np.ndarray, float | np.ndarray, dict]]:
+    """ Collects the compact path arrays of all boreholes and their casings in a deterministic order.
+    Invalid boreholes are logged and skipped.
+    Returns:
+        list[tuple[np.ndarray, float | np.ndarray, dict]]: (xyz path, radius, dxfattribs) for each mesh.
+    """
+    jobs = []
+    for drilling in drillings:
+        try:
+            validate_borehole_data(drilling)  # Validate the borehole data
+        except ValueError as e:
+            logging.error(f"Error with {drilling.hole_id}: {e}")
+            continue
+        jobs.append((drilling.drilling_xyzpath.xyz, drilling.drilling_radius, {"layer": drilling.hole_id, "color": 40}))
+        # all casings of a drilling become one mesh (radius per segment)
+        casing_xyz, casing_radii = casing_path(drilling)
+        if(len(casing_xyz) >= 2):
+            jobs.append((casing_xyz, casing_radii, {"layer": f"{drilling.hole_id} - Casing", "color": 84}))
+    return jobs
+
+def create_borehole_cylinders_in_parallel(
+    modelspace: ezdxf.document.Drawing.modelspace,
+    drillings: list[Borehole],
+    num_segments: int = 36,
+    max_workers: int | None = None,
+    lod_tolerances: tuple[float, ...] | None = None,
+) -> int:
+    """ Creates the cylinders of all boreholes and casings: the tube meshes are built in a process pool
+    and rendered into the modelspace afterwards in one serial pass, in the order of the drillings.
+    With lod_tolerances every mesh is created once per level of detail on the layers "<layer> LOD<level>",
+    so viewers can switch off the detailed layers (see borehole.tube_mesh.screen_space_tolerance).
+    Args:
+        modelspace (ezdxf.document.Drawing.modelspace): The DXF modelspace where the cylinders will be added.
+        drillings (list[Borehole]): The boreholes with calculated drilling paths.
+        num_segments (int, optional): The number of segments used to approximate the circular profile. Defaults to 36.
+        max_workers (int | None, optional): The number of processes. Defaults to os.cpu_count().
+        lod_tolerances (tuple[float, ...] | None, optional): The geometric tolerance of each LOD in meters, finest first. Defaults to None (a single full resolution mesh).
+    Returns:
+        int: The number of rendered meshes.
+    """
+    jobs = collect_borehole_mesh_jobs(drillings)
+    if(lod_tolerances is None):
+        sweep_jobs = [(xyz, radius, num_segments, None) for xyz, radius, _ in jobs]
+    else:
+        sweep_jobs = [(xyz, radius, num_segments, tolerance) for xyz, radius, _ in jobs for tolerance in lod_tolerances]
+        jobs = [(xyz, radius, {**dxfattribs, "layer": f"{dxfattribs['layer']} LOD{level}"}) for xyz, radius, dxfattribs in jobs for level in range(len(lod_tolerances))]
+    max_workers = max_workers or os.cpu_count() or 1
+    if(max_workers == 1):
+        meshes = map(sweep_borehole_mesh, sweep_jobs) # no benefit from a pool, avoid its overhead
+        render_borehole_meshes(modelspace, meshes, [dxfattribs for _, _, dxfattribs in jobs])
+        return len(jobs)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        meshes = executor.map(sweep_borehole_mesh, sweep_jobs, chunksize=max(1, len(sweep_jobs) // (4 * max_workers)))
+        render_borehole_meshes(modelspace, meshes, [dxfattribs for _, _, dxfattribs in jobs]) # map keeps the order of the jobs
+    return len(jobs)
+
+def render_borehole_meshes(modelspace: ezdxf.document.Drawing.modelspace, meshes, dxfattribs: list[dict]) -> None:
+    """ Renders the (vertices, faces) results of sweep_borehole_mesh into the modelspace, in the given order. """
+    for (vertices, faces), attribs in zip(meshes, dxfattribs):
+        mesh = ezdxf.render.MeshBuilder()
+        mesh.vertices = [ezdxf.math.Vec3(vertex) for vertex in vertices.tolist()]
+        mesh.faces = faces.tolist()
+        mesh.render_mesh(modelspace, dxfattribs=attribs)
+
+def benchmark_borehole_cylinders(counts: tuple[int, ...] = (10, 100, 1000), max_depth: float = 100.0) -> None:
+    """ Prints the throughput of the serial create_borehole_cylinder (ezdxf sweep) loop and of create_borehole_cylinders_in_parallel
+    for an increasing number of synthetic inclined boreholes with three casings each.
+    """
+    from borehole.desurvey import calculate_drilling_paths
+
+    for count in counts:
+        drillings = [
+            Borehole(
+                hole_id=f"BH-{idx:05d}", easting=500.0 + idx, northing=1000.0, elevation=200.0, drilling_radius=0.1,
+                drilling_survey=[SurveySegment(depth=0, dip=idx % 45, azimuth=0), SurveySegment(depth=max_depth, dip=45, azimuth=idx % 360)],
+                casings=[Casing(depth_from=2.5, depth_to=5.0, casing_radius=0.2), Casing(depth_from=5.0, depth_to=7.0, casing_radius=0.3), Casing(depth_from=7.0, depth_to=max_depth, casing_radius=0.4)],
+                max_depth=max_depth,
+            )
+            for idx in range(count)
+        ]
+        calculate_drilling_paths(drillings)
+
+        start_time = time.perf_counter()
+        msp = ezdxf.new("R2018").modelspace()
+        logging.disable(logging.INFO)
+        for drilling in drillings:
+            create_borehole_cylinder(msp, drilling.drilling_xyzpath, drilling.drilling_radius, dxfattribs={"layer": drilling.hole_id})
+            for casing in drilling.casings:
+                create_borehole_cylinder(msp, drilling.get_sub_path(casing.depth_from, casing.depth_to), casing.casing_radius, dxfattribs={"layer": drilling.hole_id})
+        logging.disable(logging.NOTSET)
+        serial_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        mesh_count = create_borehole_cylinders_in_parallel(ezdxf.new("R2018").modelspace(), drillings)
+        parallel_time = time.perf_counter() - start_time
+        print(f"{count} boreholes ({mesh_count} meshes): ezdxf sweeps {count / serial_time:.1f} boreholes/s, tube meshes {count / parallel_time:.1f} boreholes/s")
+
 def example5_main():
     """Main function to create and save a series of boreholes in a DXF file.
 
@@ -118,30 +239,8 @@ def example5_main():
 
     drillings = [borehole1, borehole2]
 
-    # 3) Validate each drilling and create 3D meshes
-    for drilling in drillings:
-        try:
-            validate_borehole_data(drilling)  # Validate the borehole data
-            borehole_mesh  = create_borehole_cylinder(
-                modelspace=msp,
-                borehole_path=drilling.drilling_xyzpath,
-                borehole_radius=drilling.drilling_radius,
-                dxfattribs={"layer": drilling.hole_id, "color": 40},
-            )
-            for casing in drilling.casings:
-                filtered_drilling_xyzpath = [
-                    point for point in drilling.drilling_xyzpath
-                    if casing.depth_from <= point.depth <= casing.depth_to
-                ]
-                casing_mesh = create_borehole_cylinder(
-                    modelspace=msp,
-                    borehole_path=filtered_drilling_xyzpath,
-                    borehole_radius=casing.casing_radius,
-                    dxfattribs={"layer": f"{drilling.hole_id} - Casing", "color": 84},
-                )
-            
-        except ValueError as e:
-            logging.error(f"Error with {drilling.hole_id}: {e}")
+    # 3) Validate each drilling and create 3D meshes for the drillings and their casings (swept in parallel)
+    create_borehole_cylinders_in_parallel(modelspace=msp, drillings=drillings, lod_tolerances=LOD_TOLERANCES)
 
     # 4) Save the DXF file
     save_path = "/Users/valentin/Desktop/Share/01-5_dxfs/example5_drillinghole_as_built.dxf"
@@ -150,3 +249,5 @@ def example5_main():
 
 if __name__ == "__main__":
     example5_main()
+    if(BENCHMARK):
+        benchmark_borehole_cylinders()
@@ -0,0 +1,61 @@
+### IMPORTS
+import ifcopenshell
+from ifcopenshell.api import run
+import ifcopenshell.validate
+
+import os
+from logging import getLogger
+
+from borehole.borehole import Borehole, SurveySegment, Casing, Interval
+from borehole.desurvey import calculate_drilling_paths
+from borehole.ifc_export import add_boreholes_to_ifc
+from ifc_utils.ifc_utils import init_minimal_ifc_model
+
+### CONSTANTS
+EXPORT_FILENAME = "./data/example6_boreholes.ifc"
+
+### FUNCTIONS
+def create_sample_boreholes() -> list[Borehole]:
+    """
+    Creates two sample boreholes (vertical and inclined) with casings and lithology intervals.
+    """
+    casings = [Casing(depth_from=0.0, depth_to=2.5, casing_radius=0.2), Casing(depth_from=2.5, depth_to=7.0, casing_radius=0.15)]
+    intervals = [
+        Interval(depth_from=0.0, depth_to=1.2, lithology="Fill"),
+        Interval(depth_from=1.2, depth_to=4.8, lithology="Sand"),
+        Interval(depth_from=4.8, depth_to=10.0, lithology="Clay"),
+    ]
+    return [
+        Borehole(
+            hole_id="BH-001 - vertical", easting=500.0, northing=1000.0, elevation=200.0, drilling_radius=0.1, max_depth=10.0,
+            drilling_survey=[SurveySegment(depth=0, dip=0, azimuth=0), SurveySegment(depth=10, dip=0, azimuth=0)],
+            casings=casings, intervals=intervals,
+        ),
+        Borehole(
+            hole_id="BH-002 - curved", easting=505.0, northing=1000.0, elevation=200.0, drilling_radius=0.1, max_depth=10.0,
+            drilling_survey=[SurveySegment(depth=0, dip=0, azimuth=0), SurveySegment(depth=10, dip=45, azimuth=90)],
+            casings=casings, intervals=intervals,
+        ),
+    ]
+
+### MAIN
+if __name__ == "__main__":
+
+    ### 1. Init the model with a site and an additional axis context for the lightweight overview geometry
+    model, project, site, body_3d_context, plan_2d_context = init_minimal_ifc_model(project_name="Boreholes", add_site=True, site_name="Site")
+    axis_3d_context = run("context.add_context", model, context_type="Model", context_identifier="Axis", target_view="GRAPH_VIEW", parent=body_3d_context.ParentContext)
+
+    ### 2. Desurvey the boreholes
+    boreholes = create_sample_boreholes()
+    calculate_drilling_paths(boreholes)
+
+    ### 3. One element with a IfcSweptDiskSolid per interval and casing
+    elements = add_boreholes_to_ifc(model, body_3d_context, boreholes, container=site, axis_context=axis_3d_context)
+
+    ### 4. Validate the model
+    logger = getLogger("ifcopenshell")
+    ifcopenshell.validate.validate(model, logger)
+
+    ### 5. Write the model to disk
+    model.write(EXPORT_FILENAME)
+    print(f"{len(elements)} borehole elements have been written to: {EXPORT_FILENAME} ({os.path.getsize(EXPORT_FILENAME)} bytes)")
@@ -1,4 +1,25 @@
+import copy
+import numpy as np
+
 from borehole.borehole import SurveySegment, Casing, Borehole, PathPoint, Interval
+from borehole.desurvey import calculate_drilling_paths
+
+def compare_adaptive_sampling(borehole: Borehole, chord_tolerance: float = 0.01, spacing: float = 1.0) -> tuple[int, int, float]:
+    """
+    Samples copies of the borehole with fixed spacing and adaptively by curvature and measures the
+    deviation of the adaptive polyline from the densely sampled path (interpolated at the fixed depths).
+    Returns:
+        tuple[int, int, float]: number of fixed and adaptive path points and the maximum deviation in meters
+    """
+    fixed, adaptive = copy.deepcopy(borehole), copy.deepcopy(borehole)
+    fixed.calculate_depths(spacing=spacing)
+    adaptive.calculate_adaptive_depths(chord_tolerance=chord_tolerance)
+    calculate_drilling_paths([fixed, adaptive])
+
+    fixed_path, adaptive_path = fixed.drilling_xyzpath, adaptive.drilling_xyzpath
+    interpolated = np.column_stack([np.interp(fixed_path.depth, adaptive_path.depth, adaptive_path.xyz[:, col]) for col in range(3)])
+    max_deviation = float(np.linalg.norm(interpolated - fixed_path.xyz, axis=1).max())
+    return len(fixed_path), len(adaptive_path), max_deviation
 
 def example7_main():
         
@@ -30,6 +51,14 @@ def example7_main():
     )
     borehole.calculate_drilling_path()
 
+    long_borehole = Borehole(
+        hole_id="BH-002", easting=500.0, northing=1000.0, elevation=200.0, drilling_radius=0.1, max_depth=1000.0,
+        drilling_survey=[SurveySegment(depth=0, dip=0, azimuth=0), SurveySegment(depth=600, dip=0, azimuth=0), SurveySegment(depth=1000, dip=60, azimuth=90)],
+        casings=[Casing(depth_from=0, depth_to=50, casing_radius=0.2)],
+    )
+    fixed_count, adaptive_count, max_deviation = compare_adaptive_sampling(long_borehole)
+    print(f"Adaptive sampling: {adaptive_count} instead of {fixed_count} path points, max. deviation {max_deviation * 1000:.1f} mm")
+
     # Output the drilling path
     for idx, point in enumerate(borehole.drilling_xyzpath):
         if(point.depth is not None):
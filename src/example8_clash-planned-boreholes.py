@@ -0,0 +1,44 @@
+### IMPORTS
+import time
+
+from borehole.clash import detect_clashes, planned_boreholes_from_rows
+from ifc_utils.ifc_model_index import open_model_index
+from ifc_utils.ifc_utils import read_csv_columns, write_list_of_dict_to_csv
+
+### CONSTANTS
+IFC_FILENAME = "./data/AC20-FZK-Haus.ifc" # the existing structures (walls, slabs, foundations, ...)
+PLANNED_DRILLINGS_FILENAME = "./data/planned_drillings.csv" # hole_id, start_x, start_y, start_z, end_x, end_y, end_z[, start_radius, tolerance_factor]
+EXPORT_FILENAME = "./data/planned_drillings_clashes.csv"
+
+### MAIN
+if __name__ == "__main__":
+
+    start_time = time.perf_counter()
+
+    ### 1. Planned boreholes with their tolerance cones
+    columns = read_csv_columns(PLANNED_DRILLINGS_FILENAME, schema={'hole_id': str}, infer_integers=False)
+    planned_drillings = [dict(zip(columns, row)) for row in zip(*(column.tolist() for column in columns.values()))]
+    planned_boreholes = planned_boreholes_from_rows(planned_drillings, start_radius=0.05, tolerance_factor=0.02)
+
+    ### 2. Bounding box index of the existing structures (persisted next to the ifc file for the next run)
+    model_index = open_model_index(IFC_FILENAME)
+
+    ### 3. Broad phase, tessellation of the candidates and exact cone vs. mesh tests in parallel across the holes
+    results = detect_clashes(model_index.model, planned_boreholes, spatial_index=model_index.spatial_index)
+
+    ### 4. Write the first contact per hole
+    rows = [
+        {
+            "hole_id": result["hole_id"],
+            "first_contact_depth": result["first_contact_depth"],
+            "first_contact_global_id": result["first_contact_global_id"],
+            "clash_count": len(result["clashes"]),
+        }
+        for result in results
+    ]
+    write_list_of_dict_to_csv(rows, EXPORT_FILENAME)
+    for row in rows:
+        if(row["first_contact_depth"] is not None):
+            print(f"{row['hole_id']}: first contact at {row['first_contact_depth']:.2f} m with {row['first_contact_global_id']} ({row['clash_count']} clashing elements)")
+    print(f"{sum(row['first_contact_depth'] is not None for row in rows)} of {len(rows)} planned boreholes clash, results written to: {EXPORT_FILENAME}")
+    print(f"Execution time: {(time.perf_counter() - start_time):.4f} seconds")
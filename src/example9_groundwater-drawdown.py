@@ -0,0 +1,114 @@
+### IMPORTS
+import math
+import os
+import time
+
+import ezdxf
+import numpy as np
+
+from borehole.csg import meshbuilder_from_mesh
+from groundwater.drawdown import Well, grid_surface_mesh, pumping_rate_for_drawdown, sichardt_radius, water_table, water_table_grid, wells_from_rows
+from groundwater.ifc_export import add_water_table_surface_to_ifc
+from ifc_utils.ifc_utils import init_minimal_ifc_model, read_csv_columns
+
+### CONSTANTS
+BENCHMARK = False # compare a per point and per well Python loop with the vectorized water_table
+WELLS_FILENAME = "./data/dewatering_wells.csv" # well_id, x, y[, pumping_rate, drawdown, well_radius], wells around a sample pit if missing
+DXF_FILENAME = "./data/example9_groundwater_table.dxf"
+IFC_FILENAME = "./data/example9_groundwater_table.ifc"
+
+K = 3.09e-03 # kf-Wert in m/s
+H = 15.0 # Wassererfüllte Mächtigkeit des Aquifers vor der Absenkung in m
+AQUIFER_BASE = -15.0 # elevation of the aquifer base in m
+DRAWDOWN = 1.32 # target drawdown per well in m (radius of influence after Sichardt)
+CELL_SIZE = 2.0 # grid spacing of the groundwater table in m
+
+### FUNCTIONS
+def create_pit_wells(width: float = 60.0, length: float = 40.0, spacing: float = 5.0, pumping_rate: float = 0.005, drawdown: float = DRAWDOWN) -> list[Well]:
+    """
+    Creates dewatering wells along the edges of a rectangular excavation pit centred at the origin.
+    """
+    perimeter = 2.0 * (width + length)
+    positions = np.arange(0.0, perimeter, spacing)
+    # walk along the edges: bottom, right, top, left
+    corners = np.array([(-width / 2, -length / 2), (width / 2, -length / 2), (width / 2, length / 2), (-width / 2, length / 2), (-width / 2, -length / 2)])
+    edge_ends = np.cumsum([0.0, width, length, width, length])
+    edge = np.searchsorted(edge_ends, positions, side='right') - 1
+    fractions = (positions - edge_ends[edge]) / (edge_ends[edge + 1] - edge_ends[edge])
+    xy = corners[edge] + fractions[:, None] * (corners[edge + 1] - corners[edge])
+    return [Well(well_id=f"W-{idx + 1:03d}", x=float(x), y=float(y), pumping_rate=pumping_rate, drawdown=drawdown) for idx, (x, y) in enumerate(xy.tolist())]
+
+def water_table_per_point(points: list, wells: list[Well], k: float, H: float) -> list:
+    """ The superposed water table with one Python evaluation per point and well (like calculate_y of archive/groundwater_geometries.py). """
+    thickness = []
+    for x, y in points:
+        lowering = 0.0
+        for well in wells:
+            R = 3000 * well.drawdown * math.sqrt(k)
+            distance = max(math.hypot(x - well.x, y - well.y), well.well_radius)
+            if(distance < R):
+                lowering += (well.pumping_rate / (math.pi * k)) * math.log(R / distance)
+        thickness.append(math.sqrt(max(H**2 - lowering, 0.0)))
+    return thickness
+
+def benchmark_water_table(well_counts: tuple[int, ...] = (10, 100, 500), grid_size: int = 100) -> None:
+    """ Prints the runtime of water_table_per_point and of the vectorized water_table on a grid_size x grid_size grid. """
+    rng = np.random.default_rng(0)
+    grid_x, grid_y = np.meshgrid(np.linspace(-200.0, 200.0, grid_size), np.linspace(-200.0, 200.0, grid_size))
+    points = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+    for count in well_counts:
+        wells = [Well(well_id=str(idx), x=x, y=y, pumping_rate=0.001, drawdown=DRAWDOWN) for idx, (x, y) in enumerate(rng.uniform(-50.0, 50.0, (count, 2)).tolist())]
+
+        start_time = time.perf_counter()
+        looped = water_table_per_point(points.tolist(), wells, K, H)
+        loop_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        vectorized = water_table(
+            points,
+            np.array([(well.x, well.y) for well in wells]),
+            np.array([well.pumping_rate for well in wells]),
+            K,
+            H,
+            sichardt_radius(np.array([well.drawdown for well in wells]), K),
+        )
+        vector_seconds = time.perf_counter() - start_time
+        print(f"{count} wells, {len(points)} points: per point {loop_seconds:.4f} s, vectorized {vector_seconds:.4f} s ({loop_seconds / max(vector_seconds, 1e-9):.0f}x, max. difference {np.abs(vectorized - looped).max():.2e} m)")
+
+### MAIN
+if __name__ == "__main__":
+
+    if(BENCHMARK):
+        benchmark_water_table()
+
+    start_time = time.perf_counter()
+
+    ### 1. Dewatering wells (single well for comparison: Q for the target drawdown without superposition)
+    if(os.path.exists(WELLS_FILENAME)):
+        columns = read_csv_columns(WELLS_FILENAME, schema={'well_id': str}, infer_integers=False)
+        wells = wells_from_rows([dict(zip(columns, row)) for row in zip(*(column.tolist() for column in columns.values()))], K, H, drawdown=DRAWDOWN)
+    else:
+        wells = create_pit_wells()
+    print(f"{len(wells)} wells, single well pumping rate for {DRAWDOWN} m drawdown: {float(pumping_rate_for_drawdown(DRAWDOWN, K, H)):.4f} m3/s")
+
+    ### 2. Superposed groundwater table on a grid around the wells
+    xs, ys, thickness = water_table_grid(wells, K, H, cell_size=CELL_SIZE)
+    print(f"{thickness.size} grid points, max. drawdown {H - thickness.min():.2f} m")
+
+    ### 3. DXF: the groundwater table as mesh and the wells as circles
+    doc = ezdxf.new()
+    doc.units = ezdxf.units.M
+    msp = doc.modelspace()
+    vertices, faces = grid_surface_mesh(xs, ys, AQUIFER_BASE + thickness)
+    meshbuilder_from_mesh(vertices, faces).render_mesh(msp, dxfattribs={'color': 5, "layer": "groundwater_table"})
+    for well in wells:
+        msp.add_circle((well.x, well.y, AQUIFER_BASE + H), radius=well.well_radius, dxfattribs={'color': 1, "layer": "wells"})
+    doc.saveas(DXF_FILENAME)
+
+    ### 4. IFC: the groundwater table as IfcGeographicElement
+    model, project, site, body_3d_context, plan_2d_context = init_minimal_ifc_model(project_name="Groundwater drawdown", add_site=True, site_name="Site")
+    add_water_table_surface_to_ifc(model, body_3d_context, xs, ys, thickness, AQUIFER_BASE, K, H, wells=wells, container=site)
+    model.write(IFC_FILENAME)
+
+    print(f"Results written to: {DXF_FILENAME} and {IFC_FILENAME}")
+    print(f"Execution time: {(time.perf_counter() - start_time):.4f} seconds")
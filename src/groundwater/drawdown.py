@@ -0,0 +1,170 @@
+"""
+Vectorized groundwater drawdown of dewatering wells in an unconfined aquifer.
+
+A single well follows Dupuit-Thiem (as calculate_y of archive/groundwater_geometries.py), with the radius of
+influence R after Sichardt:
+    y(x)^2 = h^2 + Q / (pi * k) * ln(x / r)   for r < x < R,   y = H for x >= R,   R = 3000 * s * sqrt(k)
+Several wells are superposed in the squared saturated thickness (Forchheimer):
+    y^2 = H^2 - sum_i Q_i / (pi * k) * ln(R_i / max(x_i, r_i))   over the wells with x_i < R_i
+For a single well with the pumping rate of pumping_rate_for_drawdown both are identical. The water table of all
+points of a grid is evaluated at once against all wells (in chunks of points to bound the memory).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+@dataclass
+class Well:
+    well_id: str
+    x: float
+    y: float
+    pumping_rate: float  # Q in m3/s
+    drawdown: float  # target drawdown s at the well in m, gives the radius of influence (Sichardt)
+    well_radius: float = 0.2  # r in m
+
+def sichardt_radius(drawdown: float | np.ndarray, k: float) -> float | np.ndarray:
+    """
+    Radius of influence after Sichardt, R = 3000 * s * sqrt(k) (see calculate_R of archive/groundwater_geometries.py).
+    Args:
+        drawdown (float | np.ndarray): drawdown s in m
+        k (float): hydraulic conductivity (kf-Wert) in m/s
+    Returns:
+        float | np.ndarray: R in m
+    """
+    return 3000.0 * np.asarray(drawdown, dtype=np.float64) * np.sqrt(k)
+
+def pumping_rate_for_drawdown(drawdown: float | np.ndarray, k: float, H: float, well_radius: float | np.ndarray = 0.2) -> float | np.ndarray:
+    """
+    Pumping rate of a single well for a drawdown s at the well: Q = pi * k * (H^2 - (H - s)^2) / ln(R / r).
+    Args:
+        drawdown (float | np.ndarray): drawdown s in m
+        k (float): hydraulic conductivity in m/s
+        H (float): saturated thickness of the aquifer before the drawdown in m
+        well_radius (float | np.ndarray): r in m
+    Returns:
+        float | np.ndarray: Q in m3/s
+    """
+    drawdown = np.asarray(drawdown, dtype=np.float64)
+    return np.pi * k * (H**2 - (H - drawdown)**2) / np.log(sichardt_radius(drawdown, k) / np.asarray(well_radius, dtype=np.float64))
+
+def water_table(
+    points: np.ndarray,
+    well_xy: np.ndarray,
+    pumping_rates: np.ndarray,
+    k: float,
+    H: float,
+    radii_of_influence: np.ndarray,
+    well_radii: float | np.ndarray = 0.2,
+    chunk_size: int = 1 << 22,
+) -> np.ndarray:
+    """
+    Superposed saturated thickness y of the aquifer at many points for many wells (see the module docstring).
+    Args:
+        points (np.ndarray): (P,2) x, y of the evaluation points
+        well_xy (np.ndarray): (N,2) x, y of the wells
+        pumping_rates (np.ndarray): (N,) Q in m3/s
+        k (float): hydraulic conductivity in m/s
+        H (float): saturated thickness of the aquifer before the drawdown in m
+        radii_of_influence (np.ndarray): (N,) R in m, e.g. from sichardt_radius
+        well_radii (float | np.ndarray): r in m, scalar or (N,)
+        chunk_size (int): maximum number of point-well pairs per step
+    Returns:
+        np.ndarray: (P,) y in m (0 where the aquifer falls dry), the drawdown is H - y
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    well_xy = np.asarray(well_xy, dtype=np.float64).reshape(-1, 2)
+    radii_of_influence = np.broadcast_to(np.asarray(radii_of_influence, dtype=np.float64), len(well_xy))
+    well_radii = np.broadcast_to(np.asarray(well_radii, dtype=np.float64), len(well_xy))
+    factors = np.broadcast_to(np.asarray(pumping_rates, dtype=np.float64), len(well_xy)) / (np.pi * k)
+    # only the wells with a positive range contribute, their squared radii avoid a sqrt per pair
+    active = radii_of_influence > well_radii
+    well_xy, factors, log_radii = well_xy[active], factors[active], np.log(radii_of_influence[active])
+    squared_radii, squared_well_radii = radii_of_influence[active]**2, well_radii[active]**2
+
+    lowering = np.zeros(len(points))
+    batch = max(1, chunk_size // max(len(well_xy), 1))
+    for chunk in range(0, len(points) if len(well_xy) else 0, batch):
+        offsets = points[chunk:chunk + batch, None, :] - well_xy[None, :, :]
+        squared_distances = np.maximum(np.einsum('pwi,pwi->pw', offsets, offsets), squared_well_radii)
+        # ln(R / x) = ln(R) - ln(x^2) / 2, zero outside the radius of influence
+        terms = np.where(squared_distances < squared_radii, factors * (log_radii - 0.5 * np.log(squared_distances)), 0.0)
+        lowering[chunk:chunk + batch] = terms.sum(axis=1)
+    return np.sqrt(np.maximum(H**2 - lowering, 0.0))
+
+def _is_missing(value) -> bool:
+    # empty csv values: None, '' or NaN (e.g. from pandas or read_csv_columns)
+    return value is None or value == '' or (isinstance(value, float) and np.isnan(value))
+
+def wells_from_rows(rows: list[dict], k: float, H: float, drawdown: float = 1.0, well_radius: float = 0.2) -> list[Well]:
+    """
+    Creates the wells from csv rows (e.g. the rows of read_csv_columns, see example9) with the columns well_id, x, y and the optional
+    columns pumping_rate, drawdown and well_radius (empty values, i.e. None, '' or NaN, fall back to the defaults,
+    a missing pumping rate is derived from the drawdown, see pumping_rate_for_drawdown).
+    """
+    wells = []
+    for row in rows:
+        well_drawdown = float(row['drawdown']) if not _is_missing(row.get('drawdown')) else drawdown
+        radius = float(row['well_radius']) if not _is_missing(row.get('well_radius')) else well_radius
+        if(not _is_missing(row.get('pumping_rate'))):
+            pumping_rate = float(row['pumping_rate'])
+        else:
+            pumping_rate = float(pumping_rate_for_drawdown(well_drawdown, k, H, radius))
+        wells.append(Well(well_id=str(row['well_id']), x=float(row['x']), y=float(row['y']), pumping_rate=pumping_rate, drawdown=well_drawdown, well_radius=radius))
+    return wells
+
+def water_table_grid(
+    wells: list[Well],
+    k: float,
+    H: float,
+    cell_size: float = 1.0,
+    extent: tuple[float, float, float, float] | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Evaluates the superposed saturated thickness of all wells on a regular grid.
+    Args:
+        wells (list[Well]): e.g. from wells_from_rows
+        k (float): hydraulic conductivity in m/s
+        H (float): saturated thickness of the aquifer before the drawdown in m
+        cell_size (float): grid spacing in m
+        extent (tuple, optional): (min_x, min_y, max_x, max_y), defaults to the wells plus their largest radius of influence
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: the (nx,) x and (ny,) y coordinates and the (ny,nx) thickness y
+    """
+    well_xy = np.array([(well.x, well.y) for well in wells], dtype=np.float64).reshape(-1, 2)
+    radii_of_influence = sichardt_radius(np.array([well.drawdown for well in wells], dtype=np.float64), k)
+    if(extent is None):
+        if(not wells):
+            raise ValueError("The extent of the grid is needed, if there are no wells.")
+        margin = float(radii_of_influence.max())
+        extent = (*(well_xy.min(axis=0) - margin), *(well_xy.max(axis=0) + margin))
+    xs = np.arange(extent[0], extent[2] + 0.5 * cell_size, cell_size)
+    ys = np.arange(extent[1], extent[3] + 0.5 * cell_size, cell_size)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    thickness = water_table(
+        np.column_stack([grid_x.ravel(), grid_y.ravel()]),
+        well_xy,
+        np.array([well.pumping_rate for well in wells], dtype=np.float64),
+        k,
+        H,
+        radii_of_influence,
+        well_radii=np.array([well.well_radius for well in wells], dtype=np.float64),
+    )
+    return xs, ys, thickness.reshape(len(ys), len(xs))
+
+def grid_surface_mesh(xs: np.ndarray, ys: np.ndarray, z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Triangulates a grid of heights, two triangles per cell with upward normals.
+    Args:
+        xs (np.ndarray): (nx,) x coordinates
+        ys (np.ndarray): (ny,) y coordinates
+        z (np.ndarray): (ny,nx) heights, e.g. the aquifer base plus the thickness of water_table_grid
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (ny*nx,3) vertices and (2*(ny-1)*(nx-1),3) triangles
+    """
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    vertices = np.column_stack([grid_x.ravel(), grid_y.ravel(), np.asarray(z, dtype=np.float64).ravel()])
+    corner = (np.arange(len(ys) - 1)[:, None] * len(xs) + np.arange(len(xs) - 1)[None, :]).ravel()
+    right, above = corner + 1, corner + len(xs)
+    faces = np.concatenate([np.column_stack([corner, right, above + 1]), np.column_stack([corner, above + 1, above])])
+    return vertices, faces.astype(np.int64)
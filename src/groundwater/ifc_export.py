@@ -0,0 +1,69 @@
+"""
+Export of a lowered groundwater table (see water_table_grid) to IFC as triangulated surface.
+"""
+
+import ifcopenshell
+import ifcopenshell.util.unit
+import numpy as np
+
+from groundwater.drawdown import Well, grid_surface_mesh
+from ifc_utils.ifc_utils import create_elements_in_bulk
+from ifc_utils.ifc_representations import create_triangulated_face_set_representation
+
+def add_water_table_surface_to_ifc(
+    model: ifcopenshell.file,
+    body_context: ifcopenshell.entity_instance,
+    xs: np.ndarray,
+    ys: np.ndarray,
+    thickness: np.ndarray,
+    aquifer_base: float,
+    k: float,
+    H: float,
+    wells: list[Well] | None = None,
+    container: ifcopenshell.entity_instance | None = None,
+    name: str = "Groundwater table",
+    pset_name: str = "GroundwaterDrawdown",
+) -> ifcopenshell.entity_instance:
+    """
+    Creates one IfcGeographicElement with the lowered groundwater table as open IfcTriangulatedFaceSet,
+    placed at the corner of the grid.
+    - Pset: AquiferBase, AquiferThickness, HydraulicConductivity, MaxDrawdown (in meters) and WellCount
+    Args:
+        model (ifcopenshell.file): e.g. from init_minimal_ifc_model
+        body_context (ifcopenshell.entity_instance): the Model/Body subcontext
+        xs (np.ndarray): (nx,) x coordinates of the grid, e.g. from water_table_grid
+        ys (np.ndarray): (ny,) y coordinates of the grid
+        thickness (np.ndarray): (ny,nx) saturated thickness of the aquifer
+        aquifer_base (float): elevation of the aquifer base in meters
+        k (float): hydraulic conductivity in m/s
+        H (float): saturated thickness of the aquifer before the drawdown in m
+        wells (list[Well], optional): the wells, only counted in the pset
+        container (ifcopenshell.entity_instance, optional): e.g. the IfcSite
+        name (str): the name of the element
+        pset_name (str): the name of the property set
+    Returns:
+        ifcopenshell.entity_instance: the created element
+    """
+    unit_scale = ifcopenshell.util.unit.calculate_unit_scale(model)
+    vertices, faces = grid_surface_mesh(xs, ys, aquifer_base + np.asarray(thickness, dtype=np.float64))
+    origin = np.array([xs[0], ys[0], aquifer_base], dtype=np.float64)
+
+    element = create_elements_in_bulk(
+        model,
+        origin[None, :],
+        ifc_class="IfcGeographicElement",
+        names=[name],
+        pset_name=pset_name,
+        properties={
+            "AquiferBase": float(aquifer_base),
+            "AquiferThickness": float(H),
+            "HydraulicConductivity": float(k),
+            "MaxDrawdown": float(H - np.min(thickness)),
+            "WellCount": len(wells or []),
+        },
+        container=container,
+    )[0]
+    element.ObjectType = "GroundwaterTable"
+    representation = create_triangulated_face_set_representation(model, body_context, (vertices - origin) / unit_scale, faces, closed=False)
+    element.Representation = model.createIfcProductDefinitionShape(None, None, [representation])
+    return element
@@ -0,0 +1,309 @@
+"""
+Analytic volumes, surface areas and bounding boxes of primitive IFC representations.
+
+Spheres, csg primitives and extruded area solids (e.g. created by create_sphere_representation and
+create_cylinder_representation) are evaluated directly from their IFC parameters instead of tessellating
+them. Everything else (B-reps, triangulated geometry, booleans, ...) falls back to calc_volumes.
+"""
+
+import math
+import numpy as np
+import ifcopenshell
+import ifcopenshell.util.element
+import ifcopenshell.util.placement
+import ifcopenshell.util.unit
+from typing import Callable
+
+from ifc_utils.ifc_utils import calc_volumes
+
+OBLIQUE_CURVE_SEGMENTS = 720 # discretisation of curved profiles for the lateral area of oblique extrusions
+
+class UnsupportedGeometry(Exception):
+    """Raised if a representation item can not be evaluated analytically."""
+
+def _get_transformation_operator_matrix(operator: ifcopenshell.entity_instance) -> np.ndarray:
+    # same conventions as ifcopenshell.util.placement.get_cartesiantransformationoperator3d
+    if(not operator.is_a("IfcCartesianTransformationOperator3D")):
+        raise UnsupportedGeometry(f"{operator.is_a()} is not supported")
+    axis1 = np.array(operator.Axis1.DirectionRatios if operator.Axis1 else (1.0, 0.0, 0.0))
+    axis2 = np.array(operator.Axis2.DirectionRatios if operator.Axis2 else (0.0, 1.0, 0.0))
+    axis3 = np.array(operator.Axis3.DirectionRatios if operator.Axis3 else (0.0, 0.0, 1.0))
+    matrix = ifcopenshell.util.placement.a2p(np.array(operator.LocalOrigin.Coordinates), axis3, axis1)
+    if(matrix[0:3, 1].dot(axis2) < 0.0):
+        matrix[0:3, 1] *= -1.0
+
+    scale1 = operator.Scale if operator.Scale is not None else 1.0
+    scale2 = scale3 = scale1
+    if(operator.is_a("IfcCartesianTransformationOperator3DnonUniform")):
+        scale2 = operator.Scale2 if operator.Scale2 is not None else scale1
+        scale3 = operator.Scale3 if operator.Scale3 is not None else scale1
+    matrix[0:3, 0] *= scale1
+    matrix[0:3, 1] *= scale2
+    matrix[0:3, 2] *= scale3
+    return matrix
+
+def _get_body_items(element: ifcopenshell.entity_instance) -> list[tuple[ifcopenshell.entity_instance, np.ndarray]]:
+    """
+    Returns all body representation items of an element (mapped items resolved) with their
+    transformation relative to the object placement. If the element has no representation,
+    the representation maps of its type are used.
+    """
+    representations = []
+    if(element.Representation is not None):
+        representations = [(rep, np.eye(4)) for rep in element.Representation.Representations]
+    else:
+        element_type = ifcopenshell.util.element.get_type(element)
+        for representation_map in (getattr(element_type, 'RepresentationMaps', None) or []):
+            origin = ifcopenshell.util.placement.get_axis2placement(representation_map.MappingOrigin)
+            representations.append((representation_map.MappedRepresentation, origin))
+
+    body_representations = [(rep, matrix) for rep, matrix in representations if rep.RepresentationIdentifier == 'Body']
+    if(len(body_representations) == 0):
+        raise UnsupportedGeometry("no body representation found")
+
+    items = []
+    stack = [(item, matrix) for rep, matrix in body_representations for item in rep.Items]
+    while stack:
+        item, matrix = stack.pop()
+        if(item.is_a("IfcMappedItem")):
+            source = item.MappingSource
+            item_matrix = matrix @ _get_transformation_operator_matrix(item.MappingTarget) @ ifcopenshell.util.placement.get_axis2placement(source.MappingOrigin)
+            stack.extend((mapped_item, item_matrix) for mapped_item in source.MappedRepresentation.Items)
+        else:
+            items.append((item, matrix))
+    return items
+
+def _get_position_matrix(position: ifcopenshell.entity_instance | None) -> np.ndarray:
+    return ifcopenshell.util.placement.get_axis2placement(position) if position is not None else np.eye(4)
+
+def _polyline_points(curve: ifcopenshell.entity_instance) -> np.ndarray:
+    if(curve.is_a("IfcPolyline")):
+        points = np.array([point.Coordinates[0:2] for point in curve.Points], dtype=np.float64)
+    elif(curve.is_a("IfcIndexedPolyCurve") and all(segment.is_a("IfcLineIndex") for segment in (curve.Segments or []))):
+        coordinates = np.array(curve.Points.CoordList, dtype=np.float64)[:, 0:2]
+        if(curve.Segments):
+            indices = [curve.Segments[0].wrappedValue[0]]
+            for segment in curve.Segments:
+                indices.extend(segment.wrappedValue[1:])
+            points = coordinates[np.array(indices) - 1]
+        else:
+            points = coordinates
+    else:
+        raise UnsupportedGeometry(f"profile curve {curve.is_a()} is not supported")
+    if(np.allclose(points[0], points[-1])):
+        points = points[:-1]
+    return points
+
+def _polygon_area(points: np.ndarray) -> float:
+    # shoelace formula
+    x, y = points[:, 0], points[:, 1]
+    return abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+def _ellipse_perimeter(a: float, b: float) -> float:
+    # Ramanujan's second approximation, exact for circles
+    h = ((a - b) / (a + b))**2 if (a + b) > 0 else 0.0
+    return math.pi * (a + b) * (1 + 3 * h / (10 + math.sqrt(4 - 3 * h)))
+
+def _evaluate_profile(profile: ifcopenshell.entity_instance) -> dict:
+    """
+    Returns the area of a profile and its boundary in profile coordinates:
+        'polygons': list of closed polygons (N,2), 'ellipses': list of (center, semi_axis1, semi_axis2) as 2D vectors
+    """
+    ifc_class = profile.is_a()
+    if(ifc_class in ("IfcCircleProfileDef", "IfcCircleHollowProfileDef", "IfcEllipseProfileDef", "IfcRectangleProfileDef")):
+        matrix = _get_position_matrix(profile.Position)[0:2, :]
+        center, axis1, axis2 = matrix[:, 3], matrix[:, 0], matrix[:, 1]
+        if(ifc_class == "IfcRectangleProfileDef"):
+            corners = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1)]) * (profile.XDim / 2, profile.YDim / 2)
+            polygon = center + corners[:, 0:1] * axis1 + corners[:, 1:2] * axis2
+            return {'area': profile.XDim * profile.YDim, 'polygons': [polygon], 'ellipses': []}
+        if(ifc_class == "IfcEllipseProfileDef"):
+            semi_axis1, semi_axis2 = profile.SemiAxis1, profile.SemiAxis2
+        else:
+            semi_axis1 = semi_axis2 = profile.Radius
+        ellipses = [(center, axis1 * semi_axis1, axis2 * semi_axis2)]
+        area = math.pi * semi_axis1 * semi_axis2
+        if(ifc_class == "IfcCircleHollowProfileDef"):
+            inner_radius = profile.Radius - profile.WallThickness
+            ellipses.append((center, axis1 * inner_radius, axis2 * inner_radius))
+            area -= math.pi * inner_radius**2
+        return {'area': area, 'polygons': [], 'ellipses': ellipses}
+
+    if(ifc_class in ("IfcArbitraryClosedProfileDef", "IfcArbitraryProfileDefWithVoids")):
+        polygons = [_polyline_points(profile.OuterCurve)]
+        area = _polygon_area(polygons[0])
+        for inner_curve in (getattr(profile, 'InnerCurves', None) or []):
+            polygons.append(_polyline_points(inner_curve))
+            area -= _polygon_area(polygons[-1])
+        return {'area': area, 'polygons': polygons, 'ellipses': []}
+
+    raise UnsupportedGeometry(f"profile {ifc_class} is not supported")
+
+def _boundary_length(boundary: dict, direction: np.ndarray) -> float:
+    """
+    Returns the integral of |tangent x direction| along the profile boundary, i.e. the lateral
+    area of the extrusion along 'direction' (whose length is the extrusion depth).
+    """
+    length = 0.0
+    for polygon in boundary['polygons']:
+        edges = np.hstack([np.roll(polygon, -1, axis=0) - polygon, np.zeros((len(polygon), 1))])
+        length += np.linalg.norm(np.cross(edges, direction), axis=1).sum()
+    for center, axis1, axis2 in boundary['ellipses']:
+        if(np.allclose(direction[0:2], 0.0)):
+            length += _ellipse_perimeter(np.linalg.norm(axis1), np.linalg.norm(axis2)) * abs(direction[2])
+        else:
+            angles = np.linspace(0.0, 2 * math.pi, OBLIQUE_CURVE_SEGMENTS + 1)
+            points = center + np.outer(np.cos(angles), axis1) + np.outer(np.sin(angles), axis2)
+            length += _boundary_length({'polygons': [points[:-1]], 'ellipses': []}, direction)
+    return length
+
+def _evaluate_item(item: ifcopenshell.entity_instance) -> dict:
+    """
+    Evaluates a single representation item in its own coordinate system.
+    Returns: {'volume', 'area', 'points': (N,3), 'ellipses': [(center, axis1, axis2)], 'spheres': [(center, radius)]}
+    """
+    ifc_class = item.is_a()
+    result = {'volume': 0.0, 'area': 0.0, 'points': np.empty((0, 3)), 'ellipses': [], 'spheres': []}
+
+    if(ifc_class == "IfcSphere"):
+        radius = item.Radius
+        center = _get_position_matrix(item.Position)[0:3, 3]
+        result.update(volume=4 / 3 * math.pi * radius**3, area=4 * math.pi * radius**2, spheres=[(center, radius)])
+        return result
+
+    if(ifc_class in ("IfcBlock", "IfcRectangularPyramid", "IfcRightCircularCylinder", "IfcRightCircularCone")):
+        matrix = _get_position_matrix(item.Position)
+        if(ifc_class in ("IfcBlock", "IfcRectangularPyramid")):
+            x, y, h = item.XLength, item.YLength, (item.ZLength if ifc_class == "IfcBlock" else item.Height)
+            base = np.array([(0, 0, 0), (x, 0, 0), (x, y, 0), (0, y, 0)], dtype=np.float64)
+            if(ifc_class == "IfcBlock"):
+                points = np.vstack([base, base + (0, 0, h)])
+                volume, area = x * y * h, 2 * (x * y + y * h + x * h)
+            else:
+                points = np.vstack([base, (x / 2, y / 2, h)])
+                volume = x * y * h / 3
+                area = x * y + x * math.sqrt((y / 2)**2 + h**2) + y * math.sqrt((x / 2)**2 + h**2)
+            result.update(volume=volume, area=area, points=points @ matrix[0:3, 0:3].T + matrix[0:3, 3])
+        else:
+            radius = item.Radius if ifc_class == "IfcRightCircularCylinder" else item.BottomRadius
+            height = item.Height
+            axis1, axis2, axis3, origin = matrix[0:3, 0] * radius, matrix[0:3, 1] * radius, matrix[0:3, 2], matrix[0:3, 3]
+            if(ifc_class == "IfcRightCircularCylinder"):
+                # the position is the centre of the base, the cylinder runs along its local z axis
+                ellipses = [(origin, axis1, axis2), (origin + axis3 * height, axis1, axis2)]
+                result.update(volume=math.pi * radius**2 * height, area=2 * math.pi * radius * (radius + height), ellipses=ellipses)
+            else:
+                result.update(
+                    volume=math.pi * radius**2 * height / 3,
+                    area=math.pi * radius * (radius + math.sqrt(radius**2 + height**2)),
+                    ellipses=[(origin, axis1, axis2)],
+                    points=np.array([origin + axis3 * height]),
+                )
+        return result
+
+    if(ifc_class == "IfcExtrudedAreaSolid"):
+        boundary = _evaluate_profile(item.SweptArea)
+        matrix = _get_position_matrix(item.Position)
+        direction = np.array(item.ExtrudedDirection.DirectionRatios, dtype=np.float64)
+        direction = direction / np.linalg.norm(direction) * item.Depth
+        profile_area = boundary['area']
+
+        rotation, origin = matrix[0:3, 0:3], matrix[0:3, 3]
+        points = [np.hstack([polygon, np.zeros((len(polygon), 1))]) for polygon in boundary['polygons']]
+        points = np.vstack(points + [p + direction for p in points]) if points else np.empty((0, 3))
+        ellipses = []
+        for center, axis1, axis2 in boundary['ellipses']:
+            center, axis1, axis2 = np.append(center, 0.0), np.append(axis1, 0.0), np.append(axis2, 0.0)
+            for offset in (np.zeros(3), direction):
+                ellipses.append((rotation @ (center + offset) + origin, rotation @ axis1, rotation @ axis2))
+        result.update(
+            volume=profile_area * abs(direction[2]),
+            area=2 * profile_area + _boundary_length(boundary, direction),
+            points=points @ rotation.T + origin,
+            ellipses=ellipses,
+        )
+        return result
+
+    raise UnsupportedGeometry(f"representation item {ifc_class} is not supported")
+
+def calc_analytic_properties(ifc_file: ifcopenshell.file, element: ifcopenshell.entity_instance, unit_scale: float | None = None) -> dict | None:
+    """
+    Calculates the exact volume, surface area and world bounding box of an element with a primitive body representation
+    (IfcSphere, IfcCsgPrimitive3D or IfcExtrudedAreaSolid of a parameterized or polyline profile),
+    honouring mapped (type) representations and placements. Overlaps of multiple items are not subtracted.
+    Args:
+        ifc_file (ifcopenshell.file): IFC file
+        element (ifcopenshell.entity_instance): an IfcProduct
+        unit_scale (float | None): the length unit scale of the project, calculated if None
+    Returns:
+        dict | None: {'volume': m3, 'area': m2, 'min_point': np.ndarray, 'max_point': np.ndarray, 'name': str}
+            in SI units, or None if the representation is not supported (e.g. B-rep or triangulated geometry)
+    """
+    if(unit_scale is None):
+        unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file)
+
+    try:
+        items = _get_body_items(element)
+        placement = ifcopenshell.util.placement.get_local_placement(element.ObjectPlacement) if element.ObjectPlacement else np.eye(4)
+        volume, area, points, extents = 0.0, 0.0, [], []
+        for item, item_matrix in items:
+            matrix = placement @ item_matrix
+            linear = matrix[0:3, 0:3]
+            scale = np.cbrt(abs(np.linalg.det(linear)))
+            if(not np.allclose(linear.T @ linear, np.eye(3) * scale**2)):
+                raise UnsupportedGeometry("non-uniform scaled mapped items are not supported")
+
+            evaluated = _evaluate_item(item)
+            volume += evaluated['volume'] * scale**3
+            area += evaluated['area'] * scale**2
+            if(len(evaluated['points']) > 0):
+                points.append(evaluated['points'] @ linear.T + matrix[0:3, 3])
+            for center, axis1, axis2 in evaluated['ellipses']:
+                # the extent of an ellipse along each world axis is sqrt(axis1_i^2 + axis2_i^2)
+                center, axis1, axis2 = linear @ center + matrix[0:3, 3], linear @ axis1, linear @ axis2
+                extents.append((center, np.sqrt(axis1**2 + axis2**2)))
+            for center, radius in evaluated['spheres']:
+                extents.append((linear @ center + matrix[0:3, 3], np.full(3, radius * scale)))
+    except UnsupportedGeometry:
+        return None
+
+    for center, extent in extents:
+        points.append(np.vstack([center - extent, center + extent]))
+    if(len(points) == 0):
+        return None
+    points = np.vstack(points) * unit_scale
+    return {
+        'volume': float(volume * unit_scale**3),
+        'area': float(area * unit_scale**2),
+        'min_point': points.min(axis=0),
+        'max_point': points.max(axis=0),
+        'name': element.Name,
+    }
+
+def calc_volumes_with_analytic_fast_path(
+    ifc_file: ifcopenshell.file,
+    use_world_coords: bool = True,
+    cache_filepath: str | None = None,
+    progress_callback: Callable[[int, int, float], None] | None = None,
+) -> dict:
+    """
+    Same as calc_volumes, but primitive representations are evaluated analytically (see calc_analytic_properties)
+    and only the remaining entities (e.g. B-rep or triangulated geometry) are tessellated.
+    Returns:
+        dict: {GlobalId: {'volume': m3, 'name': str}, ...}
+    """
+    unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file)
+    entities_with_volumes = {}
+    remaining = []
+    for product in ifc_file.by_type('IfcProduct'):
+        if(product.Representation is None and not getattr(ifcopenshell.util.element.get_type(product), 'RepresentationMaps', None)):
+            continue
+        properties = calc_analytic_properties(ifc_file, product, unit_scale=unit_scale)
+        if(properties is None):
+            remaining.append(product)
+        else:
+            entities_with_volumes[product.GlobalId] = {'volume': properties['volume'], 'name': properties['name']}
+
+    if(len(remaining) > 0):
+        entities_with_volumes.update(calc_volumes(ifc_file, use_world_coords=use_world_coords, elements=remaining, cache_filepath=cache_filepath, progress_callback=progress_callback))
+    return entities_with_volumes
@@ -0,0 +1,153 @@
+import ifcopenshell
+import ifcopenshell.util.element
+import numpy as np
+
+from typing import Iterable, Iterator
+
+from ifc_utils.ifc_utils import calc_bboxes, get_bbox_from_table
+
+class ElementTable:
+    """
+    Lazy, column oriented access to the data of all elements of one ifc class.
+    The relationship indexes (container, type, property definitions) are built with one scan over the
+    relationship entities of the file, the first time a column needs them, and are shared by all columns.
+    Columns are only materialised when requested, e.g. exporting names and containers never reads psets or geometry.
+
+    Columns: id, global_id, Class, PredefinedType, name, level, ObjectType, PropertySets, QuantitySets, BBox,
+    related_elements and obj (the live entity, only on request).
+    """
+    COLUMNS = ('id', 'global_id', 'Class', 'PredefinedType', 'name', 'level', 'ObjectType', 'QuantitySets', 'PropertySets', 'BBox', 'related_elements')
+
+    def __init__(self, file: ifcopenshell.file, class_type: str, bboxes: np.ndarray | None = None):
+        self.file = file
+        self.class_type = class_type
+        self.elements = file.by_type(class_type)
+        self._bboxes = bboxes
+        self._columns = {}
+        self._containers = None
+        self._types = None
+        self._definitions = None
+        self._definition_cache = {}
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    # 1) Relationship indexes, built once per table
+    def _get_containers(self) -> dict[int, ifcopenshell.entity_instance]:
+        if(self._containers is None):
+            containers = {}
+            for rel in self.file.by_type('IfcRelContainedInSpatialStructure'):
+                for related_element in rel.RelatedElements:
+                    containers[related_element.id()] = rel.RelatingStructure
+            # aggregated parts are contained via their whole (as in ifcopenshell.util.element.get_container)
+            parents = {}
+            for rel in self.file.by_type('IfcRelAggregates'):
+                for related_object in rel.RelatedObjects:
+                    parents[related_object.id()] = rel.RelatingObject
+            for element in self.elements:
+                parent = parents.get(element.id())
+                while(element.id() not in containers and parent is not None):
+                    if(parent.id() in containers):
+                        containers[element.id()] = containers[parent.id()]
+                    parent = parents.get(parent.id())
+            self._containers = containers
+        return self._containers
+
+    def _get_types(self) -> dict[int, ifcopenshell.entity_instance]:
+        if(self._types is None):
+            self._types = {}
+            for rel in self.file.by_type('IfcRelDefinesByType'):
+                for related_object in rel.RelatedObjects:
+                    self._types[related_object.id()] = rel.RelatingType
+        return self._types
+
+    def _get_definitions(self) -> dict[int, list[ifcopenshell.entity_instance]]:
+        if(self._definitions is None):
+            self._definitions = {}
+            for rel in self.file.by_type('IfcRelDefinesByProperties'):
+                # IFC4 allows a set of definitions (IfcPropertySetDefinitionSet)
+                definitions = rel.RelatingPropertyDefinition if isinstance(rel.RelatingPropertyDefinition, tuple) else [rel.RelatingPropertyDefinition]
+                for related_object in rel.RelatedObjects:
+                    self._definitions.setdefault(related_object.id(), []).extend(definitions)
+        return self._definitions
+
+    def _get_property_definition(self, definition: ifcopenshell.entity_instance) -> dict:
+        # shared psets (e.g. from add_psets_in_bulk) are read only once
+        if(definition.id() not in self._definition_cache):
+            self._definition_cache[definition.id()] = ifcopenshell.util.element.get_property_definition(definition)
+        return self._definition_cache[definition.id()]
+
+    def _get_psets(self, element: ifcopenshell.entity_instance, qtos: bool) -> dict:
+        # same result as ifcopenshell.util.element.get_psets(element, psets_only / qtos_only), type psets are inherited
+        psets = {}
+        element_type = self._get_types().get(element.id())
+        definitions = list(getattr(element_type, 'HasPropertySets', None) or []) if element_type is not None else []
+        type_count = len(definitions)
+        definitions += self._get_definitions().get(element.id(), [])
+        for idx, definition in enumerate(definitions):
+            if(definition.is_a('IfcElementQuantity') != qtos):
+                continue
+            if(not qtos and not (definition.is_a('IfcPropertySet') or definition.is_a('IfcPreDefinedPropertySet'))):
+                continue
+            pset = psets.setdefault(definition.Name, {})
+            pset.update(self._get_property_definition(definition))
+            if(idx >= type_count):
+                pset['id'] = definition.id()
+        return psets
+
+    # 2) Columns, materialised on demand
+    def _compute_column(self, name: str) -> list:
+        if(name == 'id'):
+            return [element.id() for element in self.elements]
+        if(name == 'obj'):
+            return list(self.elements)
+        if(name == 'global_id'):
+            return [getattr(element, 'GlobalId', None) for element in self.elements]
+        if(name == 'Class'):
+            return [element.is_a() for element in self.elements]
+        if(name == 'PredefinedType'):
+            return [ifcopenshell.util.element.get_predefined_type(element) for element in self.elements]
+        if(name == 'name'):
+            return [getattr(element, 'Name', None) for element in self.elements]
+        if(name == 'level'):
+            containers = self._get_containers()
+            return [containers[element.id()].Name if element.id() in containers else None for element in self.elements]
+        if(name == 'ObjectType'):
+            types = self._get_types()
+            return [types[element.id()].Name if element.id() in types else None for element in self.elements]
+        if(name == 'PropertySets'):
+            return [self._get_psets(element, qtos=False) for element in self.elements]
+        if(name == 'QuantitySets'):
+            return [self._get_psets(element, qtos=True) for element in self.elements]
+        if(name == 'BBox'):
+            if(self._bboxes is None):
+                self._bboxes = calc_bboxes(self.file, elements=self.elements) # one geometry iterator pass
+            return [get_bbox_from_table(self._bboxes, global_id) for global_id in self.column('global_id')]
+        if(name == 'related_elements'):
+            return [
+                [related_element.id() for rel in element.ContainsElements for related_element in rel.RelatedElements] if element.is_a('IfcBuildingStorey') else None
+                for element in self.elements
+            ]
+        raise KeyError(f"Unknown column: {name}")
+
+    def column(self, name: str) -> list:
+        """Returns the values of one column for all elements (computed on the first request)."""
+        if(name not in self._columns):
+            self._columns[name] = self._compute_column(name)
+        return self._columns[name]
+
+    def rows(self, columns: Iterable[str] | None = None) -> Iterator[dict]:
+        """Yields one dict per element with the requested columns (default: all columns except obj)."""
+        columns = list(columns or self.COLUMNS)
+        values = [self.column(name) for name in columns]
+        for row in zip(*values):
+            yield dict(zip(columns, row))
+
+    def pset_attributes(self) -> list[str]:
+        """Returns the names of all pset and qto attributes ('PSET_NAME.PROPERTY_NAME') of the elements."""
+        attributes = set()
+        for name in ('PropertySets', 'QuantitySets'):
+            for psets in self.column(name):
+                for pset_name, pset_data in psets.items():
+                    attributes |= {f'{pset_name}.{property_name}' for property_name in pset_data.keys()}
+        return list(attributes)
@@ -0,0 +1,186 @@
+import ifcopenshell
+import numpy as np
+
+import hashlib
+import io
+import json
+import os.path
+import sqlite3
+from contextlib import closing
+from typing import Iterable, Iterator
+
+from ifc_utils.ifc_utils import get_application, calc_bboxes, get_bbox_from_table
+from ifc_utils.ifc_element_table import ElementTable
+from ifc_utils.ifc_spatial_index import BBoxIndex
+
+INDEX_VERSION = 1
+
+def _file_sha1(file_path: str, chunk_size: int = 1 << 20) -> str:
+    sha1 = hashlib.sha1()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+class ModelIndex:
+    """
+    Sidecar cache of the data, that scripts extract from the same (large) ifc file again and again:
+    the application info, the element table columns of ElementTable, the bounding boxes of calc_bboxes and their
+    spatial index.
+
+    The cache is stored in a SQLite file next to the model and is valid as long as size and modification time of
+    the model are unchanged. If only the modification time changed (e.g. a copy), the SHA-1 of the file decides.
+    The entries are read from the sidecar file on their first request. Everything that is not cached yet is calculated
+    then (the model is only opened in this case) and saved.
+    """
+
+    def __init__(self, file_path: str, cache_filepath: str | None = None):
+        self.file_path = file_path
+        self.cache_filepath = cache_filepath or f"{os.path.splitext(file_path)[0]}_index.sqlite"
+        self._model = None
+        self._tables = {}
+        self._entries = {}
+        self._dirty = set()
+        self._cached_keys = set() # keys stored in the sidecar file
+        self._load()
+
+    # 1) Validation and persistence
+    def _get_file_key(self) -> dict:
+        stat = os.stat(self.file_path)
+        return {'version': INDEX_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _load(self):
+        # only the meta entry is read here, the other entries are read on their first request (see _get_entry)
+        file_key = self._get_file_key()
+        self._entries = {'meta': {**file_key, 'sha1': None}}
+        self._dirty = {'meta'}
+        if(not os.path.isfile(self.cache_filepath)):
+            return
+
+        with closing(sqlite3.connect(self.cache_filepath)) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB)")
+            row = connection.execute("SELECT value FROM entries WHERE key = 'meta'").fetchone()
+            cached_keys = {key for (key,) in connection.execute("SELECT key FROM entries")}
+        meta = json.loads(row[0]) if row is not None else {}
+
+        is_valid = meta.get('version') == INDEX_VERSION and meta.get('size') == file_key['size']
+        is_touched = is_valid and meta.get('mtime_ns') != file_key['mtime_ns']
+        if(is_touched):
+            # touched or copied: the content decides
+            is_valid = meta.get('sha1') is not None and meta['sha1'] == _file_sha1(self.file_path)
+        if(not is_valid):
+            self._clear_cache_file()
+            return
+
+        self._entries = {'meta': meta}
+        self._dirty = set()
+        self._cached_keys = cached_keys
+        if(is_touched):
+            # store the new modification time, so the next run doesn't hash the file again
+            meta['mtime_ns'] = file_key['mtime_ns']
+            self._dirty.add('meta')
+            self.save()
+
+    def _clear_cache_file(self):
+        if(os.path.isfile(self.cache_filepath)):
+            with closing(sqlite3.connect(self.cache_filepath)) as connection, connection:
+                connection.execute("DROP TABLE IF EXISTS entries")
+
+    @staticmethod
+    def _serialize(key: str, value) -> bytes | str:
+        if(key == 'bboxes'):
+            buffer = io.BytesIO()
+            np.save(buffer, value, allow_pickle=False)
+            return buffer.getvalue()
+        if(key == 'spatial_index'):
+            return value.to_bytes()
+        return json.dumps(value)
+
+    @staticmethod
+    def _deserialize(key: str, value: bytes | str):
+        if(key == 'bboxes'):
+            return np.load(io.BytesIO(value), allow_pickle=False)
+        if(key == 'spatial_index'):
+            return BBoxIndex.from_bytes(value)
+        return json.loads(value)
+
+    def save(self):
+        """Writes all new or changed entries to the sidecar file."""
+        if(not self._dirty):
+            return
+        if(self._entries['meta'].get('sha1') is None):
+            self._entries['meta']['sha1'] = _file_sha1(self.file_path)
+        with closing(sqlite3.connect(self.cache_filepath)) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB)")
+            for key in self._dirty:
+                connection.execute("INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)", (key, self._serialize(key, self._entries[key])))
+                self._cached_keys.add(key)
+        self._dirty.clear()
+
+    def _get_entry(self, key: str, compute):
+        if(key not in self._entries and key in self._cached_keys):
+            with closing(sqlite3.connect(self.cache_filepath)) as connection, connection:
+                row = connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if(row is not None):
+                self._entries[key] = self._deserialize(key, row[0])
+        if(key not in self._entries):
+            self._entries[key] = compute()
+            self._dirty.add(key)
+            self.save()
+        return self._entries[key]
+
+    # 2) Lazily opened model and element tables
+    @property
+    def model(self) -> ifcopenshell.file:
+        """The ifc model, only opened when something has to be calculated."""
+        if(self._model is None):
+            self._model = ifcopenshell.open(self.file_path)
+        return self._model
+
+    def _get_table(self, class_type: str) -> ElementTable:
+        if(class_type not in self._tables):
+            self._tables[class_type] = ElementTable(self.model, class_type)
+        return self._tables[class_type]
+
+    # 3) Cached data
+    @property
+    def application(self) -> dict | None:
+        """The plain (not entity) attributes of get_application, e.g. ApplicationFullName and Version."""
+        def _compute():
+            info = get_application(self.model)
+            return {key: value for key, value in info.items() if isinstance(value, (str, int, float, bool, type(None)))} if info else None
+        return self._get_entry('application', _compute)
+
+    @property
+    def bboxes(self) -> np.ndarray:
+        """The bounding boxes of all elements (see calc_bboxes)."""
+        return self._get_entry('bboxes', lambda: calc_bboxes(self.model, elements=self.model.by_type('IfcProduct')))
+
+    @property
+    def spatial_index(self) -> BBoxIndex:
+        """The STR packed R-tree over the bounding boxes (see BBoxIndex), for box, point and segment queries."""
+        return self._get_entry('spatial_index', lambda: BBoxIndex.from_bboxes(self.bboxes))
+
+    def column(self, class_type: str, name: str) -> list:
+        """Returns one ElementTable column of all elements of the class (see ElementTable.column)."""
+        if(name == 'BBox'):
+            return [get_bbox_from_table(self.bboxes, global_id) for global_id in self.column(class_type, 'global_id')]
+        if(name == 'obj'):
+            return self._get_table(class_type).column('obj')
+        return self._get_entry(f"column:{class_type.lower()}:{name}", lambda: self._get_table(class_type).column(name))
+
+    def rows(self, class_type: str, columns: Iterable[str] | None = None) -> Iterator[dict]:
+        """Yields one dict per element of the class with the requested columns, like ElementTable.rows."""
+        columns = list(columns or ElementTable.COLUMNS)
+        values = [self.column(class_type, name) for name in columns]
+        for row in zip(*values):
+            yield dict(zip(columns, row))
+
+def open_model_index(file_path: str, cache_filepath: str | None = None) -> ModelIndex:
+    """
+    Opens the sidecar index of an ifc file (see ModelIndex), e.g.
+        index = open_model_index("./data/leapfrog_examples/Boreholes_with_lithology.ifc")
+        rows = index.rows('IfcBuildingElementProxy', columns=['global_id', 'name', 'level', 'BBox'])
+    answers repeated runs without opening, parsing or tessellating the model.
+    """
+    return ModelIndex(file_path, cache_filepath=cache_filepath)
@@ -76,6 +76,108 @@ def create_sphere_representation(
     )
     return sphere_representation
 
+def create_swept_disk_representation(
+    model: ifcopenshell.file(),
+    representation_context: ifcopenshell.entity_instance,
+    directrix: ifcopenshell.entity_instance,
+    radius: float,
+    inner_radius: float | None = None,
+):
+    """
+    Description:
+        Creates a parametric tube (IfcSweptDiskSolid) along a directrix curve and adds it to the given representation_context.
+        The file stores only the curve points and the radii instead of a triangulated mesh.
+    Input:
+        model: ifcopenshell.file()
+        representation_context: ifcopenshell.entity_instance (e.g. body) body.is_a() == 'IfcGeometricRepresentationSubContext'
+        directrix: ifcopenshell.entity_instance, e.g. a IfcIndexedPolyCurve or IfcPolyline (see create_polyline_curve)
+        radius: float, in project units
+        inner_radius: float | None, creates a hollow tube (e.g. a casing) if given
+    Output:
+        swept_disk_representation: ifcopenshell.entity_instance
+    """
+    swept_disk = model.createIfcSweptDiskSolid(Directrix=directrix, Radius=radius, InnerRadius=inner_radius)
+    swept_disk_representation = model.createIfcShapeRepresentation(
+        ContextOfItems=representation_context,
+        RepresentationIdentifier="Body",
+        RepresentationType="AdvancedSweptSolid",
+        Items=[swept_disk],
+    )
+    return swept_disk_representation
+
+def create_polyline_curve(
+    model: ifcopenshell.file(),
+    points,
+    curve_type: str = "IfcIndexedPolyCurve",
+):
+    """
+    Description:
+        Creates a 3D polyline, either as compact IfcIndexedPolyCurve on one IfcCartesianPointList3D (IFC4)
+        or as IfcPolyline with one IfcCartesianPoint per point (for older viewers).
+    Input:
+        model: ifcopenshell.file()
+        points: (N,3) coordinates in project units
+        curve_type: str, "IfcIndexedPolyCurve" or "IfcPolyline"
+    Output:
+        curve: ifcopenshell.entity_instance
+    """
+    coordinates = [tuple(float(c) for c in point) for point in points]
+    if(curve_type == "IfcPolyline"):
+        return model.createIfcPolyline([model.createIfcCartesianPoint(point) for point in coordinates])
+    return model.createIfcIndexedPolyCurve(model.createIfcCartesianPointList3D(coordinates), None, False)
+
+def create_axis_representation(
+    model: ifcopenshell.file(),
+    representation_context: ifcopenshell.entity_instance,
+    curve: ifcopenshell.entity_instance,
+):
+    """
+    Description:
+        Creates a lightweight 'Axis' representation of a curve, e.g. the path of a swept disk solid as overview geometry
+    Input:
+        model: ifcopenshell.file()
+        representation_context: ifcopenshell.entity_instance (e.g. the Model/Axis subcontext)
+        curve: ifcopenshell.entity_instance
+    Output:
+        axis_representation: ifcopenshell.entity_instance
+    """
+    return model.createIfcShapeRepresentation(
+        ContextOfItems=representation_context,
+        RepresentationIdentifier="Axis",
+        RepresentationType="Curve3D",
+        Items=[curve],
+    )
+
+def create_triangulated_face_set_representation(
+    model: ifcopenshell.file(),
+    representation_context: ifcopenshell.entity_instance,
+    vertices,
+    faces,
+    closed: bool = True,
+):
+    """
+    Description:
+        Creates a mesh representation (IfcTriangulatedFaceSet on one IfcCartesianPointList3D) from vertex and
+        triangle arrays, e.g. a tolerance cone of tolerance_cone_meshes, without one entity per point or face.
+    Input:
+        model: ifcopenshell.file()
+        representation_context: ifcopenshell.entity_instance (e.g. body) body.is_a() == 'IfcGeometricRepresentationSubContext'
+        vertices: (N,3) coordinates in project units
+        faces: (F,3) triangles as 0-based vertex indices
+        closed: bool, False for open surfaces (e.g. a groundwater table)
+    Output:
+        mesh_representation: ifcopenshell.entity_instance
+    """
+    coordinates = model.createIfcCartesianPointList3D([tuple(float(c) for c in vertex) for vertex in vertices])
+    coord_index = [tuple(int(idx) + 1 for idx in face) for face in faces] # IFC indices are 1-based
+    face_set = model.createIfcTriangulatedFaceSet(Coordinates=coordinates, Closed=closed, CoordIndex=coord_index)
+    return model.createIfcShapeRepresentation(
+        ContextOfItems=representation_context,
+        RepresentationIdentifier="Body",
+        RepresentationType="Tessellation",
+        Items=[face_set],
+    )
+
 def create_and_add_style(
     model: ifcopenshell.file(),
     red: float = 1.0,
@@ -0,0 +1,156 @@
+import ifcopenshell
+import numpy as np
+
+import io
+import math
+
+from ifc_utils.ifc_utils import calc_bboxes
+
+def _str_order(centers: np.ndarray, capacity: int) -> np.ndarray:
+    # Sort-Tile-Recursive packing: x slabs, y strips within the slabs, z order within the strips,
+    # so that every run of 'capacity' consecutive items forms a compact node
+    count = len(centers)
+    slice_count = max(1, math.ceil(math.ceil(count / capacity) ** (1 / 3)))
+    ranks = np.arange(count)
+
+    order = np.argsort(centers[:, 0], kind='stable')
+    slab = np.empty(count, dtype=np.int64)
+    slab[order] = ranks // (slice_count * slice_count * capacity)
+    order = np.lexsort((centers[:, 1], slab))
+    strip = np.empty(count, dtype=np.int64)
+    strip[order] = ranks // (slice_count * capacity)
+    return np.lexsort((centers[:, 2], strip))
+
+def _expand_children(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    # concatenation of the ranges [start, start + count) without a python loop
+    total = int(counts.sum())
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(total)
+
+class BBoxIndex:
+    """
+    Static R-tree over the axis aligned bounding boxes of calc_bboxes, packed with Sort-Tile-Recursive.
+    The tree is stored level by level in flat numpy arrays, queries descend one level at a time and test all
+    candidate nodes of a level at once, e.g.
+        index = BBoxIndex.from_model(model)
+        global_ids = index.query_polyline(alignment_points, radius=5.0)
+    only returns the elements whose bounding boxes are within 5 m of the alignment (candidates for exact tests).
+    """
+
+    def __init__(self, global_ids: np.ndarray, min_points: np.ndarray, max_points: np.ndarray, levels: list[dict] | None = None, capacity: int = 16):
+        self.global_ids = np.asarray(global_ids)
+        self.min_points = np.asarray(min_points, dtype=np.float64).reshape(-1, 3)
+        self.max_points = np.asarray(max_points, dtype=np.float64).reshape(-1, 3)
+        self.capacity = capacity
+        self.levels = levels if levels is not None else self._build_levels()
+
+    def __len__(self) -> int:
+        return len(self.global_ids)
+
+    # 1) Packing
+    @classmethod
+    def from_bboxes(cls, bboxes: np.ndarray, capacity: int = 16) -> "BBoxIndex":
+        """Packs a BBOX_DTYPE table (see calc_bboxes) into a new index."""
+        order = _str_order(bboxes['center_point'], capacity) if len(bboxes) else np.empty(0, dtype=np.int64)
+        return cls(bboxes['global_id'][order], bboxes['min_point'][order], bboxes['max_point'][order], capacity=capacity)
+
+    @classmethod
+    def from_model(cls, ifc_file: ifcopenshell.file, elements: list[ifcopenshell.entity_instance] | None = None, capacity: int = 16) -> "BBoxIndex":
+        """Calculates the bounding boxes in a single geometry iterator pass and packs them into a new index."""
+        return cls.from_bboxes(calc_bboxes(ifc_file, elements=elements), capacity=capacity)
+
+    def _build_levels(self) -> list[dict]:
+        # levels[0] is the level directly above the elements, levels[-1] the root level (at most 'capacity' nodes)
+        levels = []
+        min_points, max_points = self.min_points, self.max_points
+        while(len(min_points) > 0 and (not levels or len(min_points) > self.capacity)):
+            starts = np.arange(0, len(min_points), self.capacity)
+            counts = np.diff(np.append(starts, len(min_points)))
+            node_min = np.minimum.reduceat(min_points, starts, axis=0)
+            node_max = np.maximum.reduceat(max_points, starts, axis=0)
+            if(len(starts) > self.capacity):
+                order = _str_order((node_min + node_max) / 2, self.capacity)
+                starts, counts, node_min, node_max = starts[order], counts[order], node_min[order], node_max[order]
+            levels.append({'start': starts, 'count': counts, 'min_point': node_min, 'max_point': node_max})
+            min_points, max_points = node_min, node_max
+        return levels
+
+    # 2) Persistence
+    def to_bytes(self) -> bytes:
+        """Serialises the packed tree (npz), e.g. for the sidecar of ModelIndex."""
+        arrays = {'global_ids': self.global_ids, 'min_points': self.min_points, 'max_points': self.max_points, 'capacity': np.array(self.capacity)}
+        for idx, level in enumerate(self.levels):
+            arrays.update({f'level{idx}_{key}': value for key, value in level.items()})
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BBoxIndex":
+        """Restores an index from to_bytes without packing it again."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            level_count = len([key for key in arrays.files if key.endswith('_start')])
+            levels = [{key: arrays[f'level{idx}_{key}'] for key in ('start', 'count', 'min_point', 'max_point')} for idx in range(level_count)]
+            return cls(arrays['global_ids'], arrays['min_points'], arrays['max_points'], levels=levels, capacity=int(arrays['capacity']))
+
+    def save(self, file_path: str):
+        with open(file_path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, file_path: str) -> "BBoxIndex":
+        with open(file_path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+    # 3) Queries
+    def _query(self, test) -> np.ndarray:
+        if(len(self) == 0):
+            return self.global_ids[:0]
+        root = self.levels[-1]
+        candidates = np.arange(len(root['start']))
+        for level_idx in range(len(self.levels) - 1, -1, -1):
+            level = self.levels[level_idx]
+            candidates = candidates[test(level['min_point'][candidates], level['max_point'][candidates])]
+            candidates = _expand_children(level['start'][candidates], level['count'][candidates])
+        candidates = candidates[test(self.min_points[candidates], self.max_points[candidates])]
+        return self.global_ids[np.sort(candidates)]
+
+    def query_box(self, min_point, max_point) -> np.ndarray:
+        """Returns the GlobalIds of all elements, whose bounding boxes intersect the box."""
+        min_point, max_point = np.asarray(min_point, dtype=np.float64), np.asarray(max_point, dtype=np.float64)
+        return self._query(lambda mins, maxs: np.all((mins <= max_point) & (maxs >= min_point), axis=1))
+
+    def query_point(self, point, tolerance: float = 0.0) -> np.ndarray:
+        """Returns the GlobalIds of all elements, whose bounding boxes contain the point (within the tolerance)."""
+        point = np.asarray(point, dtype=np.float64)
+        return self.query_box(point - tolerance, point + tolerance)
+
+    def query_segment(self, start, end, radius: float = 0.0) -> np.ndarray:
+        """
+        Returns the GlobalIds of all elements, whose bounding boxes (grown by the radius) are hit by the segment
+        start-end (slab test), e.g. the candidates of a borehole axis or a tunnel alignment with its radius.
+        """
+        start, end = np.asarray(start, dtype=np.float64), np.asarray(end, dtype=np.float64)
+        direction = end - start
+        parallel = direction == 0
+        inverse = np.divide(1.0, direction, out=np.zeros(3), where=~parallel)
+
+        def _test(mins, maxs):
+            mins, maxs = mins - radius, maxs + radius
+            t1, t2 = (mins - start) * inverse, (maxs - start) * inverse
+            t_near, t_far = np.minimum(t1, t2), np.maximum(t1, t2)
+            # axes parallel to the segment: hit over the full parameter range if the start is inside the slab
+            inside = (mins <= start) & (start <= maxs)
+            t_near = np.where(parallel, np.where(inside, -np.inf, np.inf), t_near)
+            t_far = np.where(parallel, np.where(inside, np.inf, -np.inf), t_far)
+            t_enter, t_exit = t_near.max(axis=1), t_far.min(axis=1)
+            return (t_enter <= t_exit) & (t_exit >= 0.0) & (t_enter <= 1.0)
+        return self._query(_test)
+
+    def query_polyline(self, points, radius: float = 0.0) -> np.ndarray:
+        """Returns the GlobalIds of all elements along a polyline (union of the segment queries), e.g. an alignment."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if(len(points) == 1):
+            return self.query_point(points[0], tolerance=radius)
+        hits = [self.query_segment(start, end, radius=radius) for start, end in zip(points[:-1], points[1:])]
+        return np.unique(np.concatenate(hits)) if hits else self.global_ids[:0]
@@ -5,10 +5,18 @@ import ifcopenshell.validate
 import ifcopenshell.template
 import ifcopenshell.util
 import ifcopenshell.util.shape
+import ifcopenshell.util.unit
+import ifcopenshell.guid
+import numpy as np
 
 import multiprocessing
+import itertools
 import csv
 import os.path
+import hashlib
+import sqlite3
+import time
+from typing import Callable, Iterable
 
 def get_application(file: ifcopenshell.file, verbose:bool=False) -> dict | None:
     try:
@@ -40,6 +48,168 @@ def add_pset_with_props(model: ifcopenshell.file(), element: ifcopenshell.entity
     )
     return pset
 
+def _create_nominal_value(model: ifcopenshell.file, value):
+    # same type mapping as pset.edit_pset: str -> IfcLabel, bool -> IfcBoolean, int -> IfcInteger, float -> IfcReal
+    if(isinstance(value, np.generic)):
+        value = value.item()
+    if(isinstance(value, str)):
+        return model.create_entity("IfcLabel", value)
+    elif(isinstance(value, bool)):
+        return model.create_entity("IfcBoolean", value)
+    elif(isinstance(value, int)):
+        return model.create_entity("IfcInteger", value)
+    elif(isinstance(value, float)):
+        return model.create_entity("IfcReal", value)
+    raise ValueError(f"Unsupported property value type: {type(value)}")
+
+def _get_single_value(model: ifcopenshell.file, single_values: dict, name: str, value, value_type: str | None = None) -> ifcopenshell.entity_instance:
+    # one IfcPropertySingleValue per distinct (name, type, value), shared by all psets;
+    # value_type keeps the measure type of a replaced property (e.g. IfcLengthMeasure instead of IfcReal)
+    if(isinstance(value, np.generic)):
+        value = value.item()
+    key = (name, value_type, type(value), value)
+    if(key not in single_values):
+        nominal_value = model.create_entity(value_type, value) if value_type is not None else _create_nominal_value(model, value)
+        single_values[key] = model.createIfcPropertySingleValue(name, None, nominal_value, None)
+    return single_values[key]
+
+def _get_value_type(prop: ifcopenshell.entity_instance | None, value) -> tuple[str | None, object]:
+    # the type of the nominal value of an existing single value, if the new value fits it (ints fit float measures)
+    if(isinstance(value, np.generic)):
+        value = value.item()
+    if(prop is None or not prop.is_a("IfcPropertySingleValue") or prop.NominalValue is None or value is None):
+        return None, value
+    existing = prop.NominalValue.wrappedValue
+    if(isinstance(existing, float) and isinstance(value, int) and not isinstance(value, bool)):
+        value = float(value)
+    if(type(existing) == type(value)):
+        return prop.NominalValue.is_a(), value
+    return None, value
+
+def _remove_orphaned_properties(model: ifcopenshell.file, properties: list[ifcopenshell.entity_instance]) -> None:
+    # removes the properties (and their nominal values), that are no longer referenced by any pset
+    for prop in {prop.id(): prop for prop in properties}.values():
+        if(len(model.get_inverse(prop)) == 0):
+            model.remove(prop)
+
+def create_elements_in_bulk(
+    model: ifcopenshell.file,
+    placements: np.ndarray,
+    ifc_class: str = "IfcBuildingElementProxy",
+    relating_types: list[ifcopenshell.entity_instance] | None = None,
+    type_indices: np.ndarray | None = None,
+    pset_name: str | None = None,
+    properties: dict | None = None,
+    names: list[str] | None = None,
+    container: ifcopenshell.entity_instance | None = None,
+    is_si: bool = True,
+) -> list[ifcopenshell.entity_instance]:
+    """
+    Description:
+        Creates many elements at once with direct create_entity calls instead of one ifcopenshell.api call per element and step.
+        - one IfcLocalPlacement per element (translations or full 4x4 matrices)
+        - the representation maps of each type are mapped once and shared by all elements of the type,
+          with one IfcRelDefinesByType per type
+        - IfcPropertySingleValues are shared where the values repeat, elements with identical values share
+          one IfcPropertySet and IfcRelDefinesByProperties
+        - optionally one IfcRelContainedInSpatialStructure for all elements
+    Input:
+        model: ifcopenshell.file()
+        placements: np.ndarray, (N,3) translations or (N,4,4) transformation matrices
+        ifc_class: str
+        relating_types: list[ifcopenshell.entity_instance] | None, e.g. [element_type, element_type_1500]
+        type_indices: np.ndarray | None, (N,) index into relating_types per element
+        pset_name: str | None
+        properties: dict | None, property columns of length N or scalars, e.g. {"Testmethode": "Eimerprobe", "Entnahmetiefe": np.array([...])}
+        names: list[str] | None
+        container: ifcopenshell.entity_instance | None, e.g. an IfcSite
+        is_si: bool, if True the placements are given in meters and converted to the project units
+    Output:
+        elements: list[ifcopenshell.entity_instance]
+    """
+    placements = np.asarray(placements, dtype=np.float64)
+    if(placements.ndim == 2):
+        matrices = np.tile(np.eye(4), (len(placements), 1, 1))
+        matrices[:, 0:3, 3] = placements
+    else:
+        matrices = placements.copy()
+    if(is_si):
+        matrices[:, 0:3, 3] /= ifcopenshell.util.unit.calculate_unit_scale(model)
+    count = len(matrices)
+
+    # 1) Create the elements with their placements, directions are shared
+    directions = {}
+    def _direction(ratios):
+        key = tuple(np.round(ratios, 12))
+        if(key not in directions):
+            directions[key] = model.createIfcDirection(key)
+        return directions[key]
+
+    elements = []
+    is_unrotated = np.all(np.isclose(matrices[:, 0:3, 0:3], np.eye(3)), axis=(1, 2))
+    for idx, matrix in enumerate(matrices):
+        if(is_unrotated[idx]):
+            axis, ref_direction = None, None
+        else:
+            axis, ref_direction = _direction(matrix[0:3, 2]), _direction(matrix[0:3, 0])
+        location = model.createIfcCartesianPoint(tuple(float(c) for c in matrix[0:3, 3]))
+        placement = model.createIfcLocalPlacement(None, model.createIfcAxis2Placement3D(location, axis, ref_direction))
+        elements.append(model.create_entity(
+            ifc_class,
+            GlobalId=ifcopenshell.guid.new(),
+            Name=names[idx] if names is not None else None,
+            ObjectPlacement=placement,
+        ))
+
+    # 2) Assign the types and share one mapped representation per type
+    if(relating_types is not None):
+        type_indices = np.zeros(count, dtype=int) if type_indices is None else np.asarray(type_indices)
+        zero = model.createIfcCartesianPoint((0.0, 0.0, 0.0))
+        mapping_target = model.createIfcCartesianTransformationOperator3D(_direction((1.0, 0.0, 0.0)), _direction((0.0, 1.0, 0.0)), zero, 1.0, _direction((0.0, 0.0, 1.0)))
+        for type_idx, relating_type in enumerate(relating_types):
+            related_objects = [elements[idx] for idx in np.flatnonzero(type_indices == type_idx)]
+            if(len(related_objects) == 0):
+                continue
+            model.createIfcRelDefinesByType(ifcopenshell.guid.new(), None, None, None, related_objects, relating_type)
+
+            representations = [
+                model.createIfcShapeRepresentation(
+                    representation_map.MappedRepresentation.ContextOfItems,
+                    representation_map.MappedRepresentation.RepresentationIdentifier,
+                    "MappedRepresentation",
+                    [model.createIfcMappedItem(representation_map, mapping_target)],
+                )
+                for representation_map in (relating_type.RepresentationMaps or [])
+            ]
+            if(len(representations) > 0):
+                product_shape = model.createIfcProductDefinitionShape(None, None, representations)
+                for element in related_objects:
+                    element.Representation = product_shape
+
+    # 3) Create the property sets, sharing single values and psets with identical values
+    if(pset_name is not None and properties):
+        columns = {name: (list(values) if isinstance(values, (list, tuple, np.ndarray)) else [values] * count) for name, values in properties.items()}
+        single_values = {}
+        psets = {}
+        for idx, element in enumerate(elements):
+            row = tuple((name, column[idx].item() if isinstance(column[idx], np.generic) else column[idx]) for name, column in columns.items())
+            if(row not in psets):
+                has_properties = []
+                for name, value in row:
+                    if(value is None):
+                        continue
+                    has_properties.append(_get_single_value(model, single_values, name, value))
+                psets[row] = (model.createIfcPropertySet(ifcopenshell.guid.new(), None, pset_name, None, has_properties), [])
+            psets[row][1].append(element)
+        for pset, related_objects in psets.values():
+            model.createIfcRelDefinesByProperties(ifcopenshell.guid.new(), None, None, None, related_objects, pset)
+
+    # 4) Contain all elements in the spatial structure
+    if(container is not None):
+        model.createIfcRelContainedInSpatialStructure(ifcopenshell.guid.new(), None, None, None, elements, container)
+
+    return elements
+
 def init_minimal_ifc_model(
     filename: str | None = None,
     organization: str | None = None,
@@ -122,11 +292,138 @@ def init_minimal_ifc_model(
 
     return model, project, site, body_3d_context, plan_2d_context
 
-def calc_volumes(ifc_file:ifcopenshell.file, use_world_coords:bool=True) -> dict:
+def add_psets_in_bulk(
+    model: ifcopenshell.file,
+    psets_by_global_id: dict[str, dict[str, dict]],
+    elements: list[ifcopenshell.entity_instance] | None = None,
+) -> dict:
+    """
+    Description:
+        Bulk version of add_pset_with_props for many elements, e.g. the nested dict of parse_pset_csv.
+        - a pset with the same name, which is only used by this element, is updated in place
+          (None values remove the property, as in pset.edit_pset)
+        - all other elements are grouped by their property values: elements with identical values share one
+          IfcPropertySet and one IfcRelDefinesByProperties with all of them as related objects
+          (the other properties of a shared pset are kept as they are, the element is removed from the old relation)
+        - IfcPropertySingleValues are shared where name and value repeat, replaced values keep their measure type
+          (e.g. IfcLengthMeasure) and properties, psets and relations no longer used are removed
+    Input:
+        model: ifcopenshell.file()
+        psets_by_global_id: dict, {GlobalId: {PSET_NAME: {PROPERTY_NAME: PROPERTY_VALUE, ...}, ...}, ...}
+        elements: list[ifcopenshell.entity_instance] | None, the elements to update (default: looked up by GlobalId)
+    Output:
+        stats: dict, {"updated": psets updated in place, "shared": elements assigned to shared psets, "psets": new psets, "missing": GlobalIds without element}
+    """
+    if(elements is None):
+        elements, missing = [], []
+        for global_id in psets_by_global_id:
+            try:
+                elements.append(model.by_guid(global_id))
+            except RuntimeError:
+                missing.append(global_id)
+    else:
+        elements = [element for element in elements if element.GlobalId in psets_by_global_id]
+        found = {element.GlobalId for element in elements}
+        missing = [global_id for global_id in psets_by_global_id if global_id not in found]
+
+    single_values = {}
+    new_psets = {} # (pset_name, property ids) -> (properties, related objects)
+    replaced = [] # properties dropped from a pset, removed at the end, if no other pset uses them
+    stats = {"updated": 0, "shared": 0, "psets": 0, "missing": missing}
+    for element in elements:
+        # existing psets of the element by name, with their defining relations
+        existing = {}
+        for rel in getattr(element, "IsDefinedBy", None) or []:
+            if(rel.is_a("IfcRelDefinesByProperties") and rel.RelatingPropertyDefinition.is_a("IfcPropertySet")):
+                existing[rel.RelatingPropertyDefinition.Name] = rel
+
+        for pset_name, properties in psets_by_global_id[element.GlobalId].items():
+            rel = existing.get(pset_name)
+            pset = rel.RelatingPropertyDefinition if rel is not None else None
+            is_exclusive = pset is not None and len(rel.RelatedObjects) == 1 and len(model.get_inverse(pset)) == 1
+
+            # new single values keep the measure type of the property they replace
+            old_properties = {prop.Name: prop for prop in (pset.HasProperties or [])} if pset is not None else {}
+            new_properties = {}
+            for name, value in properties.items():
+                value_type, value = _get_value_type(old_properties.get(name), value)
+                if(value is not None):
+                    new_properties[name] = _get_single_value(model, single_values, name, value, value_type)
+            replaced += [prop for name, prop in old_properties.items() if name in properties]
+            # all other properties (of any type) are kept as they are
+            merged = {name: prop for name, prop in old_properties.items() if name not in properties}
+            merged.update(new_properties)
+
+            # 1) Update an exclusive pset in place
+            if(is_exclusive):
+                pset.HasProperties = list(merged.values())
+                stats["updated"] += 1
+                continue
+
+            # 2) Otherwise leave a shared pset and group the elements by their merged properties
+            if(pset is not None):
+                rel.RelatedObjects = [related for related in rel.RelatedObjects if related != element]
+                if(len(rel.RelatedObjects) == 0):
+                    model.remove(rel)
+                    if(len(model.get_inverse(pset)) == 0):
+                        replaced += list(pset.HasProperties or [])
+                        model.remove(pset)
+            key = (pset_name, tuple(sorted(prop.id() for prop in merged.values())))
+            new_psets.setdefault(key, (list(merged.values()), []))[1].append(element)
+            stats["shared"] += 1
+
+    # 3) One pset and one relation per distinct group of properties
+    for (pset_name, _), (has_properties, related_objects) in new_psets.items():
+        pset = model.createIfcPropertySet(ifcopenshell.guid.new(), None, pset_name, None, has_properties)
+        model.createIfcRelDefinesByProperties(ifcopenshell.guid.new(), None, None, None, related_objects, pset)
+        stats["psets"] += 1
+    _remove_orphaned_properties(model, replaced)
+    return stats
+
+def get_representation_hash(ifc_file:ifcopenshell.file, element:ifcopenshell.entity_instance, include_placement:bool=True) -> str | None:
+    """
+    Calculates a content hash of the representation subgraph (incl. mapped type representations)
+    and optionally of the placement of an element. The hash changes whenever the geometry changes.
+    Args:
+        ifc_file (ifcopenshell.file): IFC file
+        element (ifcopenshell.entity_instance): an IfcProduct
+        include_placement (bool): include the object placement (needed for world coordinates)
+    Returns:
+        str | None: sha1 hex digest or None if the element has no representation
+    """
+    representation = getattr(element, 'Representation', None)
+    if(representation is None):
+        return None
+    roots = [representation]
+    if(include_placement and element.ObjectPlacement is not None):
+        roots.append(element.ObjectPlacement)
+
+    sha1 = hashlib.sha1()
+    for root in roots:
+        for entity in ifc_file.traverse(root):
+            # the entity ids are part of the string, so a re-numbered file is treated as changed (conservative)
+            sha1.update(str(entity).encode('utf-8'))
+    return sha1.hexdigest()
+
+def calc_volumes(
+    ifc_file:ifcopenshell.file,
+    use_world_coords:bool=True,
+    elements:list[ifcopenshell.entity_instance] | None = None,
+    cache_filepath:str | None = None,
+    progress_callback:Callable[[int, int, float], None] | None = None,
+) -> dict:
     """
     Calculates the volumes of all entities in the IFC file
     Args:
         ifc_file (ifcopenshell.file): IFC file
+        use_world_coords (bool): tessellate in world coordinates
+        elements (list[ifcopenshell.entity_instance] | None): restrict the calculation to these elements, all elements if None
+        cache_filepath (str | None): path of a SQLite cache (e.g. next to the IFC file). The volumes are cached per
+            GlobalId and representation hash (see get_representation_hash), so only new or changed entities are
+            tessellated on a re-run. No cache is used if None.
+        progress_callback (Callable[[int, int, float], None] | None): called after each tessellated entity
+            with (processed, total, elapsed_seconds), e.g. to print the throughput. Without cache and elements, total
+            is the number of IfcProducts with a representation, an upper bound (the iterator skips e.g. openings).
     Returns:
         dict: dictionary with the volumes of all entities, 
             e.g. {'2HBKPyXqbEBOFvEOPaWIoH': 
@@ -140,41 +437,266 @@ def calc_volumes(ifc_file:ifcopenshell.file, use_world_coords:bool=True) -> dict
     if(use_world_coords):
         settings.set(settings.USE_WORLD_COORDS, True)
 
-    iterator = ifcopenshell.geom.iterator(settings, ifc_file, multiprocessing.cpu_count())
+    # 1) Look up the unchanged entities in the cache
+    include = elements # all entities if None
+    hashes = {}
+    connection = sqlite3.connect(cache_filepath) if cache_filepath is not None else None
+    try:
+        if(connection is not None):
+            connection.execute("CREATE TABLE IF NOT EXISTS volumes (global_id TEXT PRIMARY KEY, geometry_hash TEXT NOT NULL, volume REAL, name TEXT)")
+            cached = {row[0]: row[1:] for row in connection.execute("SELECT global_id, geometry_hash, volume, name FROM volumes")}
+
+            include = []
+            for product in (elements if elements is not None else ifc_file.by_type('IfcProduct')):
+                geometry_hash = get_representation_hash(ifc_file, product, include_placement=use_world_coords)
+                if(geometry_hash is None):
+                    continue
+                hashes[product.GlobalId] = geometry_hash
+                cached_hash, volume, name = cached.get(product.GlobalId, (None, None, None))
+                if(cached_hash != geometry_hash):
+                    include.append(product)
+                elif(volume is not None): # a NULL volume marks an unchanged entity without a valid shape
+                    entities_with_volumes[product.GlobalId] = {'volume': volume, 'name': name}
+
+        # 2) Tessellate the remaining entities
+        new_rows = []
+        if(include is None or len(include) > 0):
+            total = len(include) if include is not None else sum(product.Representation is not None for product in ifc_file.by_type('IfcProduct'))
+            processed = 0
+            start_time = time.perf_counter()
+            iterator = ifcopenshell.geom.iterator(settings, ifc_file, multiprocessing.cpu_count(), include=include)
+            if iterator.initialize():
+                while True:
+                    try:    
+                        shape = iterator.get()
+                        
+                        if(shape is not None):
+                            volume = ifcopenshell.util.shape.get_volume(shape.geometry)
+                            volume_info = {
+                                'volume':volume,
+                                'name':shape.name
+                            }
+                            entities_with_volumes[shape.guid] = volume_info # can be a dict, as the guid is unique
+                    except Exception as e:
+                        print(f"Error: {e}")
+                        pass
+                    processed += 1
+                    if(progress_callback is not None):
+                        progress_callback(processed, total, time.perf_counter() - start_time)
+                    if not iterator.next():
+                        break
+
+        # 3) Update the cache, entities without a shape are stored with a NULL volume to not retry them
+        if(connection is not None):
+            for product in include:
+                volume_info = entities_with_volumes.get(product.GlobalId, {'volume': None, 'name': product.Name})
+                new_rows.append((product.GlobalId, hashes[product.GlobalId], volume_info['volume'], volume_info['name']))
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO volumes VALUES (?, ?, ?, ?)", new_rows)
+    finally:
+        if(connection is not None):
+            connection.close()
+    return entities_with_volumes
+
+BBOX_DTYPE = np.dtype([
+    ('global_id', 'U22'),
+    ('min_point', 'f8', (3,)),
+    ('max_point', 'f8', (3,)),
+    ('center_point', 'f8', (3,)),
+])
+
+def calc_bboxes(ifc_file:ifcopenshell.file, elements:list[ifcopenshell.entity_instance] | None = None, use_world_coords:bool=True, verbose:bool=False) -> np.ndarray:
+    """
+    Calculates the axis aligned bounding boxes of all (or the given) entities in the IFC file
+    in a single pass of a multi-core geometry iterator.
+    Args:
+        ifc_file (ifcopenshell.file): IFC file
+        elements (list[ifcopenshell.entity_instance] | None): restrict the iterator to these elements, all elements if None
+        use_world_coords (bool): return the bounding boxes in world coordinates
+    Returns:
+        np.ndarray: structured array with the dtype BBOX_DTYPE, sorted by global_id,
+            e.g. [('2HBKPyXqbEBOFvEOPaWIoH', [0., 0., 0.], [1., 1., 1.], [0.5, 0.5, 0.5]), ...]
+    """
+    if(elements is not None and len(elements) == 0):
+        return np.empty(0, dtype=BBOX_DTYPE)
+
+    global_ids, min_points, max_points = [], [], []
+    settings = ifcopenshell.geom.settings()
+    if(use_world_coords):
+        settings.set(settings.USE_WORLD_COORDS, True)
+
+    iterator = ifcopenshell.geom.iterator(settings, ifc_file, multiprocessing.cpu_count(), include=elements)
     if iterator.initialize():
         while True:
-            try:    
+            try:
                 shape = iterator.get()
-                
                 if(shape is not None):
-                    volume = ifcopenshell.util.shape.get_volume(shape.geometry)
-                    volume_info = {
-                        'volume':volume,
-                        'name':shape.name
-                    }
-                    entities_with_volumes[shape.guid] = volume_info # can be a dict, as the guid is unique
+                    points = np.asarray(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+                    if(len(points) > 0):
+                        global_ids.append(shape.guid)
+                        min_points.append(points.min(axis=0))
+                        max_points.append(points.max(axis=0))
             except Exception as e:
-                print(f"Error: {e}")
-                pass
+                if(verbose):
+                    print(f"Error: {e}")
             if not iterator.next():
                 break
-    return entities_with_volumes
+
+    bboxes = np.empty(len(global_ids), dtype=BBOX_DTYPE)
+    if(len(global_ids) > 0):
+        bboxes['global_id'] = global_ids
+        bboxes['min_point'] = np.vstack(min_points)
+        bboxes['max_point'] = np.vstack(max_points)
+        bboxes['center_point'] = (bboxes['min_point'] + bboxes['max_point']) / 2
+    return np.sort(bboxes, order='global_id')
+
+def get_bbox_from_table(bboxes:np.ndarray, global_id:str) -> dict | None:
+    """
+    Looks up a single bounding box by its GlobalId in a table created by calc_bboxes (binary search).
+    Args:
+        bboxes (np.ndarray): structured array with the dtype BBOX_DTYPE, sorted by global_id
+        global_id (str): the GlobalId of the element
+    Returns:
+        dict | None: {'min_point', 'max_point', 'center_point', 'x_length', 'y_length', 'z_length'} or None if not found
+    """
+    if(global_id is None):
+        return None
+    idx = np.searchsorted(bboxes['global_id'], global_id)
+    if(idx >= len(bboxes) or bboxes['global_id'][idx] != global_id):
+        return None
+    row = bboxes[idx]
+    lengths = row['max_point'] - row['min_point']
+    return {
+        'min_point': row['min_point'],
+        'max_point': row['max_point'],
+        'center_point': tuple(row['center_point']),
+        'x_length': lengths[0],
+        'y_length': lengths[1],
+        'z_length': lengths[2]
+    }
+
+def calc_triangle_meshes(ifc_file:ifcopenshell.file, elements:list[ifcopenshell.entity_instance] | None = None, use_world_coords:bool=True, verbose:bool=False) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """
+    Tessellates all (or the given) entities in the IFC file in a single pass of a multi-core geometry iterator.
+    Args:
+        ifc_file (ifcopenshell.file): IFC file
+        elements (list[ifcopenshell.entity_instance] | None): restrict the iterator to these elements, all elements if None
+        use_world_coords (bool): return the vertices in world coordinates
+    Returns:
+        dict[str, tuple[np.ndarray, np.ndarray]]: GlobalId -> ((N,3) vertices, (F,3) triangles as vertex indices)
+    """
+    if(elements is not None and len(elements) == 0):
+        return {}
+
+    meshes = {}
+    settings = ifcopenshell.geom.settings()
+    if(use_world_coords):
+        settings.set(settings.USE_WORLD_COORDS, True)
+
+    iterator = ifcopenshell.geom.iterator(settings, ifc_file, multiprocessing.cpu_count(), include=elements)
+    if iterator.initialize():
+        while True:
+            try:
+                shape = iterator.get()
+                if(shape is not None):
+                    vertices = np.asarray(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+                    faces = np.asarray(shape.geometry.faces, dtype=np.int64).reshape(-1, 3)
+                    if(len(faces) > 0):
+                        meshes[shape.guid] = (vertices, faces)
+            except Exception as e:
+                if(verbose):
+                    print(f"Error: {e}")
+            if not iterator.next():
+                break
+    return meshes
+
+def add_interval_to_hole_index(holes:dict[str, dict], interval:dict, hole_key:str='hole_id', top_key:str='z', keep_interval:bool=True) -> dict:
+    """
+    Adds a single interval to a hole index as created by group_intervals_by_hole (in place).
+    With keep_interval=False only the top-most interval of each hole is kept, which allows to
+    track the collars while the intervals are streamed to disk.
+    Returns:
+        dict: the unchanged interval, so the function can be used inside generator expressions
+    """
+    hole = holes.get(interval[hole_key])
+    if(hole is None):
+        hole = {'intervals': [], 'top_interval': None}
+        holes[interval[hole_key]] = hole
+    if(keep_interval):
+        hole['intervals'].append(interval)
+
+    top = interval[top_key]
+    if(top is not None and (hole['top_interval'] is None or top > hole['top_interval'][top_key])):
+        hole['top_interval'] = interval
+    return interval
+
+def group_intervals_by_hole(intervals:Iterable[dict], hole_key:str='hole_id', top_key:str='z') -> dict[str, dict]:
+    """
+    Groups borehole intervals by their hole id in a single pass and keeps track of the
+    top-most interval (i.e. the interval with the highest value of 'top_key') of each hole.
+    Args:
+        intervals (Iterable[dict]): the intervals, e.g. [{'hole_id': 'BH-001', 'z': 200.0, ...}, ...]
+        hole_key (str): the key of the hole id in each interval
+        top_key (str): the key used to determine the top-most interval, intervals with None are ignored
+    Returns:
+        dict[str, dict]: {HOLE_ID: {'intervals': [INTERVAL, ...], 'top_interval': INTERVAL | None}, ...}
+            the intervals keep their input order
+    """
+    holes = {}
+    for interval in intervals:
+        add_interval_to_hole_index(holes, interval, hole_key=hole_key, top_key=top_key)
+    return holes
 
 def write_list_of_dict_to_csv(data: list[dict], filepath:str, round_floats:bool=True) -> str:
+    # the header is the union of the keys of all rows (in order of appearance)
+    return write_iter_of_dict_to_csv(data, filepath, round_floats=round_floats)
+
+def write_iter_of_dict_to_csv(rows: Iterable[dict] | Callable[[], Iterable[dict]], filepath:str, fieldnames:list[str] | None = None, round_floats:bool=True) -> str:
+    """
+    Streams dictionaries row by row into a csv file, so the rows never have to be resident in memory at once.
+    Args:
+        rows (Iterable[dict] | Callable[[], Iterable[dict]]): the rows, e.g. a generator,
+            or a function returning a fresh iterable for each call (needed for a two-pass union schema of generators)
+        filepath (str): the path of the csv file
+        fieldnames (list[str] | None): the pre-declared header. If None, the header is
+            - the union of all keys (two passes), if rows is a list, tuple or a function
+            - the keys of the first row, if rows is any other iterable (keys appearing later raise a ValueError)
+        round_floats (bool): round numeric values to 4 decimals while writing
+    Returns:
+        str: the filepath
+    """
     ROUND_DECIMALS = 4
-    keys = data[0].keys() if data else []
-    
-    if(round_floats):
-        data = [{key: round(value, ROUND_DECIMALS) if isinstance(value, (int, float)) else value for key, value in item.items()} for item in data]
-    
+
+    def _iter_rows():
+        return rows() if callable(rows) else iter(rows)
+
+    row_iter = None
+    if(fieldnames is None):
+        if(callable(rows) or isinstance(rows, (list, tuple))):
+            fieldnames = {}
+            for row in _iter_rows():
+                fieldnames.update(dict.fromkeys(row.keys()))
+            fieldnames = list(fieldnames)
+        else:
+            row_iter = _iter_rows()
+            first_row = next(row_iter, None)
+            fieldnames = list(first_row.keys()) if first_row is not None else []
+            if(first_row is not None):
+                row_iter = itertools.chain([first_row], row_iter)
+    if(row_iter is None):
+        row_iter = _iter_rows()
+
     with open(filepath, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=keys)
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
-        writer.writerows(data)
-    
+        for row in row_iter:
+            if(round_floats):
+                row = {key: round(value, ROUND_DECIMALS) if isinstance(value, (int, float)) and not isinstance(value, bool) else value for key, value in row.items()}
+            writer.writerow(row)
+
     return(filepath)
 
-def create_flat_dict_from_pset_dict(pset_dict:dict[dict], element:ifcopenshell.entity_instance) -> dict:
+def create_flat_dict_from_pset_dict(pset_dict:dict[dict], element:ifcopenshell.entity_instance, with_values:bool=False) -> dict:
     """
     This function creates a flat dictionary from a nested dictionary with the following structure:
         {PSET_NAME: {PROPERTY_NAME: PROPERTY_VALUE, ...}, ...}
@@ -183,6 +705,7 @@ def create_flat_dict_from_pset_dict(pset_dict:dict[dict], element:ifcopenshell.e
     Args:
         pset_dict (dict[dict]): a nested dictionary with the structure {PSET_NAME: {PROPERTY_NAME: PROPERTY_VALUE, ...}, ...}
         element (ifcopenshell.entity_instance): the element to which the was retrieved
+        with_values (bool): keep the property values instead of a blank (None) structure
     Returns:
         dict: a flat dictionary with the structure {"PSET_NAME.PROPERTY_NAME": "PROPERTY_VALUE", ...}
     """
@@ -194,10 +717,106 @@ def create_flat_dict_from_pset_dict(pset_dict:dict[dict], element:ifcopenshell.e
         else:
             for prop in pset_dict[key].keys():
                 if(prop != 'id'):
-                    flat_dict_row[f'{key}.{prop}'] = None
+                    flat_dict_row[f'{key}.{prop}'] = pset_dict[key][prop] if with_values else None
     return flat_dict_row
 
-def parse_pset_csv(file_path:str) -> (dict[dict], dict[dict], list[str]):
+# float() and int() also accept e.g. 'nan', 'inf' and '1_000', which are not valid numbers of a csv column
+_FLOAT_CHARACTERS = set('0123456789+-.eE \t')
+_INT_CHARACTERS = set('0123456789+- \t')
+
+def _parse_numeric_column(values:list[str], dtype:type, decimal_separator:str='.', thousands_separator:str | None = None) -> np.ndarray:
+    # converts a whole column at once, raises a ValueError if a single cell can't be converted
+    if(thousands_separator):
+        values = [value.replace(thousands_separator, '') for value in values]
+    if(decimal_separator != '.'):
+        values = [value.replace(decimal_separator, '.') for value in values]
+    if(not set(''.join(values)) <= (_INT_CHARACTERS if dtype is int else _FLOAT_CHARACTERS)):
+        raise ValueError("Not a numeric column")
+    if(dtype is int):
+        return np.fromiter(map(int, values), dtype=np.int64, count=len(values))
+    try:
+        return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+    except ValueError:
+        # empty cells become NaN, any other invalid cell raises again
+        values = [value if value.strip() else 'nan' for value in values]
+        return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+
+def _parse_bool_column(values:list[str]) -> np.ndarray:
+    if(len(values) > 0 and values[0].strip().lower() not in ('true', 'false')):
+        raise ValueError("Not a boolean column") # cheap check before the conversion of the whole column
+    lowered = [value.strip().lower() for value in values]
+    if(not set(lowered) <= {'true', 'false'}):
+        raise ValueError("Not a boolean column")
+    return np.array([value == 'true' for value in lowered], dtype=bool)
+
+def _convert_column(values:list[str], column_type:type, decimal_separator:str='.', thousands_separator:str | None = None) -> np.ndarray:
+    if(column_type is str):
+        return np.array([value if value != '' else None for value in values], dtype=object)
+    if(column_type is bool):
+        return _parse_bool_column(values)
+    return _parse_numeric_column(values, column_type, decimal_separator, thousands_separator)
+
+def read_csv_columns(
+    file_path:str,
+    schema:dict[str, type] | None = None,
+    decimal_separator:str = '.',
+    thousands_separator:str | None = None,
+    delimiter:str = ',',
+    infer_integers:bool = True,
+) -> dict[str, np.ndarray]:
+    """
+    Reads a csv file column by column and converts each column to a single type.
+    The type of a column is taken from the schema or inferred once per column (int, float, bool, else str) by
+    converting the whole column with numpy, instead of trying float() on every cell.
+    Negative numbers, exponents and locale decimal separators (e.g. decimal_separator=',', delimiter=';') are supported,
+    'nan', 'inf' or '1_000' are not numbers (the column becomes a str column). Rows with a different number of cells
+    than the header raise a ValueError.
+    Args:
+        file_path (str): the path to the csv file
+        schema (dict[str, type] | None): explicit column types (int, float, bool or str), other columns are inferred
+        decimal_separator (str): the decimal separator of the numbers, e.g. ',' for german csv files
+        thousands_separator (str | None): a thousands separator to remove, e.g. '.' for german csv files
+        delimiter (str): the column delimiter
+        infer_integers (bool): if False, integer columns are inferred as float
+    Returns:
+        dict[str, np.ndarray]: the columns, int64 columns (with infer_integers), float columns with NaN for empty cells,
+            bool columns and str columns as object arrays with None for empty cells.
+            Integer columns with empty cells are inferred as float.
+    """
+    schema = schema or {}
+    with open(file_path, newline='') as csvfile:
+        reader = csv.reader(csvfile, delimiter=delimiter, quotechar='"')
+        fieldnames = next(reader, [])
+        rows = [row for row in reader if row]
+    ragged = [idx + 2 for idx, row in enumerate(rows) if len(row) != len(fieldnames)]
+    if(ragged):
+        raise ValueError(f"{file_path}: the rows {ragged[:10]} don't have {len(fieldnames)} columns like the header")
+
+    columns = {}
+    raw_columns = zip(*rows) if rows else [()] * len(fieldnames)
+    for fieldname, values in zip(fieldnames, raw_columns):
+        values = list(values)
+        column_type = schema.get(fieldname)
+        if(column_type is not None):
+            columns[fieldname] = _convert_column(values, column_type, decimal_separator, thousands_separator)
+            continue
+
+        # infer the type once per column, the first conversion of the whole column that succeeds wins
+        empty_count = values.count('')
+        has_empty_cells = empty_count > 0
+        if(empty_count == len(values)):
+            candidates = [str]
+        else:
+            candidates = ([int] if infer_integers and not has_empty_cells else []) + [float] + ([bool] if not has_empty_cells else []) + [str]
+        for candidate in candidates:
+            try:
+                columns[fieldname] = _convert_column(values, candidate, decimal_separator, thousands_separator)
+                break
+            except ValueError:
+                continue
+    return columns
+
+def parse_pset_csv(file_path:str, decimal_separator:str='.', delimiter:str=',', return_columns:bool=False) -> (dict[dict], dict[dict], list[str]):
     """
     Parses a csv file with the following structure:
         GlobalId, PSET_NAME.PROPERTY_NAME, PSET_NAME.PROPERTY_NAME, ...
@@ -205,46 +824,55 @@ def parse_pset_csv(file_path:str) -> (dict[dict], dict[dict], list[str]):
     and returns a nested dictionary with the following structure:
         {GlobalId: {PSET_NAME: {PROPERTY_NAME: PROPERTY_VALUE, ...}, ...}, ...}
     the PsetName will be retrieved from the first part of the column name (i.e. before the first dot)
+    The columns are typed once with read_csv_columns: numeric columns become floats, empty cells None.
 
     Args:
         file_path (str): the path to the csv file
+        decimal_separator (str): the decimal separator of the numbers
+        delimiter (str): the column delimiter
+        return_columns (bool): additionally return the typed columns of read_csv_columns
     Returns:
         dict: a nested dictionary with the structure {GlobalId: {PSET_NAME: {PROPERTY_NAME: PROPERTY_VALUE, ...}, ...}, ...}
 
     """
-    with open(file_path, newline='') as csvfile:
-        reader = csv.DictReader(csvfile)
-        data = {}
-        for row in reader:
-            global_id = row['GlobalId']
-            data[global_id] = {}
-            for column, value in row.items():
-                if column in ['GlobalId', 'Name', 'Volume'] or column[:3] == '.id':
-                    continue
-                parts = column.split('.')
-                outer_key = parts[0]
-                inner_key = '.'.join(parts[1:])
-                if outer_key not in data[global_id]:
-                    data[global_id][outer_key] = {}
-                if value == '':
-                    data[global_id][outer_key][inner_key] = None
-                else:
-                    data[global_id][outer_key][inner_key] = float(value) if value and value.replace('.', '', 1).isdigit() else value
-    
-        blank_structure = {}
-        for field in reader.fieldnames:
-            if(field in ['GlobalId', 'Name']):
-                blank_structure[field] = None
-            elif(field in ['id', 'Volume']):
-                continue
-            else:
-                outer_key = field.split('.', 1)[0] # = pset name
-                inner_key = field.split('.', 1)[1] # = property name
-                if(outer_key not in blank_structure.keys()):
-                    blank_structure[outer_key] = {}
-                blank_structure[outer_key][inner_key] = None
-
-    return data, blank_structure, reader.fieldnames
+    columns = read_csv_columns(file_path, schema={'GlobalId': str, 'Name': str}, decimal_separator=decimal_separator, delimiter=delimiter, infer_integers=False)
+    fieldnames = list(columns.keys())
+
+    # 1) pset and property name of each column (the same for all rows)
+    pset_columns = {}
+    for column in fieldnames:
+        if column in ['GlobalId', 'Name', 'Volume'] or column[:3] == '.id':
+            continue
+        parts = column.split('.')
+        values = columns[column]
+        if(values.dtype == np.float64):
+            values = [None if value != value else value for value in values.tolist()] # NaN -> None
+        else:
+            values = values.tolist()
+        pset_columns.setdefault(parts[0], []).append(('.'.join(parts[1:]), values))
+
+    # 2) nested dict per row
+    data = {
+        global_id: {outer_key: {inner_key: values[idx] for inner_key, values in properties} for outer_key, properties in pset_columns.items()}
+        for idx, global_id in enumerate(columns['GlobalId'].tolist())
+    }
+
+    blank_structure = {}
+    for field in fieldnames:
+        if(field in ['GlobalId', 'Name']):
+            blank_structure[field] = None
+        elif(field in ['id', 'Volume']):
+            continue
+        else:
+            outer_key = field.split('.', 1)[0] # = pset name
+            inner_key = field.split('.', 1)[1] # = property name
+            if(outer_key not in blank_structure.keys()):
+                blank_structure[outer_key] = {}
+            blank_structure[outer_key][inner_key] = None
+
+    if(return_columns):
+        return data, blank_structure, fieldnames, columns
+    return data, blank_structure, fieldnames
 
 def add_suffix_to_file_path(file_path:str, suffix:str) -> str:
     base_name, ext = os.path.splitext(file_path)
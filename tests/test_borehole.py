@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from borehole.borehole import Borehole, Casing, DrillingPath, Interval, SurveySegment
+
+def _borehole(max_depth=10.0):
+    return Borehole(
+        hole_id="BH-001", easting=500.0, northing=1000.0, elevation=200.0, drilling_radius=0.1, max_depth=max_depth,
+        drilling_survey=[SurveySegment(depth=0, dip=0, azimuth=0), SurveySegment(depth=5, dip=30, azimuth=45), SurveySegment(depth=10, dip=45, azimuth=90)],
+        casings=[Casing(depth_from=0.0, depth_to=2.5, casing_radius=0.2)],
+        intervals=[Interval(depth_from=0.0, depth_to=3.333, lithology="Sand")],
+    )
+
+def _assert_same_path(borehole):
+    fresh = _borehole(borehole.max_depth)
+    fresh.drilling_survey, fresh.casings, fresh.intervals = borehole.drilling_survey, borehole.casings, borehole.intervals
+    fresh.calculate_drilling_path()
+    assert borehole.drilling_xyzpath.array.shape == fresh.drilling_xyzpath.array.shape
+    np.testing.assert_allclose(borehole.drilling_xyzpath.array, fresh.drilling_xyzpath.array, atol=1e-6)
+
+def test_path_below_the_last_station_is_extrapolated_along_the_tangent():
+    borehole = _borehole(max_depth=20.0)
+    borehole.calculate_drilling_path()
+    path = borehole.drilling_xyzpath
+    assert path.depth[-1] == pytest.approx(20.0)
+    tail = path.xyz[path.depth >= 10.0]
+    directions = np.diff(tail, axis=0) / np.linalg.norm(np.diff(tail, axis=0), axis=1)[:, None]
+    np.testing.assert_allclose(directions, np.broadcast_to(directions[0], directions.shape), atol=1e-9)
+
+@pytest.mark.parametrize("change", ["max_depth", "survey", "intervals"])
+def test_update_drilling_path_equals_a_fresh_calculation(change):
+    borehole = _borehole()
+    borehole.calculate_drilling_path()
+    if(change == "max_depth"):
+        borehole.max_depth = 15.0
+    elif(change == "survey"):
+        borehole.drilling_survey = borehole.drilling_survey[:2] + [SurveySegment(depth=8, dip=60, azimuth=90)]
+    else:
+        borehole.intervals = borehole.intervals + [Interval(depth_from=3.333, depth_to=7.25, lithology="Clay")]
+    borehole.update_drilling_path()
+    _assert_same_path(borehole)
+
+def _path():
+    # bent polyline with stations every 10 m
+    xyz = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, -10.0], [6.0, 0.0, -18.0], [6.0, 8.0, -18.0]])
+    return DrillingPath(np.column_stack([xyz, [0.0, 10.0, 20.0, 30.0]]))
+
+def test_sub_path_between_stations_starts_and_ends_at_interpolated_points():
+    sub_path = _path().between(5.0, 25.0)
+    np.testing.assert_allclose(sub_path.depth, [5.0, 10.0, 20.0, 25.0])
+    np.testing.assert_allclose(sub_path.xyz[0], [0.0, 0.0, -5.0])
+    np.testing.assert_allclose(sub_path.xyz[-1], [6.0, 4.0, -18.0])
+    np.testing.assert_allclose(sub_path.xyz[1:3], _path().xyz[1:3])
+
+def test_sub_path_on_stations_has_no_duplicates():
+    sub_path = _path().between(10.0, 20.0)
+    np.testing.assert_allclose(sub_path.array, _path().array[1:3])
+    sub_path = _path().between(12.5, 17.5)
+    np.testing.assert_allclose(sub_path.depth, [12.5, 17.5])
+    np.testing.assert_allclose(sub_path.xyz, [[1.5, 0.0, -12.0], [4.5, 0.0, -16.0]])
+
+def test_sub_path_is_clipped_to_the_path():
+    np.testing.assert_allclose(_path().between(-5.0, 100.0).array, _path().array)
+    np.testing.assert_allclose(_path().between(25.0, 100.0).depth, [25.0, 30.0])
+    assert len(_path().between(40.0, 50.0)) == 0
+    assert len(_path().between(-10.0, -5.0)) == 0
+    np.testing.assert_allclose(_path().between(30.0, 40.0).array, _path().array[-1:])
+
+def test_reversed_or_empty_ranges():
+    assert len(_path().between(20.0, 10.0)) == 0
+    single = _path().between(15.0, 15.0)
+    np.testing.assert_allclose(single.array, [[3.0, 0.0, -14.0, 15.0]])
+    assert len(DrillingPath().between(0.0, 10.0)) == 0
+
+def _curved_borehole(intervals=()):
+    return Borehole(
+        hole_id="BH-002", easting=0.0, northing=0.0, elevation=0.0, drilling_radius=0.1, max_depth=60.0,
+        drilling_survey=[SurveySegment(depth=0, dip=0, azimuth=0), SurveySegment(depth=20, dip=30, azimuth=45), SurveySegment(depth=40, dip=35, azimuth=50), SurveySegment(depth=50, dip=80, azimuth=120)],
+        intervals=list(intervals),
+    )
+
+def _max_chord_deviation(borehole, depths):
+    # distance of a dense sampling of the minimum curvature path to the chords of the sampled depths
+    from borehole.desurvey import desurvey_minimum_curvature
+    survey = np.array([(segment.depth, segment.dip, segment.azimuth) for segment in borehole.drilling_survey])
+    dense = np.linspace(depths[0], depths[-1], 20001)
+    positions = desurvey_minimum_curvature(survey[:, 0], survey[:, 1], survey[:, 2], [0, len(survey)], np.concatenate([depths, dense]), [0, len(depths) + len(dense)])
+    sampled, exact = positions[:len(depths)], positions[len(depths):]
+    chord = np.clip(np.searchsorted(depths, dense, side='right') - 1, 0, len(depths) - 2)
+    start, end = sampled[chord], sampled[chord + 1]
+    direction = (end - start) / np.linalg.norm(end - start, axis=1)[:, None]
+    return np.linalg.norm(np.cross(exact - start, direction), axis=1).max()
+
+@pytest.mark.parametrize("chord_tolerance", [0.001, 0.01, 0.1])
+def test_adaptive_depths_keep_the_chord_tolerance(chord_tolerance):
+    intervals = [Interval(depth_from=0.0, depth_to=7.0003, lithology="Sand"), Interval(depth_from=7.0003, depth_to=33.3331, lithology="Clay")]
+    borehole = _curved_borehole(intervals)
+    depths = borehole.calculate_adaptive_depths(chord_tolerance=chord_tolerance)
+    assert _max_chord_deviation(borehole, depths) <= chord_tolerance
+    # not oversampled: twice the tolerance is exceeded with every other depth
+    assert _max_chord_deviation(borehole, depths[::2]) > chord_tolerance
+
+@pytest.mark.parametrize("max_spacing", [0.5, 2.0, 7.0])
+def test_adaptive_depths_keep_the_max_spacing(max_spacing):
+    intervals = [Interval(depth_from=0.0, depth_to=7.0003, lithology="Sand"), Interval(depth_from=7.0003, depth_to=33.3331, lithology="Clay")]
+    borehole = _curved_borehole(intervals)
+    depths = borehole.calculate_adaptive_depths(chord_tolerance=0.01, max_spacing=max_spacing)
+    assert depths[0] == 0.0 and depths[-1] == 60.0
+    assert np.diff(depths).max() <= max_spacing
+    assert np.diff(depths).min() > 1e-3
+
+def test_straight_hole_only_gets_its_end_points_and_boundaries():
+    borehole = Borehole(
+        hole_id="BH-003", easting=0.0, northing=0.0, elevation=0.0, drilling_radius=0.1, max_depth=30.0,
+        drilling_survey=[SurveySegment(depth=0, dip=60, azimuth=45), SurveySegment(depth=10, dip=60, azimuth=45), SurveySegment(depth=30, dip=60, azimuth=45)],
+        casings=[Casing(depth_from=0.0, depth_to=4.2, casing_radius=0.2)],
+        intervals=[Interval(depth_from=4.2, depth_to=17.5, lithology="Sand")],
+    )
+    np.testing.assert_array_equal(borehole.calculate_adaptive_depths(chord_tolerance=0.001), [0.0, 4.2, 17.5, 30.0])
+
+def test_adaptive_depths_always_keep_the_boundaries():
+    boundaries = [0.0, 3.0004, 19.9995, 20.0005, 41.0, 60.0]
+    intervals = [Interval(depth_from=depth_from, depth_to=depth_to, lithology="Sand") for depth_from, depth_to in zip(boundaries[:-1], boundaries[1:])]
+    borehole = _curved_borehole(intervals)
+    borehole.casings = [Casing(depth_from=0.0, depth_to=12.3456, casing_radius=0.2)]
+    for max_spacing in (None, 1.0):
+        depths = borehole.calculate_adaptive_depths(chord_tolerance=0.01, max_spacing=max_spacing)
+        assert set(boundaries + [12.3456]) <= set(depths.tolist())
+        assert np.all(np.diff(depths) > 0.0)
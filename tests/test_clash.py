@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from borehole.clash import PlannedBorehole, clash_planned_borehole, first_contact_depth, planned_boreholes_from_rows
+from borehole.tolerance_cone import tolerance_cone_meshes
+
+def _box(min_point, max_point):
+    corners = np.array([[x, y, z] for z in (0, 1) for y in (0, 1) for x in (0, 1)], dtype=np.float64)
+    vertices = np.asarray(min_point) + corners * (np.asarray(max_point) - np.asarray(min_point))
+    faces = np.array([
+        (0, 2, 1), (1, 2, 3), (4, 5, 6), (5, 7, 6), (0, 1, 4), (1, 5, 4),
+        (2, 6, 3), (3, 6, 7), (0, 4, 2), (2, 4, 6), (1, 3, 5), (3, 7, 5),
+    ], dtype=np.int64)
+    return vertices, faces
+
+def test_cone_hitting_the_top_face():
+    vertices, faces = _box((-5.0, -5.0, -20.0), (5.0, 5.0, -10.0))
+    borehole = PlannedBorehole("BH-1", start=(0.0, 0.0, 0.0), end=(0.0, 0.0, -30.0))
+    assert first_contact_depth(borehole, vertices, faces) == pytest.approx(10.0)
+
+def test_cone_inside_a_solid_is_a_clash_at_the_collar():
+    vertices, faces = _box((-50.0, -50.0, -100.0), (50.0, 50.0, 10.0))
+    borehole = PlannedBorehole("BH-1", start=(0.0, 0.0, 0.0), end=(0.0, 0.0, -30.0))
+    assert first_contact_depth(borehole, vertices, faces) == 0.0
+    assert clash_planned_borehole((borehole, [("box", vertices, faces)])) == [("box", 0.0)]
+
+def test_cone_leaving_a_solid_is_a_clash_at_the_collar():
+    vertices, faces = _box((-50.0, -50.0, -10.0), (50.0, 50.0, 10.0))
+    borehole = PlannedBorehole("BH-1", start=(0.0, 0.0, 0.0), end=(0.0, 0.0, -30.0))
+    assert first_contact_depth(borehole, vertices, faces) == 0.0
+
+def test_cone_next_to_a_solid_is_clash_free():
+    vertices, faces = _box((10.0, -5.0, -20.0), (20.0, 5.0, 10.0))
+    borehole = PlannedBorehole("BH-1", start=(0.0, 0.0, 0.0), end=(0.0, 0.0, -30.0))
+    assert first_contact_depth(borehole, vertices, faces) is None
+
+@pytest.mark.parametrize("missing", [None, "", float("nan")])
+def test_missing_values_of_the_rows_fall_back_to_the_orientation_and_defaults(missing):
+    row = {
+        "hole_id": "BH-1", "start_x": 0.0, "start_y": 0.0, "start_z": 0.0, "end_x": missing, "end_y": missing, "end_z": missing,
+        "dip": 90.0, "azimuth": 0.0, "length": 30.0, "start_radius": missing, "tolerance_factor": missing,
+    }
+    borehole, = planned_boreholes_from_rows([row], start_radius=0.1, tolerance_factor=0.01)
+    np.testing.assert_allclose(borehole.end, (0.0, 0.0, -30.0), atol=1e-12)
+    assert (borehole.start_radius, borehole.tolerance_factor) == (0.1, 0.01)
+
+@pytest.mark.parametrize("argument", ["starts", "ends", "start_radii", "tolerance_factors"])
+def test_tolerance_cones_reject_non_finite_input(argument):
+    arguments = {"starts": np.zeros((2, 3)), "ends": np.array([[0.0, 0.0, -10.0], [1.0, 0.0, -10.0]]), "start_radii": np.full(2, 0.05), "tolerance_factors": np.full(2, 0.02)}
+    arguments[argument] = arguments[argument].copy()
+    arguments[argument][1] = np.nan
+    with pytest.raises(ValueError, match=r"\[1\]"):
+        tolerance_cone_meshes(**arguments)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from ezdxf.render.forms import cube, cylinder_2p
+
+from borehole.csg import CSGBackend, get_csg_backend, mesh_from_meshbuilder
+from borehole.tolerance_cone import tolerance_cone_meshes
+from borehole.tube_mesh import tube_mesh
+
+def _volume(vertices, faces):
+    triangles = vertices[faces]
+    return float(np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])).sum() / 6.0)
+
+def _edge_counts(faces):
+    _, counts = np.unique(np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1), axis=0, return_counts=True)
+    return counts
+
+def _tube_and_cone(num_segments):
+    # a bent tube crossed by a tolerance cone, the surfaces intersect at grazing angles along the curves
+    t = np.linspace(0.0, 1.0, num_segments // 2)[:, None]
+    tube = tube_mesh(np.hstack([10.0 * t, 3.0 * np.sin(3.0 * t), -10.0 * t]), 0.5, num_segments=num_segments)
+    vertices, faces = tolerance_cone_meshes([[5.0, -5.0, -5.0]], [[5.0, 5.0, -5.0]], start_radii=0.3, tolerance_factors=0.05, num_segments=num_segments)
+    return tube, (vertices[0], faces)
+
+def _overlapping_cones():
+    vertices, faces = tolerance_cone_meshes(
+        [[0.0, 0.0, 0.0], [0.3, 0.0, 0.0]], [[2.0, 1.0, -10.0], [-1.0, -0.5, -10.0]], start_radii=0.5, tolerance_factors=0.05, num_segments=32
+    )
+    return (vertices[0], faces), (vertices[1], faces)
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CSGBackend()
+
+@pytest.mark.parametrize("operation", ["union", "difference", "intersection"])
+def test_numpy_backend_is_watertight_and_matches_pycsg(operation):
+    a = mesh_from_meshbuilder(cube())
+    b = mesh_from_meshbuilder(cylinder_2p(count=32, base_center=(0, -1, 0), top_center=(0, 1, 0), radius=0.25))
+    vertices, faces = getattr(get_csg_backend("numpy"), operation)(a, b)
+    assert np.all(_edge_counts(faces) == 2)
+    assert _volume(vertices, faces) == pytest.approx(_volume(*getattr(get_csg_backend("pycsg"), operation)(a, b)), rel=1e-9)
+
+@pytest.mark.parametrize("operation", ["union", "difference", "intersection"])
+@pytest.mark.parametrize("operands", [_tube_and_cone(16), _tube_and_cone(32), _overlapping_cones()], ids=["tube-cone16", "tube-cone32", "cones32"])
+def test_numpy_backend_closes_the_cracks_of_swept_operands(operation, operands):
+    vertices, faces = getattr(get_csg_backend("numpy"), operation)(*operands)
+    assert np.all(_edge_counts(faces) == 2)
+    directed = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    assert len(np.unique(directed, axis=0)) == len(directed)
+    assert _volume(vertices, faces) == pytest.approx(_volume(*getattr(get_csg_backend("pycsg"), operation)(*operands)), rel=1e-5)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from ifc_utils.ifc_utils import read_csv_columns, parse_pset_csv
+
+def _write(tmp_path, text):
+    file_path = tmp_path / "input.csv"
+    file_path.write_text(text)
+    return str(file_path)
+
+def test_columns_are_typed_once(tmp_path):
+    columns = read_csv_columns(_write(tmp_path, "hole_id,count,depth,flag,empty\nBH-1,1,-1.5e1,true,\nBH-2,2,,false,\n"))
+    assert columns["hole_id"].tolist() == ["BH-1", "BH-2"]
+    assert columns["count"].dtype == np.int64 and columns["count"].tolist() == [1, 2]
+    assert columns["depth"][0] == -15.0 and np.isnan(columns["depth"][1])
+    assert columns["flag"].tolist() == [True, False]
+    assert columns["empty"].tolist() == [None, None]
+
+def test_locale_separators(tmp_path):
+    columns = read_csv_columns(_write(tmp_path, "value;other\n1.234,5;x\n"), decimal_separator=",", thousands_separator=".", delimiter=";")
+    assert columns["value"].tolist() == [1234.5]
+
+@pytest.mark.parametrize("cell", ["nan", "inf", "-Infinity", "1_000"])
+def test_special_float_literals_are_not_numbers(tmp_path, cell):
+    columns = read_csv_columns(_write(tmp_path, f"value\n1.5\n{cell}\n"))
+    assert columns["value"].dtype == object
+    assert columns["value"].tolist() == ["1.5", cell]
+
+def test_numeric_schema_rejects_special_float_literals(tmp_path):
+    with pytest.raises(ValueError):
+        read_csv_columns(_write(tmp_path, "value\nnan\n"), schema={"value": float})
+
+@pytest.mark.parametrize("text", ["a,b\n1,2,3\n", "a,b\n1\n"])
+def test_ragged_rows_raise(tmp_path, text):
+    with pytest.raises(ValueError, match="columns"):
+        read_csv_columns(_write(tmp_path, text))
+
+def test_parse_pset_csv_turns_empty_cells_into_none(tmp_path):
+    data, _, _ = parse_pset_csv(_write(tmp_path, "GlobalId,Name,Pset_Geology.Thickness,Pset_Geology.Unit\nG1,A,2,\nG2,B,,U1\n"))
+    assert data["G1"]["Pset_Geology"] == {"Thickness": 2.0, "Unit": None}
+    assert data["G2"]["Pset_Geology"] == {"Thickness": None, "Unit": "U1"}
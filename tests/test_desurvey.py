@@ -0,0 +1,41 @@
+import copy
+
+import numpy as np
+import pytest
+
+from borehole.borehole import Borehole, Casing, SurveySegment
+from borehole.desurvey import calculate_drilling_paths
+
+def _boreholes():
+    surveys = {
+        "vertical": [SurveySegment(depth=0, dip=0, azimuth=0), SurveySegment(depth=10, dip=0, azimuth=0)],
+        "curved": [SurveySegment(depth=0, dip=0, azimuth=0), SurveySegment(depth=10, dip=45, azimuth=0)],
+        "turning": [SurveySegment(depth=0, dip=5, azimuth=350), SurveySegment(depth=12, dip=40, azimuth=20), SurveySegment(depth=30, dip=80, azimuth=120)],
+    }
+    return [
+        Borehole(
+            hole_id=hole_id, easting=500.0 + idx, northing=1000.0, elevation=200.0, drilling_radius=0.1, max_depth=survey[-1].depth + extension,
+            drilling_survey=survey, casings=[Casing(depth_from=0.0, depth_to=2.5, casing_radius=0.2)],
+        )
+        for idx, (hole_id, survey) in enumerate(surveys.items())
+        for extension in (0.0, 7.5) # the second borehole ends below its last survey station
+    ]
+
+@pytest.mark.parametrize("borehole", _boreholes(), ids=lambda borehole: f"{borehole.hole_id}-{borehole.max_depth}")
+def test_batch_desurvey_equals_wellpathpy(borehole):
+    reference, batch = copy.deepcopy(borehole), copy.deepcopy(borehole)
+    reference.calculate_drilling_path()
+    calculate_drilling_paths([batch])
+
+    reference_path, batch_path = reference.drilling_xyzpath.array, batch.drilling_xyzpath.array
+    assert reference_path.shape == batch_path.shape
+    # within the survey wellpathpy is the reference, below it both extrapolate along the last tangent
+    np.testing.assert_allclose(batch_path, reference_path, atol=1e-6)
+
+def test_batch_desurvey_of_many_boreholes_at_once():
+    boreholes, batch = _boreholes(), copy.deepcopy(_boreholes())
+    for borehole in boreholes:
+        borehole.calculate_drilling_path()
+    calculate_drilling_paths(batch)
+    for reference, batched in zip(boreholes, batch):
+        np.testing.assert_allclose(batched.drilling_xyzpath.array, reference.drilling_xyzpath.array, atol=1e-6)
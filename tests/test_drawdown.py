@@ -0,0 +1,112 @@
+import math
+
+import numpy as np
+import pytest
+
+from groundwater.drawdown import Well, grid_surface_mesh, pumping_rate_for_drawdown, sichardt_radius, water_table, water_table_grid, wells_from_rows
+
+K, H = 3.09e-3, 15.0
+
+def _water_table_per_point(points, wells):
+    # one evaluation per point and well (as calculate_y of archive/groundwater_geometries.py, superposed)
+    thickness = []
+    for x, y in points:
+        lowering = 0.0
+        for well in wells:
+            R = 3000 * well.drawdown * math.sqrt(K)
+            distance = max(math.hypot(x - well.x, y - well.y), well.well_radius)
+            if(distance < R):
+                lowering += (well.pumping_rate / (math.pi * K)) * math.log(R / distance)
+        thickness.append(math.sqrt(max(H**2 - lowering, 0.0)))
+    return np.array(thickness)
+
+def _water_table(points, wells, **kwargs):
+    return water_table(
+        points,
+        np.array([(well.x, well.y) for well in wells]),
+        np.array([well.pumping_rate for well in wells]),
+        K,
+        H,
+        sichardt_radius(np.array([well.drawdown for well in wells]), K),
+        well_radii=np.array([well.well_radius for well in wells]),
+        **kwargs,
+    )
+
+def _random_wells(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        Well(well_id=str(idx), x=x, y=y, pumping_rate=q, drawdown=s, well_radius=r)
+        for idx, (x, y, q, s, r) in enumerate(np.column_stack([rng.uniform(-50.0, 50.0, (count, 2)), rng.uniform(0.001, 0.01, count), rng.uniform(0.5, 2.0, count), rng.uniform(0.1, 0.3, count)]).tolist())
+    ]
+
+@pytest.mark.parametrize("missing", [None, "", float("nan")])
+def test_missing_values_of_the_rows_fall_back_to_the_defaults(missing):
+    row = {"well_id": "W-001", "x": 1.0, "y": 2.0, "pumping_rate": missing, "drawdown": missing, "well_radius": missing}
+    well, = wells_from_rows([row], k=3.09e-3, H=15.0, drawdown=1.32, well_radius=0.25)
+    assert (well.drawdown, well.well_radius) == (1.32, 0.25)
+    assert well.pumping_rate == pytest.approx(float(pumping_rate_for_drawdown(1.32, 3.09e-3, 15.0, 0.25)))
+
+def test_given_values_of_the_rows_are_used():
+    row = {"well_id": "W-001", "x": 1.0, "y": 2.0, "pumping_rate": 0.004, "drawdown": 2.0, "well_radius": 0.3}
+    well, = wells_from_rows([row], k=3.09e-3, H=15.0)
+    assert (well.pumping_rate, well.drawdown, well.well_radius) == (0.004, 2.0, 0.3)
+
+@pytest.mark.parametrize("drawdown", [0.5, 1.32, 3.0])
+def test_single_well_has_the_drawdown_at_the_well_radius(drawdown):
+    well = Well(well_id="W-001", x=10.0, y=-5.0, pumping_rate=float(pumping_rate_for_drawdown(drawdown, K, H, 0.25)), drawdown=drawdown, well_radius=0.25)
+    thickness = _water_table([[10.25, -5.0], [10.0, -5.0]], [well])
+    np.testing.assert_allclose(thickness, H - drawdown, rtol=1e-12)
+
+def test_no_lowering_outside_the_radius_of_influence():
+    well = Well(well_id="W-001", x=0.0, y=0.0, pumping_rate=0.01, drawdown=1.0)
+    R = float(sichardt_radius(1.0, K))
+    thickness = _water_table([[R, 0.0], [0.0, -1.5 * R], [R * 0.6, R * 0.8]], [well])
+    np.testing.assert_array_equal(thickness, H)
+    assert _water_table([[0.99 * R, 0.0]], [well])[0] < H
+
+def test_two_wells_superpose_in_the_squared_thickness():
+    wells = [Well(well_id="W-001", x=0.0, y=0.0, pumping_rate=0.004, drawdown=1.0), Well(well_id="W-002", x=30.0, y=10.0, pumping_rate=0.006, drawdown=1.5)]
+    points = np.random.default_rng(1).uniform(-100.0, 100.0, (500, 2))
+    lowering = H**2 - _water_table(points, wells)**2
+    single = [H**2 - _water_table(points, [well])**2 for well in wells]
+    np.testing.assert_allclose(lowering, single[0] + single[1], rtol=1e-9, atol=1e-9)
+    assert np.count_nonzero((single[0] > 0) & (single[1] > 0)) > 0
+
+def test_vectorized_water_table_matches_the_per_point_loop():
+    wells = _random_wells(25)
+    points = np.random.default_rng(2).uniform(-150.0, 150.0, (400, 2))
+    np.testing.assert_allclose(_water_table(points, wells), _water_table_per_point(points.tolist(), wells), rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 25, 1000])
+def test_chunking_does_not_change_the_water_table(chunk_size):
+    wells = _random_wells(25)
+    points = np.random.default_rng(3).uniform(-150.0, 150.0, (400, 2))
+    np.testing.assert_array_equal(_water_table(points, wells, chunk_size=chunk_size), _water_table(points, wells))
+
+def test_water_table_grid_covers_the_radii_of_influence():
+    wells = _random_wells(3)
+    xs, ys, thickness = water_table_grid(wells, K, H, cell_size=5.0)
+    assert thickness.shape == (len(ys), len(xs))
+    margin = float(sichardt_radius(max(well.drawdown for well in wells), K))
+    assert xs[0] == pytest.approx(min(well.x for well in wells) - margin)
+    # the grid ends within half a cell of the extent
+    assert xs[-1] >= max(well.x for well in wells) + margin - 2.5
+    assert ys[-1] >= max(well.y for well in wells) + margin - 2.5
+    np.testing.assert_array_equal(thickness[0, :], H)
+    np.testing.assert_array_equal(thickness[:, 0], H)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    np.testing.assert_allclose(thickness.ravel(), _water_table_per_point(np.column_stack([grid_x.ravel(), grid_y.ravel()]).tolist(), wells), rtol=1e-12)
+    with pytest.raises(ValueError):
+        water_table_grid([], K, H)
+
+def test_grid_surface_mesh_has_two_upward_triangles_per_cell():
+    xs, ys = np.linspace(0.0, 10.0, 6), np.linspace(-3.0, 3.0, 4)
+    z = np.random.default_rng(4).uniform(-1.0, 1.0, (len(ys), len(xs)))
+    vertices, faces = grid_surface_mesh(xs, ys, z)
+    assert vertices.shape == (len(xs) * len(ys), 3)
+    assert faces.shape == (2 * (len(xs) - 1) * (len(ys) - 1), 3)
+    triangles = vertices[faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    assert np.all(normals[:, 2] > 0.0)
+    # the projected triangles tile the grid
+    assert 0.5 * normals[:, 2].sum() == pytest.approx(10.0 * 6.0)
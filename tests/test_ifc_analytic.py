@@ -0,0 +1,71 @@
+import math
+
+import ifcopenshell
+import ifcopenshell.guid
+import numpy as np
+import pytest
+
+from ifc_utils.ifc_analytic import calc_analytic_properties
+
+@pytest.fixture
+def model():
+    model = ifcopenshell.file(schema="IFC4")
+    model.createIfcGeometricRepresentationContext(ContextType="Model", CoordinateSpaceDimension=3, WorldCoordinateSystem=model.createIfcAxis2Placement3D(model.createIfcCartesianPoint((0.0, 0.0, 0.0))))
+    return model
+
+def _position(model, location=(0.0, 0.0, 0.0)):
+    return model.createIfcAxis2Placement3D(model.createIfcCartesianPoint(location))
+
+def _evaluate(model, item):
+    context = model.by_type("IfcGeometricRepresentationContext")[0]
+    representation = model.createIfcShapeRepresentation(context, "Body", "CSG", [item])
+    element = model.createIfcBuildingElementProxy(GlobalId=ifcopenshell.guid.new(), Representation=model.createIfcProductDefinitionShape(None, None, [representation]))
+    return calc_analytic_properties(model, element, unit_scale=1.0)
+
+def _assert_properties(properties, volume, area, min_point, max_point):
+    assert properties['volume'] == pytest.approx(volume)
+    assert properties['area'] == pytest.approx(area)
+    np.testing.assert_allclose(properties['min_point'], min_point, atol=1e-9)
+    np.testing.assert_allclose(properties['max_point'], max_point, atol=1e-9)
+
+def test_sphere(model):
+    properties = _evaluate(model, model.createIfcSphere(Position=_position(model, (1.0, 2.0, 3.0)), Radius=2.0))
+    _assert_properties(properties, 4 / 3 * math.pi * 8, 4 * math.pi * 4, (-1.0, 0.0, 1.0), (3.0, 4.0, 5.0))
+
+def test_block(model):
+    properties = _evaluate(model, model.createIfcBlock(Position=_position(model), XLength=1.0, YLength=2.0, ZLength=3.0))
+    _assert_properties(properties, 6.0, 2 * (2 + 6 + 3), (0.0, 0.0, 0.0), (1.0, 2.0, 3.0))
+
+def test_rectangular_pyramid(model):
+    properties = _evaluate(model, model.createIfcRectangularPyramid(Position=_position(model), XLength=2.0, YLength=2.0, Height=3.0))
+    _assert_properties(properties, 4.0, 4 + 2 * 2 * math.sqrt(1 + 9), (0.0, 0.0, 0.0), (2.0, 2.0, 3.0))
+
+def test_right_circular_cylinder_starts_at_its_position(model):
+    properties = _evaluate(model, model.createIfcRightCircularCylinder(Position=_position(model), Height=4.0, Radius=1.0))
+    _assert_properties(properties, math.pi * 4, 2 * math.pi * (1 + 4), (-1.0, -1.0, 0.0), (1.0, 1.0, 4.0))
+
+def test_right_circular_cone(model):
+    properties = _evaluate(model, model.createIfcRightCircularCone(Position=_position(model), Height=4.0, BottomRadius=3.0))
+    _assert_properties(properties, math.pi * 9 * 4 / 3, math.pi * 3 * (3 + 5), (-3.0, -3.0, 0.0), (3.0, 3.0, 4.0))
+
+def test_extruded_rectangle(model):
+    profile = model.createIfcRectangleProfileDef(ProfileType="AREA", XDim=2.0, YDim=4.0)
+    item = model.createIfcExtrudedAreaSolid(SweptArea=profile, Position=_position(model), ExtrudedDirection=model.createIfcDirection((0.0, 0.0, 1.0)), Depth=3.0)
+    _assert_properties(_evaluate(model, item), 24.0, 2 * 8 + 12 * 3, (-1.0, -2.0, 0.0), (1.0, 2.0, 3.0))
+
+def test_extruded_circle_hollow(model):
+    profile = model.createIfcCircleHollowProfileDef(ProfileType="AREA", Radius=2.0, WallThickness=1.0)
+    item = model.createIfcExtrudedAreaSolid(SweptArea=profile, Position=_position(model), ExtrudedDirection=model.createIfcDirection((0.0, 0.0, 1.0)), Depth=2.0)
+    ring = math.pi * (4 - 1)
+    _assert_properties(_evaluate(model, item), ring * 2, 2 * ring + 2 * math.pi * (2 + 1) * 2, (-2.0, -2.0, 0.0), (2.0, 2.0, 2.0))
+
+def test_extruded_polyline_oblique(model):
+    points = [model.createIfcCartesianPoint(point) for point in ((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0), (0.0, 0.0))]
+    profile = model.createIfcArbitraryClosedProfileDef(ProfileType="AREA", OuterCurve=model.createIfcPolyline(points))
+    item = model.createIfcExtrudedAreaSolid(SweptArea=profile, Position=_position(model), ExtrudedDirection=model.createIfcDirection((1.0, 0.0, 1.0)), Depth=math.sqrt(2))
+    # a parallelepiped sheared along x: two faces 1 x sqrt(2), two faces 1 x 1 (parallel to the shear)
+    _assert_properties(_evaluate(model, item), 1.0, 2 + 2 * math.sqrt(2) + 2, (0.0, 0.0, 0.0), (2.0, 1.0, 1.0))
+
+def test_unsupported_item_returns_none(model):
+    coordinates = model.createIfcCartesianPointList3D([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)])
+    assert _evaluate(model, model.createIfcTriangulatedFaceSet(Coordinates=coordinates, CoordIndex=[(1, 2, 3)])) is None
@@ -0,0 +1,45 @@
+import os
+
+import ifcopenshell
+import ifcopenshell.guid
+import pytest
+
+import ifc_utils.ifc_model_index as ifc_model_index
+from ifc_utils.ifc_model_index import open_model_index
+
+@pytest.fixture
+def ifc_path(tmp_path):
+    model = ifcopenshell.file(schema="IFC4")
+    for name in ("Clay", "Sand"):
+        model.createIfcBuildingElementProxy(GlobalId=ifcopenshell.guid.new(), Name=name)
+    file_path = str(tmp_path / "model.ifc")
+    model.write(file_path)
+    return file_path
+
+def test_entries_are_cached_and_read_lazily(ifc_path):
+    names = open_model_index(ifc_path).column('IfcBuildingElementProxy', 'name')
+
+    index = open_model_index(ifc_path)
+    assert list(index._entries) == ['meta']
+    assert index.column('IfcBuildingElementProxy', 'name') == names
+    assert index._model is None # answered from the sidecar file
+
+def test_touched_file_is_hashed_only_once(ifc_path, monkeypatch):
+    open_model_index(ifc_path).column('IfcBuildingElementProxy', 'name')
+    stat = os.stat(ifc_path)
+    os.utime(ifc_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    hashed = []
+    file_sha1 = ifc_model_index._file_sha1
+    monkeypatch.setattr(ifc_model_index, "_file_sha1", lambda file_path: hashed.append(file_path) or file_sha1(file_path))
+    assert open_model_index(ifc_path)._cached_keys > {'meta'}
+    assert open_model_index(ifc_path)._cached_keys > {'meta'}
+    assert len(hashed) == 1
+
+def test_changed_file_invalidates_the_cache(ifc_path):
+    open_model_index(ifc_path).column('IfcBuildingElementProxy', 'name')
+    with open(ifc_path, 'a') as file:
+        file.write("\n")
+    index = open_model_index(ifc_path)
+    assert index._cached_keys == set()
+    assert sorted(index.column('IfcBuildingElementProxy', 'name')) == ["Clay", "Sand"]
@@ -0,0 +1,65 @@
+import ifcopenshell
+import ifcopenshell.guid
+import pytest
+
+from ifc_utils.ifc_utils import add_psets_in_bulk
+
+@pytest.fixture
+def model():
+    return ifcopenshell.file(schema="IFC4")
+
+def _element(model):
+    return model.createIfcBuildingElementProxy(GlobalId=ifcopenshell.guid.new())
+
+def _pset(model, elements, properties):
+    pset = model.createIfcPropertySet(ifcopenshell.guid.new(), None, "Pset_Geology", None, properties)
+    model.createIfcRelDefinesByProperties(ifcopenshell.guid.new(), None, None, None, elements, pset)
+    return pset
+
+def _properties(model, element):
+    rel = next(rel for rel in element.IsDefinedBy if rel.is_a("IfcRelDefinesByProperties"))
+    return {prop.Name: prop for prop in rel.RelatingPropertyDefinition.HasProperties}
+
+def _assert_no_orphans(model):
+    for entity_type in ("IfcProperty", "IfcPropertySet", "IfcRelDefinesByProperties"):
+        for entity in model.by_type(entity_type):
+            assert len(model.get_inverse(entity)) > 0 or entity.is_a("IfcRelDefinesByProperties") and entity.RelatedObjects
+
+def test_merge_keeps_other_property_types_and_measure_types(model):
+    first, second = _element(model), _element(model)
+    thickness = model.createIfcPropertySingleValue("Thickness", None, model.create_entity("IfcLengthMeasure", 2.5), None)
+    lithology = model.createIfcPropertyEnumeratedValue("Lithology", None, [model.create_entity("IfcLabel", "Sand")], None)
+    _pset(model, [first, second], [thickness, lithology])
+
+    stats = add_psets_in_bulk(model, {first.GlobalId: {"Pset_Geology": {"Thickness": 3, "Unit": "U1"}}})
+
+    assert stats["shared"] == 1 and stats["psets"] == 1
+    properties = _properties(model, first)
+    assert properties["Lithology"] == lithology # kept as it is, not rebuilt
+    assert properties["Thickness"].NominalValue.is_a() == "IfcLengthMeasure"
+    assert properties["Thickness"].NominalValue.wrappedValue == 3.0
+    assert properties["Unit"].NominalValue.is_a() == "IfcLabel"
+    assert _properties(model, second) == {"Thickness": thickness, "Lithology": lithology}
+    _assert_no_orphans(model)
+
+def test_exclusive_update_removes_replaced_properties(model):
+    element = _element(model)
+    _pset(model, [element], [model.createIfcPropertySingleValue("Thickness", None, model.create_entity("IfcLengthMeasure", 2.5), None)])
+
+    stats = add_psets_in_bulk(model, {element.GlobalId: {"Pset_Geology": {"Thickness": 4.0}}})
+
+    assert stats["updated"] == 1
+    assert _properties(model, element)["Thickness"].NominalValue.is_a() == "IfcLengthMeasure"
+    assert len(model.by_type("IfcPropertySingleValue")) == 1
+    _assert_no_orphans(model)
+
+def test_replaced_values_of_all_elements_leave_no_old_properties(model):
+    first, second = _element(model), _element(model)
+    _pset(model, [first, second], [model.createIfcPropertySingleValue("Unit", None, model.create_entity("IfcLabel", "U1"), None)])
+
+    add_psets_in_bulk(model, {element.GlobalId: {"Pset_Geology": {"Unit": "U2"}} for element in (first, second)})
+
+    assert len(model.by_type("IfcPropertySingleValue")) == 1 # the old value is removed, the new one is shared
+    assert _properties(model, first)["Unit"].NominalValue.wrappedValue == "U2"
+    assert _properties(model, second)["Unit"].NominalValue.wrappedValue == "U2"
+    _assert_no_orphans(model)
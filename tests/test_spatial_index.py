@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from ifc_utils.ifc_spatial_index import BBoxIndex
+from ifc_utils.ifc_utils import BBOX_DTYPE
+
+def _random_bboxes(count, seed=0):
+    rng = np.random.default_rng(seed)
+    bboxes = np.empty(count, dtype=BBOX_DTYPE)
+    bboxes['global_id'] = [f"ID{idx:06d}" for idx in range(count)]
+    bboxes['min_point'] = rng.uniform(-100.0, 100.0, (count, 3))
+    bboxes['max_point'] = bboxes['min_point'] + rng.uniform(0.0, 10.0, (count, 3))
+    bboxes['center_point'] = (bboxes['min_point'] + bboxes['max_point']) / 2
+    return bboxes
+
+def _brute_force_box(bboxes, min_point, max_point):
+    hit = np.all((bboxes['min_point'] <= max_point) & (bboxes['max_point'] >= min_point), axis=1)
+    return sorted(bboxes['global_id'][hit].tolist())
+
+def _brute_force_segment(bboxes, start, end, radius=0.0):
+    # Liang-Barsky clipping of the segment against every grown box
+    hits = []
+    for bbox in bboxes:
+        t_enter, t_exit = 0.0, 1.0
+        for axis in range(3):
+            low, high = bbox['min_point'][axis] - radius, bbox['max_point'][axis] + radius
+            delta = end[axis] - start[axis]
+            if(delta == 0.0):
+                if(not low <= start[axis] <= high):
+                    t_enter, t_exit = 1.0, 0.0
+                continue
+            t1, t2 = sorted(((low - start[axis]) / delta, (high - start[axis]) / delta))
+            t_enter, t_exit = max(t_enter, t1), min(t_exit, t2)
+        if(t_enter <= t_exit):
+            hits.append(str(bbox['global_id']))
+    return sorted(hits)
+
+def _queries(rng, count=20):
+    for _ in range(count):
+        start, end = rng.uniform(-120.0, 120.0, 3), rng.uniform(-120.0, 120.0, 3)
+        yield np.minimum(start, end), np.maximum(start, end), start, end
+
+@pytest.mark.parametrize("count", [0, 1, 15, 16, 17, 1000])
+def test_box_and_point_queries_match_brute_force(count):
+    bboxes, rng = _random_bboxes(count), np.random.default_rng(1)
+    index = BBoxIndex.from_bboxes(bboxes, capacity=4)
+    for min_point, max_point, start, _ in _queries(rng):
+        assert sorted(index.query_box(min_point, max_point).tolist()) == _brute_force_box(bboxes, min_point, max_point)
+        assert sorted(index.query_point(start, tolerance=5.0).tolist()) == _brute_force_box(bboxes, start - 5.0, start + 5.0)
+    if(count):
+        assert bboxes['global_id'][0] in index.query_point(bboxes['center_point'][0]).tolist()
+
+@pytest.mark.parametrize("count", [0, 1, 1000])
+@pytest.mark.parametrize("radius", [0.0, 3.0])
+def test_segment_queries_match_brute_force(count, radius):
+    bboxes, rng = _random_bboxes(count), np.random.default_rng(2)
+    index = BBoxIndex.from_bboxes(bboxes, capacity=4)
+    for _, _, start, end in _queries(rng):
+        assert sorted(index.query_segment(start, end, radius=radius).tolist()) == _brute_force_segment(bboxes, start, end, radius)
+    # an axis parallel segment (through the first box) takes the parallel branch of the slab test
+    y, z = bboxes['center_point'][0, 1:] if count else (3.0, 4.0)
+    start, end = np.array([-120.0, y, z]), np.array([120.0, y, z])
+    assert sorted(index.query_segment(start, end, radius=radius).tolist()) == _brute_force_segment(bboxes, start, end, radius)
+
+def test_polyline_query_is_the_union_of_its_segments():
+    bboxes, rng = _random_bboxes(1000), np.random.default_rng(3)
+    index = BBoxIndex.from_bboxes(bboxes, capacity=8)
+    points = rng.uniform(-120.0, 120.0, (5, 3))
+    expected = sorted(set().union(*(_brute_force_segment(bboxes, start, end, 2.0) for start, end in zip(points[:-1], points[1:]))))
+    assert sorted(index.query_polyline(points, radius=2.0).tolist()) == expected
+    assert sorted(index.query_polyline(points[:1], radius=2.0).tolist()) == _brute_force_box(bboxes, points[0] - 2.0, points[0] + 2.0)
+
+@pytest.mark.parametrize("count", [0, 1, 1000])
+def test_serialized_index_returns_identical_results(count):
+    bboxes, rng = _random_bboxes(count), np.random.default_rng(4)
+    index = BBoxIndex.from_bboxes(bboxes, capacity=4)
+    restored = BBoxIndex.from_bytes(index.to_bytes())
+    assert len(restored) == len(index)
+    assert restored.capacity == index.capacity
+    for min_point, max_point, start, end in _queries(rng):
+        np.testing.assert_array_equal(restored.query_box(min_point, max_point), index.query_box(min_point, max_point))
+        np.testing.assert_array_equal(restored.query_segment(start, end, radius=1.0), index.query_segment(start, end, radius=1.0))
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from borehole.tube_mesh import lod_tube_mesh, parallel_transport_frames, simplify_path, tube_mesh
+
+def _volume(vertices, faces):
+    triangles = vertices[faces]
+    return float(np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])).sum() / 6.0)
+
+def _assert_closed(faces):
+    # every edge is used by exactly two triangles in opposite directions (consistent orientation)
+    directed = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    _, counts = np.unique(np.sort(directed, axis=1), axis=0, return_counts=True)
+    assert np.all(counts == 2)
+    assert len(np.unique(directed, axis=0)) == len(directed)
+
+def _polygon_area(radius, num_segments):
+    return 0.5 * num_segments * radius**2 * np.sin(2.0 * np.pi / num_segments)
+
+def _arc(bend_radius=20.0, angle=np.pi / 2, count=50):
+    s = np.linspace(0.0, angle, count)
+    return np.column_stack([bend_radius * np.sin(s), np.zeros(count), -bend_radius * (1.0 - np.cos(s))])
+
+def test_straight_tube_is_closed_with_the_volume_of_the_prism():
+    xyz = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, -4.0], [0.0, 0.0, -10.0]])
+    vertices, faces = tube_mesh(xyz, 0.5, num_segments=36)
+    _assert_closed(faces)
+    assert _volume(vertices, faces) == pytest.approx(_polygon_area(0.5, 36) * 10.0, rel=1e-12)
+    assert _volume(vertices, faces) == pytest.approx(np.pi * 0.5**2 * 10.0, rel=1e-2)
+
+def test_normals_point_away_from_the_axis():
+    vertices, faces = tube_mesh(np.array([[0.0, 0.0, 0.0], [0.0, 0.0, -10.0]]), 0.5, num_segments=16, caps=False)
+    triangles = vertices[faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    radial = triangles.mean(axis=1) * [1.0, 1.0, 0.0]
+    assert np.all(np.einsum('ij,ij->i', normals, radial) > 0.0)
+
+def test_bent_tube_is_closed_with_the_volume_of_pappus():
+    xyz = _arc()
+    vertices, faces = tube_mesh(xyz, 0.5, num_segments=36)
+    _assert_closed(faces)
+    length = np.linalg.norm(np.diff(xyz, axis=0), axis=1).sum()
+    assert _volume(vertices, faces) == pytest.approx(_polygon_area(0.5, 36) * length, rel=1e-3)
+
+def test_radius_steps_and_gaps_give_closed_parts():
+    xyz = np.column_stack([np.zeros(5), np.zeros(5), -np.arange(5.0)])
+    vertices, faces = tube_mesh(xyz, np.array([0.3, 0.2, np.nan, 0.2]), num_segments=12)
+    _assert_closed(faces)
+    assert _volume(vertices, faces) == pytest.approx(_polygon_area(0.3, 12) + 2 * _polygon_area(0.2, 12), rel=1e-12)
+
+def test_frames_do_not_twist_around_a_helix():
+    s = np.linspace(0.0, 6.0 * np.pi, 2000)
+    xyz = np.column_stack([np.cos(s), np.sin(s), 0.3 * s])
+    tangents, normals, binormals = parallel_transport_frames(xyz)
+    frames = np.stack([tangents, normals, binormals], axis=1)
+    np.testing.assert_allclose(np.einsum('nij,nkj->nik', frames, frames), np.broadcast_to(np.eye(3), frames.shape), atol=1e-12)
+    # a Frenet frame turns by torsion * step around the tangent per step, the rotation minimizing frame doesn't
+    step = np.linalg.norm(xyz[1] - xyz[0])
+    torsion = 0.3 / (1.0 + 0.3**2)
+    assert np.abs(np.einsum('ij,ij->i', normals[1:], binormals[:-1])).max() < 0.1 * torsion * step
+
+def test_simplified_path_stays_within_the_tolerance():
+    xyz = _arc(count=200)
+    keep = np.zeros(len(xyz), dtype=bool)
+    keep[77] = True
+    indices = simplify_path(xyz, 0.05, keep)
+    assert indices[0] == 0 and indices[-1] == len(xyz) - 1 and 77 in indices
+    assert len(indices) < len(xyz) // 4
+    for start, end in zip(indices[:-1], indices[1:]):
+        chord = (xyz[end] - xyz[start]) / np.linalg.norm(xyz[end] - xyz[start])
+        distances = np.linalg.norm(np.cross(xyz[start:end + 1] - xyz[start], chord), axis=1)
+        assert distances.max() <= 0.05
+    np.testing.assert_array_equal(simplify_path(np.zeros((2, 3)), 0.05), [0, 1])
+
+def test_lod_tube_is_closed_and_coarser():
+    xyz = _arc(count=200)
+    radius = np.where(np.arange(len(xyz) - 1) < 100, 0.5, 0.3)
+    full = tube_mesh(xyz, radius)
+    vertices, faces = lod_tube_mesh(xyz, radius, tolerance=0.02)
+    _assert_closed(faces)
+    assert len(faces) < len(full[1]) // 2
+    assert _volume(vertices, faces) == pytest.approx(_volume(*full), rel=0.05)